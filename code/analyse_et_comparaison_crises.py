@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from donnees import chronologie, partitions
 
 def analyse_complete_crise(dataframes, labels):
     st.title("🔎 Analyse et suivi d'une crise : Volume & Sentiments")
@@ -11,7 +12,6 @@ def analyse_complete_crise(dataframes, labels):
         return
 
     df = dataframes["Tweet_sentiment_localisation"]
-    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
     
     label_to_code = {v: k for k, v in labels.items()}
     code_to_label = {k: v for k, v in labels.items()}
@@ -22,7 +22,8 @@ def analyse_complete_crise(dataframes, labels):
     selected_label = st.selectbox("📍 Choisissez une crise :", crises_lisibles)
     selected_code = label_to_code.get(selected_label, selected_label)
 
-    df_crisis = df[df["topic"] == selected_code]
+    df_crisis = partitions.partitions().extraire(df, selected_code)
+    daily = chronologie.cube_tweets().serie("jour", crises=[selected_code])
 
     if df_crisis.empty:
         st.warning("Aucun tweet disponible pour cette crise.")
@@ -45,12 +46,11 @@ def analyse_complete_crise(dataframes, labels):
 
     # Fréquence des tweets ---
     with st.expander("📈 Volume de tweets dans le temps"):
-        df_crisis["date"] = df_crisis["created_at"].dt.date
-        freq = df_crisis.groupby("date").size().reset_index(name="nb_tweets")
+        freq = daily[["date", "nb_tweets"]]
         fig_freq = px.line(freq, x="date", y="nb_tweets", markers=True, title="Évolution du volume de tweets")
         st.plotly_chart(fig_freq, use_container_width=True)
         st.subheader("📊 Données journalières")
-        tweet_counts = df_crisis.groupby('date').size().reset_index(name='Nombre de tweets')
+        tweet_counts = daily[["date", "nb_tweets"]].rename(columns={"nb_tweets": "Nombre de tweets"})
         st.dataframe(tweet_counts, use_container_width=True)
 
     # Répartition des sentiments ---
@@ -96,10 +96,7 @@ def analyse_complete_crise(dataframes, labels):
 
     # Évolution des sentiments---
     with st.expander("⏳ Sentiment moyen dans le temps"):
-        sentiment_map = {'negative': -1, 'neutral': 0, 'positive': 1}
-        df_crisis['roberta_score'] = df_crisis['sentiment'].map(sentiment_map)
-
-        daily_sentiment = df_crisis.groupby('date')['roberta_score'].mean().reset_index()
+        daily_sentiment = daily[["date", "sentiment_moyen"]].rename(columns={"sentiment_moyen": "roberta_score"})
 
         fig_sentiment = px.line(
             daily_sentiment,
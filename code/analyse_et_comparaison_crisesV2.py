@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from donnees import chronologie, listes, partitions
 
 def analyse_complete_crise(dataframes, labels):
     st.title("🔎 Analyse et suivi d'une crise : Volume & Sentiments")
@@ -11,7 +12,6 @@ def analyse_complete_crise(dataframes, labels):
         return
 
     df = dataframes["Tweet_sentiment_localisation"]
-    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
     
     label_to_code = {v: k for k, v in labels.items()}
     code_to_label = {k: v for k, v in labels.items()}
@@ -22,7 +22,8 @@ def analyse_complete_crise(dataframes, labels):
     selected_label = st.selectbox("📍 Choisissez une crise :", crises_lisibles)
     selected_code = label_to_code.get(selected_label, selected_label)
 
-    df_crisis = df[df["topic"] == selected_code]
+    df_crisis = partitions.partitions().extraire(df, selected_code)
+    daily = chronologie.cube_tweets().serie("jour", crises=[selected_code])
 
     if df_crisis.empty:
         st.warning("Aucun tweet disponible pour cette crise.")
@@ -40,8 +41,7 @@ def analyse_complete_crise(dataframes, labels):
     box1,box2 = st.columns(2,border=True)
     # Fréquence des tweets ---
     
-    df_crisis["date"] = df_crisis["created_at"].dt.date
-    freq = df_crisis.groupby("date").size().reset_index(name="nb_tweets")
+    freq = daily[["date", "nb_tweets"]]
     fig_freq = px.line(freq, x="date", y="nb_tweets", markers=True, title="Évolution du volume de tweets")
     st.plotly_chart(fig_freq, use_container_width=True)
 
@@ -88,10 +88,7 @@ def analyse_complete_crise(dataframes, labels):
 
     # Évolution des sentiments---
     with box2:
-        sentiment_map = {'negative': -1, 'neutral': 0, 'positive': 1}
-        df_crisis['roberta_score'] = df_crisis['sentiment'].map(sentiment_map)
-
-        daily_sentiment = df_crisis.groupby('date')['roberta_score'].mean().reset_index()
+        daily_sentiment = daily[["date", "sentiment_moyen"]].rename(columns={"sentiment_moyen": "roberta_score"})
 
         fig_sentiment = px.line(
             daily_sentiment,
@@ -121,23 +118,12 @@ def analyse_complete_crise(dataframes, labels):
 
     set3_colors = px.colors.qualitative.Set3
 
-    # Préparer le DataFrame des catégories
-    df_temp = df_crisis.copy()
-
-    # Assurer que post_category est une liste
-    df_temp['post_category'] = df_temp['post_category'].apply(lambda x: eval(x) if isinstance(x, str) else x)
-
-    # Exploser (un tweet avec plusieurs catégories = plusieurs lignes)
-    df_exploded = df_temp.explode('post_category')
-    df_exploded = df_exploded.dropna(subset=['post_category'])
+    category_counts = listes.pour(df_crisis, 'post_category').compter('Catégorie')
+    category_counts.columns = ['Catégorie', 'Tweets']
 
-    # Maintenant df_exploded est prêt ✅
-    unique_categories = df_exploded['post_category'].dropna().unique()
+    unique_categories = category_counts['Catégorie'].tolist()
     color_map_category = {cat: set3_colors[i % len(set3_colors)] for i, cat in enumerate(unique_categories)}
 
-    category_counts = df_exploded['post_category'].value_counts().reset_index()
-    category_counts.columns = ['Catégorie', 'Tweets']
-
     # --- 📊 Graphique Barres ---
     fig_bar_category = px.bar(
         category_counts,
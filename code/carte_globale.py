@@ -3,6 +3,9 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
+from donnees import geo, regions, spatial
+from donnees.composants import choisir_zone, figure_regions
+
 
 def afficher_carte_globale(dataframes, labels):
     st.title("🧭 Carte des Tweets géolocalisés")
@@ -18,54 +21,98 @@ def afficher_carte_globale(dataframes, labels):
         st.error("Colonnes nécessaires manquantes.")
         return
 
-    df_geo = df.dropna(subset=["latitude", "longitude", "retweet_count", "sentiment", "text"])
-    df_geo = df_geo[(df_geo["latitude"] != 0) & (df_geo["longitude"] != 0)]
+    points = geo.points_carte()
 
-    if df_geo.empty:
+    if len(points) == 0:
         st.warning("Aucun tweet géolocalisé trouvé.")
         return
 
     # Mapping inverse
     label_to_code = {v: k for k, v in labels.items()}
 
-    crises_codes = df_geo["topic"].dropna().unique()
+    crises_codes = points.partitions.valeurs
     crises_lisibles = [labels.get(code, code) for code in sorted(crises_codes)]
 
     selected_label = st.selectbox("📌 Filtrer par crise (facultatif)", options=["Toutes"] + crises_lisibles)
 
-    if selected_label != "Toutes":
-        selected_code = label_to_code.get(selected_label, selected_label)
-        df_geo = df_geo[df_geo["topic"] == selected_code]
+    crise = None if selected_label == "Toutes" else label_to_code.get(selected_label, selected_label)
 
-    if df_geo.empty:
+    if points.effectif(crise) == 0:
         st.warning("Aucun tweet trouvé pour cette crise.")
         return
 
-    # Filtrer par nombre minimal de retweets
-    min_retweet, max_retweet = int(df_geo["retweet_count"].min()), int(df_geo["retweet_count"].max())
+    # Filtrer par nombre minimal de retweets : bornes et seuil lus dans l'ordre pré-calculé
+    min_retweet, max_retweet = points.bornes(crise)
+    with st.expander("📊 Répartition des retweets"):
+        st.bar_chart(points.histogramme(crise))
     seuil_retweet = st.slider("🎚️ Nombre minimal de retweets à afficher :", min_value=min_retweet,
                               max_value=max_retweet, value=min_retweet, step=1)
 
-    df_geo = df_geo[df_geo["retweet_count"] >= seuil_retweet]
+    zone = choisir_zone("zone_carte_v1")
+    positions_zone = None if zone is None else spatial.index_spatial().positions(zone)
+
+    df_geo = points.au_moins(seuil_retweet, crise, positions_zone)
 
     if df_geo.empty:
         st.warning("Aucun tweet ne correspond au seuil de retweets.")
         return
 
-    # Ajouter un jitter pour éviter le chevauchement
-    np.random.seed(42)
-    df_geo["latitude_jitter"] = df_geo["latitude"] + np.random.uniform(-0.01, 0.01, size=len(df_geo))
-    df_geo["longitude_jitter"] = df_geo["longitude"] + np.random.uniform(-0.01, 0.01, size=len(df_geo))
-
-    df_geo["taille_point"] = df_geo["retweet_count"].apply(lambda x: max(5, min(x * 0.5, 40)))
-
-    # Choix de la vue : Points ou Heatmap pondérée
-    vue = st.radio("🗺️ Choisir la vue :", [
+    # Choix de la vue : Points, Heatmap pondérée ou, si des frontières sont disponibles,
+    # tweets par région
+    vues = [
         "📍 Carte des tweets (points)",
         "🔥 Heatmap pondérée (par retweets)"
-    ])
-
-    if vue == "📍 Carte des tweets (points)":
+    ]
+    if regions.disponible():
+        if regions.regions():
+            vues.append("🌍 Tweets par région")
+    else:
+        st.info(regions.MESSAGE_FRONTIERES)
+    vue = st.radio("🗺️ Choisir la vue :", vues)
+
+    if vue == "🌍 Tweets par région":
+        niveau = st.radio("Niveau :", ["region", "pays"], format_func={"region": "Région", "pays": "Pays"}.get, horizontal=True)
+        st.caption("Effectifs pré-calculés par crise, hors seuil de retweets et zone.")
+        effectifs = regions.regions().effectifs(None if crise is None else [crise], niveau)
+        fig = figure_regions(effectifs, regions.geojson())
+
+    # Au-delà de geo.SEUIL_POINTS tweets : cellules agrégées, pré-calculées quand aucun
+    # seuil de retweets n'est appliqué
+    elif len(df_geo) > geo.SEUIL_POINTS:
+        crises = None if crise is None else [crise]
+        tout = seuil_retweet == min_retweet and zone is None
+        pas, cellules = geo.cellules(None if tout else df_geo, crises, par_sentiment=True)
+        st.caption(f"{len(df_geo)} tweets regroupés en {len(cellules)} cellules de {pas}°")
+        if vue == "📍 Carte des tweets (points)":
+            fig = px.scatter_mapbox(
+                cellules.assign(taille_point=np.sqrt(cellules["nb_tweets"])),
+                lat="latitude",
+                lon="longitude",
+                hover_data={"nb_tweets": True, "retweets": True, "taille_point": False},
+                size="taille_point",
+                size_max=40,
+                color="sentiment",
+                color_discrete_map={
+                    "positive": "green",
+                    "neutral": "gray",
+                    "negative": "red"
+                },
+                zoom=2,
+                height=700
+            )
+        else:
+            fig = go.Figure()
+            fig.add_trace(go.Densitymapbox(
+                lat=cellules["latitude"],
+                lon=cellules["longitude"],
+                z=cellules["retweets"],
+                radius=30,
+                colorscale="YlGnBu",
+                showscale=True,
+                hoverinfo='skip'
+            ))
+
+    elif vue == "📍 Carte des tweets (points)":
         st.markdown("**🧭 Chaque point = un tweet | Taille = nombre de retweets | Couleur = sentiment**")
         fig = px.scatter_mapbox(
             df_geo,
@@ -86,6 +133,7 @@ def afficher_carte_globale(dataframes, labels):
 
     elif vue == "🔥 Heatmap pondérée (par retweets)":
         st.markdown("**🔸 Plus c'est chaud, plus la crise est retweetée dans la zone.**")
+        # Jitter pré-calculé pour éviter le chevauchement
         fig = go.Figure()
         fig.add_trace(go.Densitymapbox(
             lat=df_geo["latitude_jitter"],
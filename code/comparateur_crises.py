@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from donnees import listes, partitions
 
 def afficher_comparateur_crises(dataframes, labels):
     st.title("⚖️ Comparateur de crises – Statistiques globales")
@@ -33,9 +34,9 @@ def afficher_comparateur_crises(dataframes, labels):
         st.warning("Veuillez choisir au moins une crise.")
         return
 
-    df_filtered = df[df["topic"].isin(selected_codes)]
+    df_filtered = partitions.partitions().extraire(df, selected_codes)
 
-    stats = df_filtered.groupby("topic").agg(
+    stats = df_filtered.groupby("topic", observed=True).agg(
         Nombre_de_tweets=("tweet_id", "count"),
         Total_retweets=("retweet_count", "sum"),
         Moyenne_likes=("favorite_count", "mean")
@@ -92,7 +93,7 @@ def afficher_comparateur_crises(dataframes, labels):
 
     # --- 📈 Répartition du sentiment par crise ---
     st.subheader("💬 Répartition du sentiment par crise")
-    sentiment_counts = df_filtered.groupby(["topic", "sentiment"]).size().reset_index(name="count")
+    sentiment_counts = df_filtered.groupby(["topic", "sentiment"], observed=True).size().reset_index(name="count")
     sentiment_counts["topic"] = sentiment_counts["topic"].map(readable_topics)
 
     fig_sentiment = px.bar(
@@ -110,14 +111,7 @@ def afficher_comparateur_crises(dataframes, labels):
      # --- 🥧 Répartition des catégories de posts ---
     st.subheader("📚 Répartition des catégories de posts")
 
-    # Assurer que 'post_category' est bien une liste et exploser
-    df_filtered['post_category'] = df_filtered['post_category'].apply(lambda x: eval(x) if isinstance(x, str) else x)
-    df_exploded = df_filtered.explode('post_category')
-
-    # Supprimer les valeurs nulles après explosion
-    df_exploded = df_exploded.dropna(subset=['post_category'])
-
-    category_counts = df_exploded.groupby(["topic", "post_category"]).size().reset_index(name="count")
+    category_counts = listes.pour(df_filtered, 'post_category').compter_par(df_filtered['topic'], 'post_category')
     category_counts["topic"] = category_counts["topic"].map(readable_topics)
 
     fig_category = px.bar(
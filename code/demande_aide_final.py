@@ -1,32 +1,14 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
+from donnees import chronologie, faits
 def demande_aide(dataframes, labels):
     st.title("📊 Analyse des tweets par crise")
 
     # --- Chargement depuis menu.py ---
-    tweets = dataframes["Tweet_date_clean"]
-    is_about = dataframes["is_about_clean"]
     events = dataframes["Event_clean"]
-    help_requests = dataframes["help_requests"]
-
-    # --- Normalisation ---
-    tweets['tweet_id'] = tweets['tweet_id'].astype(str)
-    is_about['tweet_id'] = is_about['tweet_id'].astype(str)
-    help_requests['tweet_id'] = help_requests['tweet_id'].astype(str)
-    events['event_id'] = events['event_id'].astype(str)
-    is_about['event_id'] = is_about['event_id'].astype(str)
-
-    # --- Corriger les event_id numériques ---
-    event_id_map = dict(zip(events.index.astype(str), events['event_id']))
-    is_about['event_id'] = is_about['event_id'].map(event_id_map)
-
-    # --- Fusion ---
-    merged = tweets.merge(is_about, on="tweet_id", how="inner")
-    merged = merged.merge(events[['event_id', 'event_type']], on="event_id", how="left")
-    merged = merged.merge(help_requests[['tweet_id', 'category_name']], on="tweet_id", how="left")
-    merged['created_at'] = pd.to_datetime(merged['created_at'], errors='coerce')
-    merged['is_help'] = merged['category_name'].notna()
+
+    # --- Tweets / crise / demandes d'aide ---
+    merged = faits.table_faits().tweets_avec_crise()
 
     # --- Filtres dans la page ---
     st.markdown("### 🎯 Filtrer par événement")
@@ -51,8 +33,9 @@ def demande_aide(dataframes, labels):
 
     if view_tweet_stats:
         st.subheader("📌 Nombre total de tweets par crise")
-        tweet_counts = merged['event_id'].value_counts().reset_index()
-        tweet_counts.columns = ['event_id', 'nb_tweets']
+        # observed=True : event_id est catégoriel, les crises absentes de merged sont ignorées
+        tweet_counts = merged.groupby('event_id', observed=True).size().reset_index(name='nb_tweets')
+        tweet_counts = tweet_counts.sort_values('nb_tweets', ascending=False)
         tweet_counts = tweet_counts.merge(events[['event_id', 'event_type']], on="event_id", how="left")
 
         fig1 = px.bar(tweet_counts, x="event_type", y="nb_tweets", text="nb_tweets",
@@ -63,7 +46,7 @@ def demande_aide(dataframes, labels):
 
     if view_help_proportion:
         st.subheader("🆘 Proportion de tweets d'aide par crise")
-        help_stats = merged.groupby('event_type')['is_help'].mean().reset_index(name='pourcentage_aide')
+        help_stats = merged.groupby('event_type', observed=True)['is_help'].mean().reset_index(name='pourcentage_aide')
         help_stats['pourcentage_aide'] *= 100
 
         fig2 = px.bar(help_stats, x="event_type", y="pourcentage_aide",
@@ -74,7 +57,7 @@ def demande_aide(dataframes, labels):
 
     if view_help_vs_total:
         st.subheader("🔁 Tweets totaux vs. tweets d'aide par crise")
-        help_counts = merged.groupby(['event_type', 'is_help']).size().reset_index(name='count')
+        help_counts = merged.groupby(['event_type', 'is_help'], observed=True).size().reset_index(name='count')
         help_counts['type'] = help_counts['is_help'].map({True: 'Aide', False: 'Autres'})
 
         fig6 = px.bar(help_counts, x='event_type', y='count', color='type',
@@ -99,7 +82,9 @@ def demande_aide(dataframes, labels):
 
     if view_timeline:
         st.subheader("📅 Évolution des tweets par jour")
-        daily_stats = merged.groupby([merged['created_at'].dt.date, 'event_type']).size().reset_index(name='tweets')
+        crises = None if selected_event_id == "Tous" else [selected_event_id]
+        daily_stats = chronologie.cube_faits().serie("jour", crises=crises, par="event_type")
+        daily_stats = daily_stats.rename(columns={"date": "created_at", "nb_tweets": "tweets"})
         fig4 = px.line(daily_stats, x="created_at", y="tweets", color="event_type",
                        title="Nombre de tweets par jour et par crise",
                        labels={"created_at": "Date", "tweets": "Tweets", "event_type": "Crise"})
@@ -107,7 +92,7 @@ def demande_aide(dataframes, labels):
 
     if view_sensitive:
         st.subheader("🚨 Proportion de contenu sensible")
-        sensitive_stats = merged.groupby('event_type')['possibly_sensitive'].mean().reset_index()
+        sensitive_stats = merged.groupby('event_type', observed=True)['possibly_sensitive'].mean().reset_index()
         sensitive_stats['possibly_sensitive'] *= 100
         fig5 = px.bar(sensitive_stats, x="event_type", y="possibly_sensitive",
                       labels={"possibly_sensitive": "% sensible", "event_type": "Crise"},
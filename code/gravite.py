@@ -4,6 +4,7 @@ import pandas as pd
 import plotly.express as px
 from wordcloud import WordCloud, STOPWORDS
 import matplotlib.pyplot as plt
+from donnees import faits
 
 # ------------------------- AFFICHAGE GRAVITÉ -------------------------
 
@@ -54,18 +55,11 @@ def afficher_gravite_plotly(df, titre_suffixe=""):
 
 # ------------------------- GRAVITÉ PAR ÉVÉNEMENT -------------------------
 
-def afficher_gravite_event_plotly(df, titre_suffixe=""):
+def afficher_gravite_event_plotly(df_event, selected_eventid, titre_suffixe=""):
     colonne_gravite = 'annotation_postPriority'
-    colonne_eventid = 'crise_id'
     colonne_trecis_id = 'topic'
 
-    if colonne_gravite in df.columns and colonne_eventid in df.columns and colonne_trecis_id in df.columns:
-        df[colonne_eventid] = df[colonne_eventid].astype(str)
-        eventids = sorted(df[colonne_eventid].unique())
-        selected_eventid = st.selectbox('Sélectionne un Event ID', eventids)
-
-        df_event = df[df[colonne_eventid] == selected_eventid]
-
+    if colonne_gravite in df_event.columns and colonne_trecis_id in df_event.columns:
         if not df_event.empty:
             trecis_id = df_event[colonne_trecis_id].iloc[0]
             st.write(f"TRECIS ID associé à {selected_eventid} : {trecis_id}")
@@ -114,7 +108,7 @@ def afficher_gravite_event_plotly(df, titre_suffixe=""):
         else:
             st.warning(f"Aucune donnée trouvée pour Event ID : {selected_eventid}")
     else:
-        st.error(f"Les colonnes '{colonne_gravite}', '{colonne_eventid}' ou '{colonne_trecis_id}' sont manquantes.")
+        st.error(f"Les colonnes '{colonne_gravite}' ou '{colonne_trecis_id}' sont manquantes.")
 
 # ------------------------- WORDCLOUD POUR GRAVITÉ ÉLEVÉE -------------------------
 
@@ -240,18 +234,13 @@ def afficher_gravite(dataframes, labels) :
 
     st.title('📊 Visualisation du Degré de Gravité des Tweets')
 
-    dfs = {
-        "Tous les Tweets": dataframes["Tweet_clean"],
-        "Wildfire": dataframes["tweets_wildfire"],
-        "Bombing": dataframes["tweets_bombing"],
-        "Flood": dataframes["tweets_flood"],
-        "Earthquake": dataframes["tweets_earthquake"],
-        "Shooting": dataframes["tweets_shooting"],
-        "Typhoon": dataframes["tweets_typhoon"],
-    }
+    # Tweets d'un type d'événement ou d'une crise : tranches de la table de faits
+    table = faits.table_faits()
+    dfs = {"Tous les Tweets": table.tweets}
+    for event_type in ["wildfire", "bombing", "flood", "earthquake", "shooting", "typhoon"]:
+        dfs[event_type.capitalize()] = table.type_evenement(event_type)
 
     df_categories = dataframes["tweets_par_categorie"]
-    df_event = dataframes["tweets_par_event"]
 
     tab1, tab2, tab3, tab4 = st.tabs([
         " Gravité par type d'événement",
@@ -269,11 +258,11 @@ def afficher_gravite(dataframes, labels) :
 
     with tab2:
         st.header("Gravité pour un Event ID spécifique")
-        eventids = sorted(df_event['crise_id'].astype(str).unique())
+        eventids = sorted(str(event_id) for event_id in table.partitions.valeurs)
         selected_eventid = st.selectbox('Sélectionne un Event ID', eventids, key="selectbox_tab2")
-        df_selected = df_event[df_event['crise_id'].astype(str) == selected_eventid]
+        df_selected = table.crise(selected_eventid)
         afficher_tweets_gravite(df_selected)
-        afficher_gravite_event_plotly(df_event)
+        afficher_gravite_event_plotly(df_selected, selected_eventid)
 
     with tab3:
         st.header("Analyse de la Gravité par Catégorie de Post")
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from donnees import hashtags
 
 def afficher_hashtag_ids_top(dataframes, labels):
     st.title("🏷️ Hashtags les plus utilisés")
@@ -18,16 +19,13 @@ def afficher_hashtag_ids_top(dataframes, labels):
         st.error("Colonnes attendues manquantes dans le DataFrame.")
         return
 
-    # Nettoyage des hashtags
-    df['hashtag_id'] = df['hashtag_id'].astype(str).str.lower().str.strip()
-
-    # Agrégation des occurrences
-    top_hashtag_ids = df.groupby('hashtag_id')['occurences'].sum().reset_index()
-    top_hashtag_ids = top_hashtag_ids.sort_values(by='occurences', ascending=False)
-
     # Slider interactif
     top_n = st.slider("Nombre de hashtags à afficher", min_value=5, max_value=30, value=10)
 
+    # Hashtags normalisés, occurrences cumulées
+    top_hashtag_ids = hashtags.classement_hashtags().top(top_n)[['hashtag', 'occurences']]
+    top_hashtag_ids = top_hashtag_ids.rename(columns={'hashtag': 'hashtag_id'})
+
     # Affichage du graphique
     fig = px.bar(
         top_hashtag_ids.head(top_n),
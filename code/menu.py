@@ -7,6 +7,14 @@ st.set_page_config(
     layout="wide"
 )
 
+import os
+import sys
+
+# Accès à la couche de données partagée (../donnees)
+racine_projet = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+if racine_projet not in sys.path:
+    sys.path.append(racine_projet)
+
 import hashtags_top
 import statistiques_globales
 import comparateur_crises
@@ -17,10 +25,9 @@ import top_influenceur
 import recherche_personnalisee
 import analyse_et_comparaison_crises
 import base64
-import os
-import pandas as pd
 import statsGlobV2
 import analyse_et_comparaison_crisesV2
+from donnees import chargement
 
 # Injection de CSS personnalisé via st.markdown
 st.markdown("""
@@ -102,14 +109,9 @@ def add_bg_from_local(image_file):
 
 # """
 # Importation du data dans le repertoire CSV
+# (chargé une seule fois par processus, rechargé si un fichier change)
 csv_path = "../CSV"
-dataframes = {}
-
-for file_name in os.listdir(csv_path):
-    if file_name.endswith('.csv'):
-        file_path = os.path.join(csv_path, file_name)
-        df_name = os.path.splitext(file_name)[0]
-        dataframes[df_name] = pd.read_csv(file_path, low_memory=False)
+dataframes = chargement.charger_dataframes(csv_path)
 
 labels = {
     "TRECIS-CTIT-H-001": "fireColorado2012",
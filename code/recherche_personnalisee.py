@@ -1,5 +1,7 @@
 import streamlit as st
-import pandas as pd
+import numpy as np
+from donnees import export, jointures, pagination, recherche, regions, schema, spatial, temps
+from donnees.composants import choisir_zone
 
 def recherche_personnalisee(dataframes, labels):
     st.title("🔎 Recherche personnalisée dans les tweets")
@@ -9,22 +11,45 @@ def recherche_personnalisee(dataframes, labels):
         return
 
     df = dataframes["Tweet_sentiment_localisation"]
-    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
-    df["topic"] = df["topic"].map(labels).fillna(df["topic"])
+    df["topic"] = schema.renommer_modalites(df["topic"], labels)
+    tweets = df
 
     st.markdown("Filtre les tweets selon tes propres critères 👇")
 
     # 🔤 Filtrage par mot-clé
-    keyword = st.text_input("🔤 Contient le mot-clé :")
+    keyword = st.text_input("🔤 Contient le mot-clé :",
+                            help='mot, préfixe* (ex. resc*), "expression exacte", plusieurs mots (ET), mot1 OU mot2')
+    positions = None
     if keyword:
-        df = df[df["text"].str.contains(keyword, case=False, na=False)]
+        positions = recherche.index_texte().rechercher(keyword, df["text"])
 
     # 📅 Filtrage par date
-    min_date = df["created_at"].min().date()
-    max_date = df["created_at"].max().date()
+    dates = df["created_at"] if positions is None else df["created_at"].iloc[positions]
+    if dates.isna().all():
+        if keyword:
+            st.info("Aucun tweet ne correspond à ces mots-clés.")
+        else:
+            st.info("Aucun tweet daté à afficher.")
+        return
+    min_date = dates.min().date()
+    max_date = dates.max().date()
     date_range = st.slider("📅 Plage de dates :", min_value=min_date, max_value=max_date,
                            value=(min_date, max_date))
-    df = df[(df["created_at"].dt.date >= date_range[0]) & (df["created_at"].dt.date <= date_range[1])]
+    fenetre = temps.index_temporel().positions(*date_range)
+    positions = fenetre if positions is None else np.intersect1d(positions, fenetre, assume_unique=True)
+    # 🗺️ Zone géographique
+    zone = choisir_zone("zone_recherche_v1")
+    if zone is not None:
+        positions = np.intersect1d(positions, spatial.index_spatial().positions(zone), assume_unique=True)
+    # 🌍 Pays
+    territoires = regions.regions() if regions.disponible() else None
+    if territoires is None:
+        st.info(regions.MESSAGE_FRONTIERES)
+    elif territoires:
+        pays_selectionnes = st.multiselect("🌍 Pays :", options=sorted(territoires.comptes_pays().index))
+        if pays_selectionnes:
+            positions = np.intersect1d(positions, territoires.positions(pays_selectionnes), assume_unique=True)
+    df = df.iloc[positions]
 
     # 📍 Filtrage par lieu
     lieux = df["lieu_extrait"].dropna().unique()
@@ -43,12 +68,28 @@ def recherche_personnalisee(dataframes, labels):
 
     # 📄 Affichage des résultats
     st.markdown(f"📄 **{len(df)} tweets** trouvés avec ces filtres.")
+    # La pagination attend les positions des lignes de df dans la table partagée
+    col_tri, col_sens, col_taille, col_page = st.columns(4)
+    tri = col_tri.selectbox("Trier par :", list(pagination.COLONNES_TRI), format_func=pagination.COLONNES_TRI.get)
+    descendant = col_sens.radio("Ordre :", ["Décroissant", "Croissant"], horizontal=True) == "Décroissant"
+    taille_page = col_taille.selectbox("Tweets par page :", pagination.TAILLES_PAGE, index=1)
+    nb_pages = max(1, -(-len(df) // taille_page))
+    page = col_page.number_input(f"Page (sur {nb_pages}) :", min_value=1, max_value=nb_pages, value=1)
+    positions = np.sort(jointures.positions_lignes(df, "Tweet_sentiment_localisation"))
+    lignes = pagination.index_tri().page(positions, tri, page - 1, taille_page, descendant)
     st.dataframe(
-        df[["created_at", "text", "sentiment", "lieu_extrait", "topic"]]
-        .sort_values("created_at", ascending=False),
-        use_container_width=True
+        tweets.iloc[lignes][["created_at", "text", "sentiment", "lieu_extrait", "topic"]],
+        use_container_width=True,
+        hide_index=True
     )
 
-    # ⬇️ Export CSV
-    csv = df.to_csv(index=False).encode('utf-8')
-    st.download_button("⬇️ Télécharger les résultats", data=csv, file_name="tweets_filtrés.csv", mime="text/csv")
+    # ⬇️ Export, produit à la demande
+    col_format, col_export = st.columns([2, 1])
+    format_export = col_format.radio("Format d'export :", list(export.FORMATS), horizontal=True)
+    fichier = export.courant(st.session_state, "export_recherche_v1", export.empreinte(df, format_=format_export))
+    if fichier is None and col_export.button("📦 Préparer l'export"):
+        fichier = export.preparer(st.session_state, "export_recherche_v1", df, format_=format_export)
+    if fichier is not None:
+        with fichier.ouvrir() as f:
+            col_export.download_button("⬇️ Télécharger les résultats", data=f,
+                                       file_name=fichier.nom_fichier("tweets_filtrés"), mime=fichier.mime)
@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
+from donnees import chargement, chronologie, geo, hashtags, schema
 import folium
 from folium.plugins import HeatMap
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
 import plotly.express as px
 
 
@@ -16,8 +16,7 @@ def afficher_statistiques_globales(dataframes,labels):
 
     # Chargement des données
     df = dataframes["Tweet_sentiment_localisation"]
-    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
-    df["topic"] = df["topic"].map(labels).fillna(df["topic"])
+    df["topic"] = schema.renommer_modalites(df["topic"], labels)
 
     
 
@@ -45,48 +44,58 @@ def afficher_statistiques_globales(dataframes,labels):
         st.write(f"- Tweets annotés : **{int(nb_annotated)}**")
         st.write(f"- Tweets de priorité haute : **{nb_high_priority}**")
     with col2:
-        afficher_statistiques_temps(df)
+        afficher_statistiques_temps()
     with col3:
         create_heatmap(df)
     with col4: 
         afficherHashtag(dataframes)
 def create_heatmap(df):
+    # Carte rendue une fois par version des données et par jeu de tweets affichés : les
+    # réexécutions de la page renvoient le HTML des geo.CARTES_GARDEES derniers filtres
+    html = chargement.structure_bornee("carte_chaleur", geo.signature_carte(df), lambda tables: _rendre_heatmap(df),
+                                       geo.CARTES_GARDEES)
+    if html is None:
+        st.warning("Aucune donnée géolocalisée trouvée.")
+        return
+
+    # Affichage dans Streamlit
+    components.html(html, height=600)
+
+
+def _rendre_heatmap(df):
     geo_df = df.dropna(subset=['latitude', 'longitude'])
 
     if geo_df.empty:
-        st.warning("Aucune donnée géolocalisée trouvée.")
-        return
+        return None
 
     map_center = [geo_df['latitude'].mean(), geo_df['longitude'].mean()]
     m = folium.Map(location=map_center, zoom_start=4)
 
-    # Ajout de la HeatMap
-    heat_data = geo_df[['latitude', 'longitude']].values.tolist()
+    # Ajout de la HeatMap : cellules pondérées par leur nombre de tweets au-delà de
+    # geo.SEUIL_POINTS tweets, sinon un point par tweet
+    if len(geo_df) > geo.SEUIL_POINTS:
+        _, cellules = geo.cellules(df)
+        heat_data = cellules[['latitude', 'longitude', 'nb_tweets']].values.tolist()
+    else:
+        heat_data = geo_df[['latitude', 'longitude']].values.tolist()
     HeatMap(heat_data, radius=15).add_to(m)
 
-    # Ajouter des marqueurs pour chaque crise
-    df_points = geo_df.drop_duplicates(subset="topic")
-    for _, row in df_points.iterrows():
-        topic = row["topic"]
-        crisis_df = geo_df[geo_df["topic"] == topic]
-        n_tweets = len(crisis_df)
-        n_positif = crisis_df[crisis_df["sentiment"] == "positive"].shape[0]
-        p_positif = (n_positif / n_tweets) * 100 if n_tweets > 0 else 0
-        exemple = crisis_df["text"].dropna().iloc[0][:100] + "..."
+    # Un marqueur par crise
+    for crise in geo.resume_crises(geo_df).itertuples(index=False):
         popup_content = f"""
-        <b>📌 Crise :</b> {topic}<br>
-        <b>🔢 Tweets :</b> {n_tweets}<br>
-        <b>🙂 % Positifs :</b> {p_positif:.1f}%<br>
-        <b>💬 Exemple :</b> {exemple}
+        <b>📌 Crise :</b> {crise.topic}<br>
+        <b>🔢 Tweets :</b> {crise.nb_tweets}<br>
+        <b>🙂 % Positifs :</b> {crise.part_positifs:.1f}%<br>
+        <b>💬 Exemple :</b> {crise.exemple}
         """
 
         # Ici, on ajoute plus d'informations au tooltip
         tooltip_content = f"""
-        <b>📌 Crise :</b> {topic}<br>
+        <b>📌 Crise :</b> {crise.topic}<br>
         """
 
         folium.CircleMarker(
-            location=[row["latitude"], row["longitude"]],
+            location=[crise.latitude, crise.longitude],
             radius=3,
             color="black",
             fill=True,
@@ -95,30 +104,24 @@ def create_heatmap(df):
             popup=folium.Popup(popup_content, max_width=300)
         ).add_to(m)
 
-    # Affichage dans Streamlit
-    st_folium(m, use_container_width=True, height=600)
+    return m.get_root().render()
 
-def afficher_statistiques_temps(df):
+def afficher_statistiques_temps():
     # --- 📈 Évolution des tweets dans le temps ---
-
-    # Vérifiez que la colonne 'created_at' est bien au format datetime
-    if "created_at" in df.columns:
-        df["date"] = df["created_at"].dt.date  # Extraire uniquement la date
-        tweets_per_day = df.groupby("date").size().reset_index(name="Nombre_de_tweets")
-
-        fig_time = px.line(
-            tweets_per_day,
-            x="date",
-            y="Nombre_de_tweets",
-            title=" " \
-            "",
-            labels={"date": "Date", "Nombre_de_tweets": "Nombre de Tweets"},
-            markers=True
-        )
-        fig_time.update_layout(title_x=0.5, xaxis_title="Date", yaxis_title="Nombre de Tweets")
-        st.plotly_chart(fig_time, use_container_width=True)
-    else:
-        st.warning("La colonne 'created_at' est manquante ou mal formatée.")
+    tweets_per_day = chronologie.cube_tweets().serie("jour")[["date", "nb_tweets"]]
+    tweets_per_day = tweets_per_day.rename(columns={"nb_tweets": "Nombre_de_tweets"})
+
+    fig_time = px.line(
+        tweets_per_day,
+        x="date",
+        y="Nombre_de_tweets",
+        title=" " \
+        "",
+        labels={"date": "Date", "Nombre_de_tweets": "Nombre de Tweets"},
+        markers=True
+    )
+    fig_time.update_layout(title_x=0.5, xaxis_title="Date", yaxis_title="Nombre de Tweets")
+    st.plotly_chart(fig_time, use_container_width=True)
 
 def afficherHashtag(dataframes):
     # Vérifie la présence du fichier nécessaire
@@ -134,16 +137,13 @@ def afficherHashtag(dataframes):
         st.error("Colonnes attendues manquantes dans le DataFrame.")
         return
 
-    # Nettoyage des hashtags
-    df['hashtag_id'] = df['hashtag_id'].astype(str).str.lower().str.strip()
-
-    # Agrégation des occurrences
-    top_hashtag_ids = df.groupby('hashtag_id')['occurences'].sum().reset_index()
-    top_hashtag_ids = top_hashtag_ids.sort_values(by='occurences', ascending=False)
-
     # Slider interactif
     top_n = st.slider("Nombre de hashtags à afficher", min_value=5, max_value=30, value=10)
 
+    # Hashtags normalisés, occurrences cumulées
+    top_hashtag_ids = hashtags.classement_hashtags().top(top_n)[['hashtag', 'occurences']]
+    top_hashtag_ids = top_hashtag_ids.rename(columns={'hashtag': 'hashtag_id'})
+
     # Affichage du graphique
     fig = px.bar(
         top_hashtag_ids.head(top_n),
@@ -1,59 +1,14 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
+from donnees import export, influence, jointures
 
 def top_influenceurs(dataframes, labels):
     st.title("Top Influenceurs par Crise (Retweets + Réponses)")
 
-    tweets = dataframes["Tweet_date_clean"]
-    is_about = dataframes["is_about_clean"]
-    posted = dataframes["posted_clean"]
-    users = dataframes["User_clean"]
-    reply_user = dataframes["reply_tweet_to_user"]
-
-    # Normalisation
-    for df in [tweets, is_about, posted]:
-        df['tweet_id'] = df['tweet_id'].astype(str)
-    users['user_id'] = users['user_id'].astype(str)
-    reply_user['end_id'] = reply_user['end_id'].astype(str)
-
-    tweets_base = tweets.merge(posted, on="tweet_id", how="left").merge(is_about, on="tweet_id", how="left")
-
-    if 'reply_count' not in tweets_base.columns:
-        tweets_base['reply_count'] = 0
-
-    engagement = tweets_base.groupby(['user_id', 'event_id']).agg({
-        'tweet_id': 'count',
-        'retweet_count': 'sum',
-        'reply_count': 'sum'
-    }).reset_index()
-
-    engagement.rename(columns={
-        'tweet_id': 'nb_tweets',
-        'retweet_count': 'total_retweets',
-        'reply_count': 'total_replies'
-    }, inplace=True)
-
-    engagement['user_id'] = engagement['user_id'].astype(str)
-
-    #  Compter les vraies réponses reçues avec end_id
-    replies_received = reply_user['end_id'].value_counts().reset_index()
-    replies_received.columns = ['user_id', 'nb_replies_received']
-
-    #  Fusion avec engagement
-    engagement = engagement.merge(replies_received, on='user_id', how='left')
-    engagement['nb_replies_received'] = engagement['nb_replies_received'].fillna(0)
-
-    #  Score final = retweets + vraies réponses reçues
-    engagement['engagement_score'] = engagement['total_retweets'] + engagement['nb_replies_received']
-    engagement['retweet_ratio'] = engagement['total_retweets'] / engagement['nb_tweets']
-
-    # Fusion avec utilisateurs
-    engagement = engagement.merge(users[['user_id', 'screen_name', 'followers_count']], on='user_id', how='left')
-
-    #  Correspondance event_id -> label
-    id_to_label = list(labels.values())
-    engagement['event_name'] = engagement['event_id'].apply(lambda x: id_to_label[int(x)] if pd.notnull(x) and int(x) < len(id_to_label) else "inconnu")
+    # Engagement par (utilisateur, crise) : tweets + posted + is_about + réponses reçues + User_clean
+    # Score final = retweets + vraies réponses reçues
+    engagement = jointures.engagement("Tweet_date_clean")
+    # event_name : nom de la crise (Event_clean), rassemblé par le moteur de jointures
 
     st.markdown("### Statistiques Générales")
     if not engagement.empty:
@@ -95,6 +50,15 @@ def top_influenceurs(dataframes, labels):
         fig.update_layout(xaxis_tickangle=-45)
         st.plotly_chart(fig, use_container_width=True)
 
+        st.subheader("Influence dans le réseau d'interactions")
+        critere = st.selectbox("Classer par :", list(influence.CRITERES), format_func=influence.CRITERES.get)
+        top_reseau = influence.classement().top(selected_events, critere, top_n)
+        st.dataframe(
+            top_reseau[["screen_name"] + list(influence.CRITERES)].rename(columns={"screen_name": "Utilisateur", **influence.CRITERES}),
+            use_container_width=True,
+            hide_index=True
+        )
+
         st.subheader("Distribution du ratio retweets / tweets")
         fig_ratio = px.histogram(
             top_users,
@@ -112,9 +76,16 @@ def top_influenceurs(dataframes, labels):
             use_container_width=True
         )
 
-        st.download_button(
-            label="Télécharger les résultats en CSV",
-            data=top_users.to_csv(index=False).encode('utf-8'),
-            file_name="top_influenceurs_comparaison_crises.csv",
-            mime='text/csv'
-        )
+        # Export, produit à la demande
+        format_export = st.radio("Format d'export :", list(export.FORMATS), horizontal=True)
+        fichier = export.courant(st.session_state, "export_influenceurs", export.empreinte(top_users, format_=format_export))
+        if fichier is None and st.button("📦 Préparer l'export"):
+            fichier = export.preparer(st.session_state, "export_influenceurs", top_users, format_=format_export)
+        if fichier is not None:
+            with fichier.ouvrir() as f:
+                st.download_button(
+                    label="Télécharger les résultats",
+                    data=f,
+                    file_name=fichier.nom_fichier("top_influenceurs_comparaison_crises"),
+                    mime=fichier.mime
+                )
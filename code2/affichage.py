@@ -5,12 +5,12 @@ import pandas as pd
 import sentiment
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
 import gravite
 import aide
 import variables
 import interactions
 import categorie
+from donnees import composants, export, faits, facettes, geo, graphe, influence, pagination, partitions, regions, schema, spatial
 
 def accueil():
     st.title("Bienvenue sur le Tableau de bord des Tweets 📈")
@@ -42,8 +42,7 @@ def vueEnsemble(dataframes):
 
     # Chargement des données
     df = dataframes["Tweet_sentiment_localisation"]
-    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
-    df["topic"] = df["topic"].map(labels).fillna(df["topic"])
+    df["topic"] = schema.renommer_modalites(df["topic"], labels)
 
     #Chargement des données
     total_tweets = len(df)
@@ -69,7 +68,7 @@ def vueEnsemble(dataframes):
         st.write(f"- Tweets annotés : **{int(nb_annotated)}**")
         st.write(f"- Tweets de priorité haute : **{nb_high_priority}**")
     with col2:
-        general.afficher_statistiques_temps(df)
+        general.afficher_statistiques_temps(readable_topics=labels)
     with col3:
         general.create_heatmap(df)
     with col4: 
@@ -83,8 +82,7 @@ def suiviCrise(data):
 
     selected_label=st.selectbox("Crises",variables.getCrises(data))
     df= data["Tweet_sentiment_localisation"]
-    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
-    df_crisis= df[(df["topic"]==variables.getCrisesTrecis(data)[selected_label])]
+    df_crisis= partitions.partitions().extraire(df, variables.getCrisesTrecis(data)[selected_label])
     merged = variables.getMergedDemandeDaide(data)
     merged = merged[merged['event_id'] == selected_label]
     expanderGeneral=st.expander("General",expanded=True)
@@ -95,15 +93,13 @@ def suiviCrise(data):
             st.markdown(f"- **Dernier tweet** : {dernier_tweet.strftime('%Y-%m-%d %H:%M')}")
         col1,col2=st.columns([4,3])
         with col1:
-            general.afficherTimeline(merged)
+            general.afficherTimeline([selected_label])
         with col2:
-            general.afficherLocalisation(df_crisis)
+            general.afficherLocalisation(df_crisis, variables.getCrisesTrecis(data)[selected_label])
     expanderSentiment= st.expander("Sentiment",expanded=True)
     with expanderSentiment:
         sentiment.repartitionSentiment(df_crisis)
-        df_event = data["tweets_par_event"]
-        eventids = sorted(df_event['crise_id'].astype(str).unique())
-        df_selected = df_event[df_event['crise_id'].astype(str) == selected_label]
+        df_selected = faits.table_faits().crise(selected_label).rename(columns={"event_id": "crise_id"})
     expanderWordcloud= st.expander("Wordcloud mot revenant le plus")
     with expanderWordcloud:
         gravite.afficher_wordcloud_gravite(df_selected)
@@ -139,50 +135,103 @@ def recherchePersonalisee(dataframes):
         st.error("Le fichier 'Tweet_sentiment_localisation.csv' est manquant.")
         return
 
-    df = dataframes["Tweet_sentiment_localisation"].copy()
-    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
-    df["topic"] = df["topic"].map(labels).fillna(df["topic"])
+    # Copie superficielle : seule la colonne topic (catégorielle, renommée) est remplacée
+    df = dataframes["Tweet_sentiment_localisation"]
+    df["topic"] = schema.renommer_modalites(df["topic"], labels)
 
     st.markdown("Filtre les tweets selon tes propres critères 👇")
 
     # 🔤 Filtrage par mot-clé
-    keyword = st.text_input("🔤 Contient le mot-clé :")
+    keyword = st.text_input("🔤 Contient le mot-clé :",
+                            help='mot, préfixe* (ex. resc*), "expression exacte", plusieurs mots (ET), mot1 OU mot2')
+    # Recherche à facettes de la session : chaque facette est comptée sous les autres filtres
+    requete = facettes.requete(st.session_state)
     if keyword:
-        df = df[df["text"].str.contains(keyword, case=False, na=False)]
+        # Index inversé sur le texte des tweets ; le bitmap de la requête est gardé par le moteur
+        requete.definir_base(keyword, requete.moteur.bitmap_texte(keyword, df["text"]))
+    else:
+        requete.definir_base(None, None)
 
     # 📅 Filtrage par date
-    min_date = df["created_at"].min().date()
-    max_date = df["created_at"].max().date()
+    jours = requete.comptes("jour")
+    if jours.empty:
+        st.info("Aucun tweet ne correspond à ces mots-clés.")
+        return
+    min_date = jours.index.min().date()
+    max_date = jours.index.max().date()
     date_range = st.slider("📅 Plage de dates :", min_value=min_date, max_value=max_date,
                            value=(min_date, max_date))
-    df = df[(df["created_at"].dt.date >= date_range[0]) & (df["created_at"].dt.date <= date_range[1])]
+    if date_range == (min_date, max_date):
+        requete.filtrer("jour", None)
+    else:
+        requete.filtrer_periode("jour", *date_range)
 
     # 📍 Filtrage par lieu
-    lieux = df["lieu_extrait"].dropna().unique()
-    lieux_selectionnes = st.multiselect("📍 Lieu :", options=sorted(lieux))
-    if lieux_selectionnes:
-        df = df[df["lieu_extrait"].isin(lieux_selectionnes)]
+    lieux = requete.comptes("lieu_extrait")
+    lieux_selectionnes = st.multiselect("📍 Lieu :", options=sorted(lieux.index),
+                                        format_func=lambda lieu: f"{lieu} ({lieux[lieu]})")
+    requete.filtrer("lieu_extrait", lieux_selectionnes)
 
     # 🎭 Filtrage par sentiment
     sentiments =["Tous","Positif","Neutre","Negatif"]
     sentMap={"Positif":"positive","Negatif":"negative","Neutre":"neutral"}
+    comptes_sentiments = requete.comptes("sentiment")
     
     #sentiments_selectionnes = st.multiselect("🎭 Sentiment :", options=sorted(sentiments))
-    sentiments_selectionnes= st.pills("🎭 Sentiment :",options=sentiments,selection_mode="single",default="Tous")
-    if sentiments_selectionnes!="Tous":
-        df = df[df["sentiment"].isin([sentMap[sentiments_selectionnes]])]
+    sentiments_selectionnes= st.pills("🎭 Sentiment :",options=sentiments,selection_mode="single",default="Tous",
+                                      format_func=lambda s: s if s == "Tous" else f"{s} ({comptes_sentiments.get(sentMap[s], 0)})")
+    if sentiments_selectionnes in sentMap:
+        requete.filtrer("sentiment", [sentMap[sentiments_selectionnes]])
+    else:
+        requete.filtrer("sentiment", None)
+
+    # 🗺️ Filtrage par zone géographique
+    requete.filtrer_zone("zone", composants.choisir_zone("zone_recherche"))
+
+    # 🌍 Filtrage par pays
+    territoires = regions.regions() if regions.disponible() else None
+    if territoires is None:
+        st.info(regions.MESSAGE_FRONTIERES)
+    elif territoires:
+        comptes_pays = territoires.comptes_pays()
+        pays_selectionnes = st.multiselect("🌍 Pays :", options=sorted(comptes_pays.index),
+                                           format_func=lambda pays: f"{pays} ({comptes_pays[pays]})")
+        requete.filtrer_zone("pays", regions.Territoires(tuple(sorted(pays_selectionnes)), ()) if pays_selectionnes else None)
+
+    # 🧭 Répartition par crise des tweets filtrés
+    with st.expander("🧭 Tweets par crise"):
+        comptes_crises = requete.comptes("topic").rename(index=labels)
+        st.bar_chart(comptes_crises.sort_values(ascending=False))
 
     # 📄 Affichage des résultats
-    st.markdown(f"📄 **{len(df)} tweets** trouvés avec ces filtres.")
+    resultat = requete.resultat()
+    nb_resultats = resultat.compte()
+    st.markdown(f"📄 **{nb_resultats} tweets** trouvés avec ces filtres.")
+
+    # Seules les lignes de la page sont lues et envoyées au navigateur
+    col_tri, col_sens, col_taille, col_page = st.columns(4)
+    tri = col_tri.selectbox("Trier par :", list(pagination.COLONNES_TRI), format_func=pagination.COLONNES_TRI.get)
+    descendant = col_sens.radio("Ordre :", ["Décroissant", "Croissant"], horizontal=True) == "Décroissant"
+    taille_page = col_taille.selectbox("Tweets par page :", pagination.TAILLES_PAGE, index=1)
+    nb_pages = max(1, -(-nb_resultats // taille_page))
+    page = col_page.number_input(f"Page (sur {nb_pages}) :", min_value=1, max_value=nb_pages, value=1)
+    lignes = pagination.index_tri().page(resultat, tri, page - 1, taille_page, descendant)
     st.dataframe(
-        df[["created_at", "text", "sentiment", "lieu_extrait", "topic"]]
-        .sort_values("created_at", ascending=False),
-        use_container_width=True
+        df.iloc[lignes][["created_at", "text", "sentiment", "lieu_extrait", "topic"]],
+        use_container_width=True,
+        hide_index=True
     )
 
-    # ⬇️ Export CSV
-    csv = df.to_csv(index=False).encode('utf-8')
-    st.download_button("⬇️ Télécharger les résultats", data=csv, file_name="tweets_filtrés.csv", mime="text/csv")
+    # ⬇️ Export, produit à la demande
+    col_format, col_export = st.columns([2, 1])
+    format_export = col_format.radio("Format d'export :", list(export.FORMATS), horizontal=True)
+    fichier = export.courant(st.session_state, "export_recherche", export.empreinte(df, resultat, format_=format_export))
+    if fichier is None and col_export.button("📦 Préparer l'export"):
+        fichier = export.preparer(st.session_state, "export_recherche", df, resultat, format_=format_export)
+    if fichier is not None:
+        with fichier.ouvrir() as f:
+            col_export.download_button("⬇️ Télécharger les résultats", data=f,
+                                       file_name=fichier.nom_fichier("tweets_filtrés"), mime=fichier.mime)
 
 def comparateurCrises(dataframes):
     labels = variables.getTrecisCrises(dataframes)
@@ -217,9 +266,9 @@ def comparateurCrises(dataframes):
         st.warning("Veuillez choisir au moins une crise.")
         return
 
-    df_filtered = df[df["topic"].isin(selected_codes)]
+    df_filtered = partitions.partitions().extraire(df, selected_codes)
 
-    stats = df_filtered.groupby("topic").agg(
+    stats = df_filtered.groupby("topic", observed=True).agg(
         Nombre_de_tweets=("tweet_id", "count"),
         Total_retweets=("retweet_count", "sum"),
         Moyenne_likes=("favorite_count", "mean")
@@ -276,7 +325,7 @@ def comparateurCrises(dataframes):
 
     # --- 📈 Répartition du sentiment par crise ---
     st.subheader("💬 Répartition du sentiment par crise")
-    sentiment_counts = df_filtered.groupby(["topic", "sentiment"]).size().reset_index(name="count")
+    sentiment_counts = df_filtered.groupby(["topic", "sentiment"], observed=True).size().reset_index(name="count")
     sentiment_counts["topic"] = sentiment_counts["topic"].map(readable_topics)
 
     fig_sentiment = px.bar(
@@ -294,25 +343,34 @@ def comparateurCrises(dataframes):
     categorie.afficher_comparaison_categories_crises(df_filtered, readable_topics=readable_topics)
 
 def interaction_page(dataframes):
-    #TODO 
-    data=interactions.load_data_interaction(dataframes)
-    crises = list(data.keys())
+    crises = interactions.EVENEMENTS
     selected_crisis = st.selectbox("Sélectionnez une crise", crises)
     sample_size = st.slider("Taille de l'échantillon de tweets à afficher", min_value=50, max_value=1000, value=200, step=50)
-    event_df = data[selected_crisis]
     st.subheader(f"Graphe d'interactions pour la crise : {selected_crisis.capitalize()}")
-    G = interactions.create_graph(event_df, sample_size)
+    reseau = graphe.graphe_interactions()
+    effectifs = reseau.effectifs(faits.table_faits().crises_du_type(selected_crisis))
+    st.caption(f"Réseau complet : {reseau.nb_noeuds} utilisateurs, {reseau.nb_aretes} interactions ; "
+               f"crises de ce type : {effectifs['reponse']} réponses, {effectifs['mention']} mentions")
+    # Graphe échantillonné et sa disposition, mis en cache par (type de crise, taille
+    # d'échantillon) ; les arêtes du type de crise sont elles-mêmes gardées
+    G = interactions.graphe_evenement(selected_crisis, sample_size)
     # Affichage du graphe ou message si vide
-    if G.number_of_nodes() == 0:
+    if len(G.noeuds) == 0:
         st.warning("Aucun graphe à afficher pour cette crise.")
     else:
-        interactions.draw_graph(G)
+        interactions.draw_graph(G, dataframes["User_clean"])
 
         # Affichage des utilisateurs les plus actifs
         st.subheader("Utilisateurs les plus actifs dans ce graphe")
-        top_users_df = interactions.get_most_active_users(G, pd.read_csv("../CSV/User_clean.csv"))
+        top_users_df = interactions.get_most_active_users(G, dataframes["User_clean"])
         st.dataframe(top_users_df)
 
+    st.subheader("Utilisateurs les plus influents (réseau complet)")
+    critere = st.selectbox("Classer par :", list(influence.CRITERES), format_func=influence.CRITERES.get)
+    top_reseau = influence.classement().top(faits.table_faits().crises_du_type(selected_crisis), critere)
+    st.dataframe(top_reseau[["screen_name"] + list(influence.CRITERES)].rename(columns={"screen_name": "Utilisateur", **influence.CRITERES}),
+                 hide_index=True)
+
 
 
 def carteGlobale(dataframes):
@@ -331,54 +389,71 @@ def carteGlobale(dataframes):
         st.error("Colonnes nécessaires manquantes.")
         return
 
-    df_geo = df.dropna(subset=["latitude", "longitude", "retweet_count", "sentiment", "text"])
-    df_geo = df_geo[(df_geo["latitude"] != 0) & (df_geo["longitude"] != 0)]
+    # Tweets géolocalisés (coordonnées non nulles, infobulle complète)
+    points = geo.points_carte()
 
-    if df_geo.empty:
+    if len(points) == 0:
         st.warning("Aucun tweet géolocalisé trouvé.")
         return
 
     # Mapping inverse
     label_to_code = {v: k for k, v in labels.items()}
 
-    crises_codes = df_geo["topic"].dropna().unique()
+    crises_codes = points.partitions.valeurs
     crises_lisibles = [labels.get(code, code) for code in sorted(crises_codes)]
 
     selected_label = st.selectbox("📌 Filtrer par crise (facultatif)", options=["Toutes"] + crises_lisibles)
 
-    if selected_label != "Toutes":
-        selected_code = label_to_code.get(selected_label, selected_label)
-        df_geo = df_geo[df_geo["topic"] == selected_code]
+    crise = None if selected_label == "Toutes" else label_to_code.get(selected_label, selected_label)
 
-    if df_geo.empty:
+    if points.effectif(crise) == 0:
         st.warning("Aucun tweet trouvé pour cette crise.")
         return
 
-    # Filtrer par nombre minimal de retweets
-    min_retweet, max_retweet = int(df_geo["retweet_count"].min()), int(df_geo["retweet_count"].max())
+    # Filtrer par nombre minimal de retweets : bornes et seuil lus dans l'ordre pré-calculé
+    min_retweet, max_retweet = points.bornes(crise)
+    with st.expander("📊 Répartition des retweets"):
+        st.bar_chart(points.histogramme(crise))
     seuil_retweet = st.slider("🎚️ Nombre minimal de retweets à afficher :", min_value=min_retweet,
                               max_value=max_retweet, value=min_retweet, step=1)
 
-    df_geo = df_geo[df_geo["retweet_count"] >= seuil_retweet]
+    zone = composants.choisir_zone("zone_carte")
+    positions_zone = None if zone is None else spatial.index_spatial().positions(zone)
+
+    df_geo = points.au_moins(seuil_retweet, crise, positions_zone)
 
     if df_geo.empty:
         st.warning("Aucun tweet ne correspond au seuil de retweets.")
         return
 
-    # Ajouter un jitter pour éviter le chevauchement
-    np.random.seed(42)
-    df_geo["latitude_jitter"] = df_geo["latitude"] + np.random.uniform(-0.01, 0.01, size=len(df_geo))
-    df_geo["longitude_jitter"] = df_geo["longitude"] + np.random.uniform(-0.01, 0.01, size=len(df_geo))
-
-    df_geo["taille_point"] = df_geo["retweet_count"].apply(lambda x: max(5, min(x * 0.5, 40)))
-
-    # Choix de la vue : Points ou Heatmap pondérée
-    vue = st.radio("🗺️ Choisir la vue :", [
+    # Choix de la vue : Points, Heatmap pondérée ou, si des frontières sont disponibles,
+    # tweets par région
+    vues = [
         "📍 Carte des tweets (points)",
         "🔥 Heatmap pondérée (par retweets)"
-    ])
-
-    if vue == "📍 Carte des tweets (points)":
+    ]
+    if regions.disponible():
+        if regions.regions():
+            vues.append("🌍 Tweets par région")
+    else:
+        st.info(regions.MESSAGE_FRONTIERES)
+    vue = st.radio("🗺️ Choisir la vue :", vues)
+
+    if vue == "🌍 Tweets par région":
+        niveau = st.radio("Niveau :", ["region", "pays"], format_func={"region": "Région", "pays": "Pays"}.get, horizontal=True)
+        st.caption("Effectifs pré-calculés par crise, hors seuil de retweets et zone.")
+        effectifs = regions.regions().effectifs(None if crise is None else [crise], niveau)
+        fig = composants.figure_regions(effectifs, regions.geojson())
+
+    # Au-delà de geo.SEUIL_POINTS tweets : cellules agrégées, pré-calculées quand aucun
+    # seuil de retweets n'est appliqué
+    elif len(df_geo) > geo.SEUIL_POINTS:
+        crises = None if crise is None else [crise]
+        tout = seuil_retweet == min_retweet and zone is None
+        pas, cellules = geo.cellules(None if tout else df_geo, crises, par_sentiment=True)
+        st.caption(f"{len(df_geo)} tweets regroupés en {len(cellules)} cellules de {pas}°")
+        fig = general.figure_cellules(cellules, heatmap=vue == "🔥 Heatmap pondérée (par retweets)")
+    elif vue == "📍 Carte des tweets (points)":
         st.markdown("**🧭 Chaque point = un tweet | Taille = nombre de retweets | Couleur = sentiment**")
         fig = px.scatter_mapbox(
             df_geo,
@@ -399,6 +474,7 @@ def carteGlobale(dataframes):
 
     elif vue == "🔥 Heatmap pondérée (par retweets)":
         st.markdown("**🔸 Plus c'est chaud, plus la crise est retweetée dans la zone.**")
+        # Jitter pré-calculé pour éviter le chevauchement
         fig = go.Figure()
         fig.add_trace(go.Densitymapbox(
             lat=df_geo["latitude_jitter"],
@@ -6,13 +6,13 @@ import pandas as pd
 
 def getInfosAide(data):
         st.subheader("🚨 Données sur la demande d'aide")
-        sensitive_stats = data.groupby('event_type')['possibly_sensitive'].mean().reset_index()
+        sensitive_stats = data.groupby('event_type', observed=True)['possibly_sensitive'].mean().reset_index()
         sensitive_stats['possibly_sensitive'] *= 100
-        help_counts = data.groupby(['event_type', 'is_help']).size().reset_index(name='count')
+        help_counts = data.groupby(['event_type', 'is_help'], observed=True).size().reset_index(name='count')
         help_counts['type'] = help_counts['is_help'].map({True: 'Aide', False: 'Autres'})
 
        
-        help_stats = data.groupby('event_type')['is_help'].mean().reset_index(name='pourcentage_aide')
+        help_stats = data.groupby('event_type', observed=True)['is_help'].mean().reset_index(name='pourcentage_aide')
         help_stats['pourcentage_aide'] *= 100
         pourcentage = sensitive_stats['possibly_sensitive'][0]
         st.write(f"Pourcentage de tweets demandant de l'aide : {int(help_stats['pourcentage_aide'][0])}% ({help_counts['count'][1]} demande d'aides contre {help_counts['count'][0]} autres)")
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from donnees import listes
 
 def afficher_repartition_categories_crise(df, crise, readable_topics=None):
    
@@ -8,20 +9,9 @@ def afficher_repartition_categories_crise(df, crise, readable_topics=None):
     st.subheader("📚 Répartition des catégories de posts")
 
     # Filtrer sur la crise sélectionnée
-    df_filtered = df[df['topic'] == crise].copy()
+    df_filtered = df[df['topic'] == crise]
 
-    # Assurer que 'post_category' est bien une liste et exploser
-    df_filtered['post_category'] = df_filtered['post_category'].apply(
-        lambda x: eval(x) if isinstance(x, str) and x not in ["", "nan", "None"] else x
-    )
-    df_exploded = df_filtered.explode('post_category')
-
-    # Supprimer les valeurs nulles ou vides après explosion
-    df_exploded = df_exploded.dropna(subset=['post_category'])
-    df_exploded = df_exploded[df_exploded['post_category'].astype(str).str.strip() != ""]
-
-    # Groupby sur topic et post_category (même si une seule crise, pour cohérence)
-    category_counts = df_exploded.groupby(["topic", "post_category"]).size().reset_index(name="count")
+    category_counts = listes.pour(df_filtered, 'post_category').compter_par(df_filtered['topic'], 'post_category')
     if readable_topics:
         category_counts["topic"] = category_counts["topic"].map(readable_topics)
 
@@ -46,14 +36,7 @@ def afficher_comparaison_categories_crises(df, readable_topics=None):
   
     st.subheader("📚 Répartition des catégories de posts (Comparaison entre crises)")
 
-    # Assurer que 'post_category' est bien une liste et exploser
-    df['post_category'] = df['post_category'].apply(lambda x: eval(x) if isinstance(x, str) else x)
-    df_exploded = df.explode('post_category')
-
-    # Supprimer les valeurs nulles après explosion
-    df_exploded = df_exploded.dropna(subset=['post_category'])
-
-    category_counts = df_exploded.groupby(["topic", "post_category"]).size().reset_index(name="count")
+    category_counts = listes.pour(df, 'post_category').compter_par(df['topic'], 'post_category')
     if readable_topics:
         category_counts["topic"] = category_counts["topic"].map(readable_topics)
 
@@ -1,47 +1,59 @@
 import streamlit as st
 import folium
 from folium.plugins import HeatMap
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
 import plotly.express as px
+import plotly.graph_objects as go
 import numpy as np
+from donnees import chargement, chronologie, geo, hashtags, jointures, partitions
 
 def create_heatmap(df):
+    # Carte rendue une fois par version des données et par jeu de tweets affichés : les
+    # réexécutions de la page renvoient le HTML des geo.CARTES_GARDEES derniers filtres
+    html = chargement.structure_bornee("carte_chaleur", geo.signature_carte(df), lambda tables: _rendre_heatmap(df),
+                                       geo.CARTES_GARDEES)
+    if html is None:
+        st.warning("Aucune donnée géolocalisée trouvée.")
+        return
+
+    # Affichage dans Streamlit
+    components.html(html, height=600)
+
+
+def _rendre_heatmap(df):
     geo_df = df.dropna(subset=['latitude', 'longitude'])
 
     if geo_df.empty:
-        st.warning("Aucune donnée géolocalisée trouvée.")
-        return
+        return None
 
     map_center = [geo_df['latitude'].mean(), geo_df['longitude'].mean()]
     m = folium.Map(location=map_center, zoom_start=4)
 
-    # Ajout de la HeatMap
-    heat_data = geo_df[['latitude', 'longitude']].values.tolist()
+    # Ajout de la HeatMap : cellules pondérées par leur nombre de tweets au-delà de
+    # geo.SEUIL_POINTS tweets, sinon un point par tweet
+    if len(geo_df) > geo.SEUIL_POINTS:
+        _, cellules = geo.cellules(df)
+        heat_data = cellules[['latitude', 'longitude', 'nb_tweets']].values.tolist()
+    else:
+        heat_data = geo_df[['latitude', 'longitude']].values.tolist()
     HeatMap(heat_data, radius=15).add_to(m)
 
-    # Ajouter des marqueurs pour chaque crise
-    df_points = geo_df.drop_duplicates(subset="topic")
-    for _, row in df_points.iterrows():
-        topic = row["topic"]
-        crisis_df = geo_df[geo_df["topic"] == topic]
-        n_tweets = len(crisis_df)
-        n_positif = crisis_df[crisis_df["sentiment"] == "positive"].shape[0]
-        p_positif = (n_positif / n_tweets) * 100 if n_tweets > 0 else 0
-        exemple = crisis_df["text"].dropna().iloc[0][:100] + "..."
+    # Un marqueur par crise
+    for crise in geo.resume_crises(geo_df).itertuples(index=False):
         popup_content = f"""
-        <b>📌 Crise :</b> {topic}<br>
-        <b>🔢 Tweets :</b> {n_tweets}<br>
-        <b>🙂 % Positifs :</b> {p_positif:.1f}%<br>
-        <b>💬 Exemple :</b> {exemple}
+        <b>📌 Crise :</b> {crise.topic}<br>
+        <b>🔢 Tweets :</b> {crise.nb_tweets}<br>
+        <b>🙂 % Positifs :</b> {crise.part_positifs:.1f}%<br>
+        <b>💬 Exemple :</b> {crise.exemple}
         """
 
         # Ici, on ajoute plus d'informations au tooltip
         tooltip_content = f"""
-        <b>📌 Crise :</b> {topic}<br>
+        <b>📌 Crise :</b> {crise.topic}<br>
         """
 
         folium.CircleMarker(
-            location=[row["latitude"], row["longitude"]],
+            location=[crise.latitude, crise.longitude],
             radius=3,
             color="black",
             fill=True,
@@ -50,30 +62,26 @@ def create_heatmap(df):
             popup=folium.Popup(popup_content, max_width=300)
         ).add_to(m)
 
-    # Affichage dans Streamlit
-    st_folium(m, use_container_width=True, height=600)
+    return m.get_root().render()
 
-def afficher_statistiques_temps(df):
+def afficher_statistiques_temps(readable_topics=None):
     # --- 📈 Évolution des tweets dans le temps par topic ---
+    tweets_per_day_topic = chronologie.cube_tweets().serie("jour", par="crise")
+    tweets_per_day_topic = tweets_per_day_topic.rename(columns={"crise": "topic", "nb_tweets": "Nombre_de_tweets"})
+    if readable_topics:
+        tweets_per_day_topic['topic'] = tweets_per_day_topic['topic'].map(readable_topics).fillna(tweets_per_day_topic['topic'])
 
-    # Vérifiez que les colonnes 'created_at' et 'topic' sont présentes
-    if "created_at" in df.columns and "topic" in df.columns:
-        df["date"] = df["created_at"].dt.date  # Extraire uniquement la date
-        tweets_per_day_topic = df.groupby(["date", "topic"]).size().reset_index(name="Nombre_de_tweets")
-
-        fig_time = px.line(
-            tweets_per_day_topic,
-            x="date",
-            y="Nombre_de_tweets",
-            color="topic",
-            title="Évolution des tweets dans le temps par topic",
-            labels={"date": "Date", "Nombre_de_tweets": "Nombre de Tweets", "topic": "Topic"},
-            markers=True
-        )
-        fig_time.update_layout(title_x=0.5, xaxis_title="Date", yaxis_title="Nombre de Tweets")
-        st.plotly_chart(fig_time, use_container_width=True)
-    else:
-        st.warning("Les colonnes 'created_at' ou 'topic' sont manquantes ou mal formatées.")
+    fig_time = px.line(
+        tweets_per_day_topic,
+        x="date",
+        y="Nombre_de_tweets",
+        color="topic",
+        title="Évolution des tweets dans le temps par topic",
+        labels={"date": "Date", "Nombre_de_tweets": "Nombre de Tweets", "topic": "Topic"},
+        markers=True
+    )
+    fig_time.update_layout(title_x=0.5, xaxis_title="Date", yaxis_title="Nombre de Tweets")
+    st.plotly_chart(fig_time, use_container_width=True)
 
 def afficherHashtag(dataframes, readable_topics=None):
     # Vérifie la présence du fichier nécessaire
@@ -173,9 +181,11 @@ def afficher_repartition_par_topic(df):
     fig_topic_pie.update_traces(textinfo="percent+label")
     st.plotly_chart(fig_topic_pie, use_container_width=True)
 
-def afficherTimeline(data):
+def afficherTimeline(crises=None):
     st.subheader("📅 Évolution des tweets par jour")
-    daily_stats = data.groupby([data['created_at'].dt.date, 'event_type']).size().reset_index(name='tweets')
+    # Volume journalier des crises données (toutes si None), lu dans le cube chronologique
+    daily_stats = chronologie.cube_faits().serie("jour", crises=crises, par="event_type")
+    daily_stats = daily_stats.rename(columns={"date": "created_at", "nb_tweets": "tweets"})
     fig4 = px.line(daily_stats, x="created_at", y="tweets", color="event_type",
                     title="Nombre de tweets par jour et par crise",
                     labels={"created_at": "Date", "tweets": "Tweets", "event_type": "Crise"})
@@ -184,50 +194,9 @@ def afficherTimeline(data):
 
 #TODO debugger
 def afficherInfluenceur(dataframes,selected_label):
-    tweets = dataframes["Tweet_date_clean"]
-    is_about = dataframes["is_about_clean"]
-    posted = dataframes["posted_clean"]
-    users = dataframes["User_clean"]
-    reply_user = dataframes["reply_tweet_to_user"]
-
-    for df in [tweets, is_about, posted]:
-        df['tweet_id'] = df['tweet_id'].astype(str)
-    users['user_id'] = users['user_id'].astype(str)
-    reply_user['end_id'] = reply_user['end_id'].astype(str)
-
-    tweets_base = tweets.merge(posted, on="tweet_id", how="left").merge(is_about, on="tweet_id", how="left")
-
-    if 'reply_count' not in tweets_base.columns:
-        tweets_base['reply_count'] = 0
-
-    tweets_base = tweets_base[tweets_base['event_id'] == selected_label]
-
-    engagement = tweets_base.groupby('user_id').agg({
-        'tweet_id': 'count',
-        'retweet_count': 'sum',
-        'reply_count': 'sum'
-    }).reset_index()
-
-    engagement.rename(columns={
-        'tweet_id': 'nb_tweets',
-        'retweet_count': 'total_retweets',
-        'reply_count': 'total_replies'
-    }, inplace=True)
-
-    engagement['user_id'] = engagement['user_id'].astype(str)
-
-    replies_received = reply_user['end_id'].value_counts().reset_index()
-    replies_received.columns = ['user_id', 'nb_replies_received']
-
-    engagement = engagement.merge(replies_received, on='user_id', how='left')
-    engagement['nb_replies_received'] = engagement['nb_replies_received'].fillna(0)
-
-    # Score d'engagement
-    engagement['engagement_score'] = engagement['total_retweets'] + engagement['nb_replies_received']
-    engagement['retweet_ratio'] = engagement['total_retweets'] / engagement['nb_tweets']
-
-    engagement = engagement.merge(users[['user_id', 'screen_name', 'followers_count']], on='user_id', how='left')
-    engagement['event_name'] = selected_label  # on l’ajoute ici pour affichage
+    # Score d'engagement = retweets + réponses reçues
+    engagement = jointures.engagement("Tweet_date_clean")
+    engagement = engagement[engagement['event_name'] == selected_label]
 
     # Affichage
     st.markdown(f"### Influenceurs les plus influent sur {selected_label}")
@@ -266,39 +235,28 @@ def afficherInfluenceur(dataframes,selected_label):
 
 
 
-def afficherLocalisation(df):
-
-    df_geo = df.dropna(subset=["latitude", "longitude", "retweet_count", "sentiment", "text"])
-    df_geo = df_geo[(df_geo["latitude"] != 0) & (df_geo["longitude"] != 0)]
-
-    if df_geo.empty:
-        st.warning("Aucun tweet géolocalisé trouvé.")
-        return
-
-
-    # Filtrer par nombre minimal de retweets
-
-    if df_geo.empty:
-        st.warning("Aucun tweet ne correspond au seuil de retweets.")
-        return
-
-    # Ajouter un jitter pour éviter le chevauchement
-    np.random.seed(42)
-    df_geo["latitude_jitter"] = df_geo["latitude"] + np.random.uniform(-0.01, 0.01, size=len(df_geo))
-    df_geo["longitude_jitter"] = df_geo["longitude"] + np.random.uniform(-0.01, 0.01, size=len(df_geo))
-
-    df_geo["taille_point"] = df_geo["retweet_count"].apply(lambda x: max(5, min(x * 0.5, 40)))
-
-
-    
-    fig = px.scatter_mapbox(
-        df_geo,
+def figure_cellules(cellules, heatmap=False):
+    """Carte des cellules agrégées : un marqueur par cellule et sentiment."""
+    if heatmap:
+        fig = go.Figure()
+        fig.add_trace(go.Densitymapbox(
+            lat=cellules["latitude"],
+            lon=cellules["longitude"],
+            z=cellules["retweets"],
+            radius=30,
+            colorscale="YlGnBu",
+            showscale=True,
+            hoverinfo='skip'
+        ))
+        return fig
+    return px.scatter_mapbox(
+        cellules.assign(taille_point=np.sqrt(cellules["nb_tweets"])),
         lat="latitude",
         lon="longitude",
-        # hover_name="text",
-        # hover_data={"retweet_count": True, "sentiment": True},
+        hover_data={"nb_tweets": True, "retweets": True, "taille_point": False},
         size="taille_point",
-        color="sentiment",
+        size_max=40,
+        color="sentiment" if "sentiment" in cellules.columns else None,
         color_discrete_map={
             "positive": "green",
             "neutral": "gray",
@@ -308,6 +266,40 @@ def afficherLocalisation(df):
         height=700
     )
 
+
+def afficherLocalisation(df, crise=None):
+
+    df_geo = df.dropna(subset=["latitude", "longitude", "retweet_count", "sentiment", "text"])
+    df_geo = df_geo[(df_geo["latitude"] != 0) & (df_geo["longitude"] != 0)]
+
+    if df_geo.empty:
+        st.warning("Aucun tweet géolocalisé trouvé.")
+        return
+
+    # Au-delà de geo.SEUIL_POINTS tweets : cellules agrégées, lues dans le cube partagé
+    # pour une crise entière
+    if len(df_geo) > geo.SEUIL_POINTS:
+        _, cellules = geo.cellules(None if crise is not None else df, None if crise is None else [crise], par_sentiment=True)
+        fig = figure_cellules(cellules)
+    else:
+        df_geo = df_geo.assign(taille_point=(df_geo["retweet_count"] * 0.5).clip(5, 40))
+        fig = px.scatter_mapbox(
+            df_geo,
+            lat="latitude",
+            lon="longitude",
+            # hover_name="text",
+            # hover_data={"retweet_count": True, "sentiment": True},
+            size="taille_point",
+            color="sentiment",
+            color_discrete_map={
+                "positive": "green",
+                "neutral": "gray",
+                "negative": "red"
+            },
+            zoom=2,
+            height=700
+        )
+
     # Layout final
     fig.update_layout(
         mapbox=dict(
@@ -336,32 +328,20 @@ def afficherTopHashtagParCriseFromList(df, selected_topic, readable_topics=None)
     st.subheader(f"🏷️ Top hashtags pour la crise : {nom_crise}")
 
     # Filtrer sur la crise sélectionnée
-    df_crise = df[df["topic"] == selected_topic].copy()
+    df_crise = partitions.partitions().extraire(df, selected_topic)
     if df_crise.empty:
         st.info(f"Aucun tweet trouvé pour la crise : {nom_crise}")
         return
 
-    # S'assurer que 'hashtags' est une liste
-    df_crise['hashtags'] = df_crise['hashtags'].apply(
-        lambda x: eval(x) if isinstance(x, str) and x not in ["", "nan", "None"] else x
-    )
-    df_exploded = df_crise.explode('hashtags')
-
-    # Nettoyage
-    df_exploded = df_exploded.dropna(subset=['hashtags'])
-    df_exploded['hashtags'] = df_exploded['hashtags'].astype(str).str.lower().str.strip()
-    df_exploded = df_exploded[df_exploded['hashtags'] != ""]
-
-    # Comptage des hashtags
-    hashtag_counts = df_exploded['hashtags'].value_counts().reset_index()
-    hashtag_counts.columns = ['hashtag', 'occurences']
+    cube = hashtags.cube_tweets()
+    nb_hashtags = cube.nb_hashtags_crise(selected_topic)
 
-    if hashtag_counts.empty:
+    if nb_hashtags == 0:
         st.info(f"Aucun hashtag trouvé pour la crise : {nom_crise}")
         return
 
     # Adapter la borne max du slider au nombre de hashtags disponibles
-    max_n = min(30, len(hashtag_counts))
+    max_n = min(30, nb_hashtags)
     if max_n < 5:
         st.info(f"Moins de 5 hashtags trouvés pour la crise : {nom_crise}")
         top_n = max_n
@@ -370,7 +350,7 @@ def afficherTopHashtagParCriseFromList(df, selected_topic, readable_topics=None)
 
     # Affichage du graphique
     fig = px.bar(
-        hashtag_counts.head(top_n),
+        cube.top(top_n, crise=selected_topic),
         x='occurences',
         y='hashtag',
         orientation='h',
@@ -386,59 +366,21 @@ def afficherHashtag(df, readable_topics=None):
     df : DataFrame contenant au moins les colonnes 'topic' et 'hashtags' (liste ou str de liste)
     readable_topics : dict optionnel pour afficher le nom lisible de la crise
     """
-    df = df.copy()
-    # S'assurer que 'hashtags' est une liste
-    def to_list(x):
-        if isinstance(x, list):
-            return x
-        if isinstance(x, str) and x not in ["", "nan", "None"]:
-            try:
-                val = eval(x)
-                if isinstance(val, list):
-                    return val
-                return [val]
-            except:
-                return [x]
-        return []
-    df['hashtags'] = df['hashtags'].apply(to_list)
-    df_exploded = df.explode('hashtags')
-
-    # Nettoyage
-    df_exploded = df_exploded.dropna(subset=['hashtags', 'topic'])
-    df_exploded['hashtags'] = df_exploded['hashtags'].astype(str).str.lower().str.strip()
-    df_exploded['topic'] = df_exploded['topic'].astype(str).str.strip()
-    df_exploded = df_exploded[df_exploded['hashtags'] != ""]
-
-    # Remplacer les topics par leur nom lisible si fourni
-    if readable_topics:
-        df_exploded['topic'] = df_exploded['topic'].map(readable_topics).fillna(df_exploded['topic'])
-
-    # Grouper par hashtag et crise
-    hashtag_crise_counts = df_exploded.groupby(['hashtags', 'topic']).size().reset_index(name='occurences')
-
-    # Pour chaque hashtag, lister les crises associées (pour affichage dans le tableau)
-    hashtag_to_crises = hashtag_crise_counts.groupby('hashtags')['topic'].apply(lambda x: ', '.join(sorted(set(x)))).reset_index()
-    hashtag_to_crises.columns = ['hashtag', 'crises']
-
-    # Total occurrences par hashtag (toutes crises confondues)
-    total_counts = hashtag_crise_counts.groupby('hashtags')["occurences"].sum().reset_index()
-    total_counts = total_counts.sort_values(by='occurences', ascending=False)
-    total_counts = total_counts.rename(columns={'hashtags': 'hashtag'})
-
-    # Fusion pour affichage tableau
-    table = total_counts.merge(hashtag_to_crises, on='hashtag')
+    cube = hashtags.cube_tweets(df)
 
     # Slider interactif
-    max_n = min(30, len(table))
+    max_n = min(30, cube.nb_hashtags)
     if max_n < 5:
         st.info("Moins de 5 hashtags trouvés dans les données.")
         top_n = max_n
     else:
         top_n = st.slider("Nombre de hashtags à afficher", min_value=5, max_value=max_n, value=min(10, max_n), key="slider_hashtag_crise_all")
 
+    # Top hashtags et crises associées, lues dans la ligne creuse de chaque hashtag
+    table = cube.top(top_n, noms_crises=readable_topics)
+
     # Affichage du graphique barres groupées par crise
-    top_hashtags = table.head(top_n)['hashtag'].tolist()
-    df_plot = hashtag_crise_counts[hashtag_crise_counts['hashtags'].isin(top_hashtags)]
+    df_plot = cube.detail(top_n, noms_crises=readable_topics).rename(columns={'hashtag': 'hashtags'})
     fig = px.bar(
         df_plot,
         x='occurences',
@@ -453,4 +395,4 @@ def afficherHashtag(df, readable_topics=None):
 
     # Affichage du tableau hashtags + crises associées
     st.markdown("**Tableau des hashtags et crises associées :**")
-    st.dataframe(table.head(top_n), use_container_width=True)
+    st.dataframe(table, use_container_width=True)
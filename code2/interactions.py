@@ -1,115 +1,170 @@
 import streamlit as st
 import pandas as pd
-import networkx as nx
-import matplotlib.pyplot as plt
-import re
+import plotly.graph_objects as go
+import numpy as np
+from collections import namedtuple
+from donnees import chargement, disposition, tableaux
+
+
+# Types d'arêtes du graphe d'interactions (Aretes.type est un indice dans cette liste)
+TYPES_ARETES = ["mention", "retweet"]
+
+# Arêtes d'un type d'événement : tableaux numpy alignés (source, cible, type) et ligne
+# du tweet concerné dans la table d'événements (pour l'échantillonnage)
+Aretes = namedtuple("Aretes", ["source", "cible", "type", "ligne", "nb_tweets"])
+
+
+def _ids(serie):
+    # Numéros de nœuds en float64 (exacts jusqu'à 2**53) pour que les valeurs
+    # manquantes deviennent NaN ; elles sont écartées par l'appelant
+    return pd.to_numeric(serie, errors="coerce").to_numpy(dtype=np.float64)
+
+
+def aretes_interactions(event_df, users_df, retweets_df):
+    """
+    Arêtes tweet → utilisateur mentionné et retweeter → tweet d'un type d'événement,
+    calculées en une passe vectorisée (mentions par str.extractall, jointure par hachage
+    screen_name → user_id, retweets regroupés par original_user_id).
+    """
+    tweet_ids = _ids(event_df["tweet_id"])
+
+    # Mentions « @nom » du texte, associées à l'utilisateur correspondant dans User_clean
+    mentions = event_df["text"].astype(str).reset_index(drop=True).str.extractall(r"@(\w+)")[0]
+    # En cas de screen_name en double, la dernière ligne l'emporte (comme to_dict)
+    utilisateurs = users_df.drop_duplicates("screen_name", keep="last")
+    rangs = pd.Index(utilisateurs["screen_name"]).get_indexer(mentions.to_numpy())
+    trouvees = rangs >= 0
+    lignes_mention = mentions.index.get_level_values(0).to_numpy()[trouvees]
+    cibles_mention = _ids(utilisateurs["user_id"])[rangs[trouvees]]
+
+    # Retweets : retweeters regroupés par original_user_id (tableau trié), puis une
+    # recherche dichotomique par tweet donne sa plage de retweeters
+    originaux = _ids(retweets_df["original_user_id"])
+    ordre = np.argsort(originaux, kind="stable")
+    originaux_tries = originaux[ordre]
+    retweeters = _ids(retweets_df["retweeter_id"])[ordre]
+    debuts = np.searchsorted(originaux_tries, tweet_ids, side="left")
+    fins = np.searchsorted(originaux_tries, tweet_ids, side="right")
+    elements, lignes_retweet = tableaux.plages(debuts, np.where(np.isnan(tweet_ids), debuts, fins), intervalles=True)
+    sources_retweet = retweeters[elements]
+
+    source = np.concatenate([tweet_ids[lignes_mention], sources_retweet])
+    cible = np.concatenate([cibles_mention, tweet_ids[lignes_retweet]])
+    type_ = np.concatenate([np.zeros(len(lignes_mention), dtype=np.int8), np.ones(len(lignes_retweet), dtype=np.int8)])
+    ligne = np.concatenate([lignes_mention, lignes_retweet])
+    valides = ~(np.isnan(source) | np.isnan(cible))
+    return Aretes(source[valides].astype(np.int64), cible[valides].astype(np.int64), type_[valides],
+                  ligne[valides].astype(np.int64), len(event_df))
+
+
+# Graphe échantillonné prêt à afficher : identifiants des nœuds, arêtes en indices de
+# nœuds (une par couple source → cible, comme un DiGraph), degrés et positions
+GrapheEchantillon = namedtuple("GrapheEchantillon", ["noeuds", "source", "cible", "type", "degres", "positions"])
+
+
+# --- Arêtes d'un échantillon aléatoire de tweets (évite un graphe trop dense)
+def echantillon(aretes, sample_size):
+    if aretes.nb_tweets > sample_size:
+        lignes = pd.Series(np.arange(aretes.nb_tweets)).sample(n=sample_size, random_state=42).to_numpy()
+        garde = np.isin(aretes.ligne, lignes)
+    else:
+        garde = np.ones(len(aretes.ligne), dtype=bool)
+    # Une arête par couple (source, cible) ; la dernière rencontrée donne le type
+    couples = pd.DataFrame({"source": aretes.source[garde], "cible": aretes.cible[garde], "type": aretes.type[garde]})
+    couples = couples.drop_duplicates(["source", "cible"], keep="last")
+    return couples["source"].to_numpy(), couples["cible"].to_numpy(), couples["type"].to_numpy()
+
+
+# --- Graphe orienté de l'échantillon : nœuds renumérotés, degrés (entrants + sortants) et disposition
+def create_graph(aretes, sample_size):
+    source, cible, types = echantillon(aretes, sample_size)
+    noeuds, locaux = np.unique(np.concatenate([source, cible]), return_inverse=True)
+    source, cible = locaux[:len(source)], locaux[len(source):]
+    degres = np.bincount(locaux, minlength=len(noeuds))
+    positions = disposition.disposition(len(noeuds), source, cible)
+    return GrapheEchantillon(noeuds, source, cible, types, degres, positions)
+
+
+# Graphes disposés gardés en cache, les moins récemment affichés évincés
+GRAPHES_GARDES = 12
+
+
+def graphe_evenement(event_type, sample_size, csv_path=chargement.CSV_PATH):
+    """Graphe échantillonné et sa disposition, gardés par (type de crise, taille d'échantillon)."""
+    return chargement.structure_bornee(
+        "interactions/graphe", (event_type, sample_size),
+        lambda tables: create_graph(aretes_evenement(event_type, csv_path), sample_size),
+        GRAPHES_GARDES, csv_path,
+    )
 
 
-def add_mentions_and_retweets_to_event(event_df, users_df, retweets_df):
-    event_df['mentions'] = event_df['text'].apply(extract_mentions)  # Extraire les mentions textuelles
-    user_dict = users_df.set_index('screen_name').to_dict(orient='index')  # Dictionnaire screen_name → infos utilisateur
+def _libelles(noeuds, users_df):
+    # screen_name des utilisateurs, « (Tweet id) » pour les autres nœuds
+    utilisateurs = users_df.drop_duplicates("user_id", keep="last")
+    rangs = pd.Index(utilisateurs["user_id"]).get_indexer(noeuds)
+    noms = utilisateurs["screen_name"].to_numpy(dtype=object)
+    return np.where(rangs >= 0, noms[rangs], np.char.add(np.char.add("(Tweet ", noeuds.astype(str)), ")").astype(object))
 
-    # Associer chaque mention à l'utilisateur correspondant dans User_clean.csv
-    event_df['mentioned_users'] = event_df['mentions'].apply(lambda lst: [user_dict.get(m, {}) for m in lst])
 
-    # Ajouter les retweeters (liens retweet → tweet original)
-    event_df['retweets'] = event_df['tweet_id'].apply(
-        lambda x: retweets_df[retweets_df['original_user_id'] == x]['retweeter_id'].tolist()
+# --- Renvoie un DataFrame des utilisateurs avec le plus grand nombre d'interactions (degrés)
+def get_most_active_users(graphe, users_df, top_n=10):
+    top = np.argsort(-graphe.degres, kind="stable")[:top_n]
+    return pd.DataFrame({
+        "Utilisateur": _libelles(graphe.noeuds[top], users_df),
+        "Interactions": graphe.degres[top],
+    })
+
+
+def _segments(graphe, masque):
+    # Coordonnées des arêtes retenues, séparées par des NaN (une seule trace par type)
+    x = np.column_stack([graphe.positions[graphe.source[masque], 0], graphe.positions[graphe.cible[masque], 0],
+                         np.full(masque.sum(), np.nan)]).ravel()
+    y = np.column_stack([graphe.positions[graphe.source[masque], 1], graphe.positions[graphe.cible[masque], 1],
+                         np.full(masque.sum(), np.nan)]).ravel()
+    return x, y
+
+
+# --- Affiche le graphe en WebGL (Scattergl), avec infobulle et légende des types d'interaction
+def draw_graph(graphe, users_df):
+    fig = go.Figure()
+    for code, (nom, couleur) in enumerate([("Mentions", "violet"), ("Retweets", "deeppink")]):
+        x, y = _segments(graphe, graphe.type == code)
+        fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name=nom, line=dict(color=couleur, width=1),
+                                   opacity=0.6, hoverinfo="skip"))
+
+    # Taille proportionnelle au degré, calculée en une passe
+    tailles = np.clip(4 + 2 * np.sqrt(graphe.degres), 4, 40)
+    fig.add_trace(go.Scattergl(
+        x=graphe.positions[:, 0],
+        y=graphe.positions[:, 1],
+        mode="markers",
+        name="Nœuds",
+        marker=dict(size=tailles, color="lightblue", line=dict(color="steelblue", width=0.5)),
+        text=_libelles(graphe.noeuds, users_df),
+        customdata=graphe.degres,
+        hovertemplate="%{text}<br>Interactions : %{customdata}<extra></extra>",
+    ))
+    fig.update_layout(
+        height=700,
+        showlegend=True,
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, scaleanchor="x"),
+        margin={"r": 0, "t": 0, "l": 0, "b": 0},
     )
-    return event_df
-
-# --- Crée un graphe NetworkX dirigé à partir des mentions et retweets
-def create_graph(event_data, sample_size):
-    # On prend un échantillon aléatoire pour éviter un graphe trop dense
-    sampled = event_data.sample(n=sample_size, random_state=42) if len(event_data) > sample_size else event_data
-    G = nx.DiGraph()  # Graphe orienté
+    st.plotly_chart(fig, use_container_width=True)
 
-    for _, row in sampled.iterrows():
-        tid = row['tweet_id']  # ID du tweet
 
-        # Ajouter les arêtes tweet → utilisateur mentionné
-        for mention, user in zip(row['mentions'], row['mentioned_users']):
-            if user and 'user_id' in user:
-                G.add_edge(tid, user['user_id'], type='mention')
+# Types de crise proposés par la page, dans l'ordre d'affichage
+EVENEMENTS = ['bombing', 'earthquake', 'wildfire', 'flood', 'typhoon', 'shooting']
 
-        # Ajouter les arêtes utilisateur retweeter → tweet
-        for retweeter_id in row['retweets']:
-            if pd.notna(retweeter_id):
-                G.add_edge(retweeter_id, tid, type='retweet')
 
-    return G
-
-# --- Renvoie un DataFrame des utilisateurs avec le plus grand nombre d'interactions (degrés)
-def get_most_active_users(G, users_df, top_n=10):
-    deg = dict(G.degree())  # degré total (entrants + sortants)
-    top_nodes = sorted(deg.items(), key=lambda x: x[1], reverse=True)[:top_n]
-
-    # Créer un dictionnaire user_id → screen_name pour affichage
-    user_map = users_df.set_index('user_id')['screen_name'].to_dict()
-
-    results = []
-    for node, interactions in top_nodes:
-        if node in user_map:
-            label = user_map[node]
-        elif isinstance(node, int):  # tweet_id probable
-            label = f"(Tweet {node})"
-        else:
-            label = f"(Inconnu: {node})"
-        results.append((label, interactions))
-
-    return pd.DataFrame(results, columns=["Utilisateur", "Interactions"])
-
-
-# --- Affiche le graphe avec NetworkX + Matplotlib et légende personnalisée
-def draw_graph(G):
-    pos = nx.spring_layout(G, seed=42, k=0.2)  # disposition des nœuds
-    node_sizes = [dict(G.degree())[n]*50 for n in G.nodes]  # Taille proportionnelle au degré
-
-    plt.figure(figsize=(10, 8))
-
-    edges = G.edges(data=True)
-    edge_colors = ['violet' if e[2]['type'] == 'mention' else 'deeppink' for e in edges]  # Couleurs personnalisées
-
-    # Dessin du graphe
-    nx.draw(
-        G, pos,
-        with_labels=False,
-        node_size=node_sizes,
-        node_color="lightblue",
-        edge_color=edge_colors,
-        width=1.5,
-        alpha=0.7,
-        arrows=True
+def aretes_evenement(event_type, csv_path=chargement.CSV_PATH):
+    """
+    Arêtes d'interactions d'un type de crise, calculées à la première demande puis
+    gardées par version des données ; les tables sources ne sont pas modifiées.
+    """
+    return chargement.structure_derivee(
+        f"interactions/{event_type}",
+        lambda tables: aretes_interactions(tables[f"tweets_{event_type}"], tables["User_clean"], tables["retweets_clean"]),
+        csv_path,
     )
-
-    # Légende des types d’interaction
-    mention_line = plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='violet', label='Mentions')
-    retweet_line = plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='deeppink', label='Retweets')
-    plt.legend(handles=[mention_line, retweet_line])
-    st.pyplot(plt)
-
-def load_data_interaction(data):
-# Chargement des utilisateurs et des relations de retweets
-    
-    users = data["User_clean"]
-    retweets = data["retweets_clean"]
-    
-    # Chargement des tweets pour chaque type de crise
-    events = {
-        'bombing': data["tweets_bombing"],
-        'earthquake': data["tweets_earthquake"],
-        'wildfire': data["tweets_wildfire"],
-        'flood': data["tweets_flood"],
-        'typhoon': data["tweets_typhoon"],
-        'shooting': data["tweets_shooting"]
-    }
-
-    # Enrichissement des données pour chaque type de crise
-    enriched = {}
-    for name, df in events.items():
-        enriched[name] = add_mentions_and_retweets_to_event(df, users, retweets)
-
-    return enriched
-
-def extract_mentions(text):
-    return re.findall(r'@(\w+)', str(text))
\ No newline at end of file
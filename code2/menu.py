@@ -1,8 +1,16 @@
 import streamlit as st
+import os
+import sys
+
+# Accès à la couche de données partagée (../donnees)
+racine_projet = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+if racine_projet not in sys.path:
+    sys.path.append(racine_projet)
 
 import affichage
 import base64
 import variables
+from donnees import chargement
 # Configuration de la page
 st.set_page_config(
     page_title="Tableau de bord des Tweets",
@@ -11,9 +19,6 @@ st.set_page_config(
 )
 
 
-import os
-import pandas as pd
-
 # Injection de CSS personnalisé via st.markdown
 st.markdown("""
     <style>
@@ -94,15 +99,11 @@ def add_bg_from_local(image_file):
 
 # """
 # Importation du data dans le repertoire CSV
+# (chargé une seule fois par processus, rechargé si un fichier change)
 csv_path = "../CSV"
-dataframes = {}
-
-for file_name in os.listdir(csv_path):
-    if file_name.endswith('.csv'):
-        file_path = os.path.join(csv_path, file_name)
-        df_name = os.path.splitext(file_name)[0]
-        dataframes[df_name] = pd.read_csv(file_path, low_memory=False)
-        
+dataframes = chargement.charger_dataframes(csv_path)
+
+
 page = st.sidebar.radio("Navigation", [
         "Accueil",
         "Vue d’ensemble",
@@ -0,0 +1 @@
+"""Couche de données partagée par les deux versions du tableau de bord (code/ et code2/)."""
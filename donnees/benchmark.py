@@ -0,0 +1,101 @@
+"""Compare le chargement historique (boucle read_csv) au chargement par instantanés.
+
+Chaque méthode est mesurée dans un processus neuf pour que la mémoire résidente
+de l'une ne pollue pas l'autre.
+
+Utilisation :
+    python -m donnees.benchmark [csv_path] [--repetitions N]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import pandas as pd
+
+from donnees import chargement, snapshot
+
+
+def _rss_mo():
+    # Mémoire résidente courante (Linux : /proc, sinon pic via getrusage)
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        diviseur = 2**20 if sys.platform == "darwin" else 2**10
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / diviseur
+
+
+def charger_read_csv(csv_path):
+    # Boucle d'origine des deux menu.py
+    dataframes = {}
+    for file_name in os.listdir(csv_path):
+        if file_name.endswith('.csv'):
+            file_path = os.path.join(csv_path, file_name)
+            df_name = os.path.splitext(file_name)[0]
+            dataframes[df_name] = pd.read_csv(file_path, low_memory=False)
+    return dataframes
+
+
+def charger_snapshots(csv_path):
+    return {
+        nom: snapshot.lire_snapshot(snapshot.chemin_snapshot(file_path))
+        for nom, file_path in chargement.lister_csv(csv_path).items()
+    }
+
+
+METHODES = {
+    "read_csv": charger_read_csv,
+    "snapshots": charger_snapshots,
+}
+
+
+def _mesurer(nom_methode, csv_path, file_resultats):
+    rss_avant = _rss_mo()
+    debut = time.perf_counter()
+    dataframes = METHODES[nom_methode](csv_path)
+    duree = time.perf_counter() - debut
+    rss_apres = _rss_mo()
+    pandas_mo = sum(df.memory_usage(deep=True).sum() for df in dataframes.values()) / 2**20
+    file_resultats.put((duree, rss_apres - rss_avant, pandas_mo))
+
+
+def mesurer(nom_methode, csv_path, repetitions=3):
+    contexte = multiprocessing.get_context("spawn")
+    resultats = []
+    for _ in range(repetitions):
+        file_resultats = contexte.Queue()
+        processus = contexte.Process(target=_mesurer, args=(nom_methode, csv_path, file_resultats))
+        processus.start()
+        resultats.append(file_resultats.get())
+        processus.join()
+    # Meilleur temps, mémoire de la même exécution
+    return min(resultats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du chargement des données.")
+    parser.add_argument("csv_path", nargs="?", default=chargement.CSV_PATH)
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    if not snapshot.disponible():
+        parser.error("pyarrow est nécessaire pour le benchmark (pip install pyarrow)")
+    snapshot.compiler_repertoire(args.csv_path)
+
+    mesures = {nom: mesurer(nom, args.csv_path, args.repetitions) for nom in METHODES}
+
+    print(f"{'méthode':<12}{'temps (s)':>12}{'RSS (Mo)':>12}{'pandas (Mo)':>14}")
+    for nom, (duree, rss, pandas_mo) in mesures.items():
+        print(f"{nom:<12}{duree:>12.3f}{rss:>12.1f}{pandas_mo:>14.1f}")
+
+    reference, rapide = mesures["read_csv"], mesures["snapshots"]
+    print(f"\nAccélération : x{reference[0] / rapide[0]:.1f} | "
+          f"mémoire résidente : x{reference[1] / max(rapide[1], 1e-6):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Index bitmap des colonnes catégorielles de Tweet_sentiment_localisation.
+
+Pour chaque modalité d'une colonne (sentiment, topic, lieu_extrait, priorité, aide,
+contenu sensible...), l'ensemble des lignes qui la portent est stocké sous forme
+compressée : liste triée de positions pour une modalité rare, bitset (8 lignes par
+octet) sinon. Les filtres des pages se combinent par ET / OU bit à bit et les effectifs
+s'obtiennent par comptage de bits, sans repasser sur les lignes du tableau.
+"""
+import numpy as np
+import pandas as pd
+
+from donnees import chargement, jointures
+
+COLONNES = ["sentiment", "topic", "lieu_extrait", "annotation_postPriority", "possibly_sensitive"]
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(octets):
+        return int(np.bitwise_count(octets).sum(dtype=np.int64))
+else:  # numpy < 2.0
+    _BITS_PAR_OCTET = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+    def _popcount(octets):
+        return int(_BITS_PAR_OCTET[octets].sum(dtype=np.int64))
+
+
+class Bitmap:
+    """Ensemble de lignes parmi taille : positions triées (creux) ou bitset (dense)."""
+
+    def __init__(self, taille, positions=None, octets=None):
+        self.taille = taille
+        self._positions = positions
+        self._octets = octets
+
+    @classmethod
+    def depuis_positions(cls, positions, taille):
+        positions = np.asarray(positions, dtype=np.int32)
+        # Au-delà d'une ligne sur 32, le bitset est plus compact que les positions
+        if len(positions) * 32 > taille:
+            return cls.depuis_masque(_masque(positions, taille))
+        return cls(taille, positions=positions)
+
+    @classmethod
+    def depuis_masque(cls, masque):
+        masque = np.asarray(masque, dtype=bool)
+        return cls(len(masque), octets=np.packbits(masque))
+
+    @classmethod
+    def plein(cls, taille):
+        return cls.depuis_masque(np.ones(taille, dtype=bool))
+
+    @property
+    def creux(self):
+        return self._octets is None
+
+    def octets(self):
+        if self._octets is None:
+            return np.packbits(_masque(self._positions, self.taille))
+        return self._octets
+
+    def positions(self):
+        if self._positions is None:
+            return np.flatnonzero(np.unpackbits(self._octets, count=self.taille)).astype(np.int32)
+        return self._positions
+
+    def contient(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        if self.creux:
+            return np.isin(positions, self._positions)
+        return ((self._octets[positions >> 3] >> (7 - (positions & 7))) & 1).astype(bool)
+
+    def compte(self):
+        if self.creux:
+            return len(self._positions)
+        return _popcount(self._octets)
+
+    def __and__(self, autre):
+        if self.creux:
+            return Bitmap(self.taille, positions=self._positions[autre.contient(self._positions)])
+        if autre.creux:
+            return autre & self
+        return Bitmap(self.taille, octets=self._octets & autre._octets)
+
+    def __or__(self, autre):
+        if self.creux and autre.creux:
+            return Bitmap.depuis_positions(np.union1d(self._positions, autre._positions), self.taille)
+        return Bitmap(self.taille, octets=self.octets() | autre.octets())
+
+    def __invert__(self):
+        octets = ~self.octets()
+        # Les bits de bourrage du dernier octet restent à 0
+        if self.taille % 8:
+            octets[-1] &= np.uint8((0xFF << (8 - self.taille % 8)) & 0xFF)
+        return Bitmap(self.taille, octets=octets)
+
+
+def _masque(positions, taille):
+    masque = np.zeros(taille, dtype=bool)
+    masque[positions] = True
+    return masque
+
+
+def union(bitmaps, taille):
+    """OU de tous les bitmaps en une passe (positions fusionnées ou bitsets réduits ensemble)."""
+    bitmaps = list(bitmaps)
+    if all(bitmap.creux for bitmap in bitmaps):
+        positions = [bitmap.positions() for bitmap in bitmaps]
+        return Bitmap.depuis_positions(np.unique(np.concatenate(positions)) if positions else [], taille)
+    return Bitmap(taille, octets=np.bitwise_or.reduce([bitmap.octets() for bitmap in bitmaps]))
+
+
+def intersection(bitmaps):
+    """ET de tous les bitmaps (au moins un) en une passe ; None si la liste est vide."""
+    bitmaps = list(bitmaps)
+    if not bitmaps:
+        return None
+    creux = [bitmap for bitmap in bitmaps if bitmap.creux]
+    if not creux:
+        return Bitmap(bitmaps[0].taille, octets=np.bitwise_and.reduce([bitmap.octets() for bitmap in bitmaps]))
+    # Les positions du plus petit bitmap creux sont testées contre tous les autres
+    plus_petit = min(creux, key=Bitmap.compte)
+    positions = plus_petit.positions()
+    for bitmap in bitmaps:
+        if bitmap is not plus_petit and len(positions):
+            positions = positions[bitmap.contient(positions)]
+    return Bitmap(plus_petit.taille, positions=positions)
+
+
+class IndexBitmap:
+    def __init__(self, colonnes, taille):
+        self.taille = taille
+        self.bitmaps = {}
+        # Code de modalité de chaque ligne (-1 : valeur manquante), pour les effectifs
+        self.codes = {}
+        for nom, serie in colonnes.items():
+            codes, modalites = pd.factorize(serie, sort=True)
+            self.codes[nom] = (codes.astype(np.int32), list(modalites))
+            ordre = np.argsort(codes, kind="stable")
+            bornes = np.searchsorted(codes[ordre], np.arange(len(modalites) + 1))
+            self.bitmaps[nom] = {
+                modalite: Bitmap.depuis_positions(ordre[bornes[i]:bornes[i + 1]], taille)
+                for i, modalite in enumerate(modalites)
+            }
+
+    def tous(self):
+        return Bitmap.plein(self.taille)
+
+    def valeur(self, colonne, modalite):
+        return self.bitmaps[colonne].get(modalite, Bitmap(self.taille, positions=np.empty(0, dtype=np.int32)))
+
+    def parmi(self, colonne, modalites):
+        return union((self.valeur(colonne, modalite) for modalite in modalites), self.taille)
+
+    def comptes(self, colonne, filtre=None):
+        """Effectif de chaque modalité de colonne parmi les lignes de filtre (toutes si None)."""
+        codes, modalites = self.codes[colonne]
+        if filtre is not None:
+            codes = codes[filtre.positions()]
+        comptes = np.bincount(codes[codes >= 0], minlength=len(modalites))
+        return pd.Series(comptes, index=pd.Index(modalites, dtype=object), dtype="int64")
+
+    def modalites(self, colonne, filtre=None):
+        """Modalités de colonne présentes dans filtre (toutes si filtre est None)."""
+        return [m for m, bitmap in self.bitmaps[colonne].items()
+                if filtre is None or (bitmap & filtre).compte() > 0]
+
+
+def _construire(tables, table):
+    df = tables[table]
+    colonnes = {nom: df[nom] for nom in COLONNES if nom in df.columns}
+    # Jour de publication (facette date de la recherche)
+    if "created_at" in df.columns:
+        colonnes["jour"] = df["created_at"].dt.floor("D")
+    # Demande d'aide : tweet présent dans help_requests
+    if "help_requests" in tables:
+        positions = jointures.MoteurJointures(tables).positions("help_requests", "tweet_id", df["tweet_id"])
+        colonnes["is_help"] = pd.Series(positions >= 0)
+    # Tweet affichable sur la carte : coordonnées non nulles et champs de l'infobulle renseignés
+    geo = df.reindex(columns=["latitude", "longitude", "retweet_count", "sentiment", "text"])
+    colonnes["geolocalise"] = pd.Series(
+        geo.notna().all(axis=1).to_numpy() & (geo["latitude"] != 0).to_numpy() & (geo["longitude"] != 0).to_numpy()
+    )
+    return IndexBitmap(colonnes, len(df))
+
+
+def index_bitmaps(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    return chargement.structure_derivee(f"bitmaps/{table}", lambda tables: _construire(tables, table), csv_path)
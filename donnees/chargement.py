@@ -0,0 +1,137 @@
+"""Chargement des tables du répertoire CSV, partagé entre toutes les sessions Streamlit.
+
+Streamlit ré-exécute menu.py à chaque interaction, mais les modules importés restent
+en mémoire : l'état ci-dessous vit donc une seule fois par processus. Un fichier n'est
+relu que lorsque sa date de modification ou sa taille change, et la lecture passe par
+les instantanés colonnaires de donnees.snapshot.
+"""
+import collections
+import os
+import threading
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "CSV")
+
+# Fichiers non tabulaires du répertoire CSV dont dépendent des structures dérivées
+# (frontières de donnees/regions.py) : les modifier invalide aussi ces structures
+FICHIERS_ANNEXES = ("frontieres.geojson",)
+
+# RLock : une structure dérivée peut en construire une autre (cf. structure_derivee)
+_verrou = threading.RLock()
+_entrepots = {}
+
+
+class _Entrepot:
+    # Tables d'un répertoire CSV + signatures (mtime, taille) des fichiers lus
+    def __init__(self):
+        self.tables = {}
+        self.signatures = {}
+        self.version = 0
+        self.derives = {}  # nom -> (version, structure)
+
+
+def signature_fichier(file_path):
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def lister_csv(csv_path=CSV_PATH):
+    fichiers = {}
+    for file_name in sorted(os.listdir(csv_path)):
+        if file_name.endswith('.csv'):
+            fichiers[os.path.splitext(file_name)[0]] = os.path.join(csv_path, file_name)
+    return fichiers
+
+
+def lire_table(file_path):
+    # Import local : snapshot dépend lui-même de ce module
+    from donnees import snapshot
+    return snapshot.charger_table(file_path)
+
+
+def _entrepot(csv_path):
+    cle = os.path.abspath(csv_path)
+    if cle not in _entrepots:
+        _entrepots[cle] = _Entrepot()
+    return _entrepots[cle]
+
+
+def _rafraichir(entrepot, csv_path):
+    fichiers = lister_csv(csv_path)
+    signatures = {nom: signature_fichier(path) for nom, path in fichiers.items()}
+    for nom in FICHIERS_ANNEXES:
+        if os.path.exists(os.path.join(csv_path, nom)):
+            signatures[nom] = signature_fichier(os.path.join(csv_path, nom))
+    if signatures == entrepot.signatures:
+        return
+
+    # Ne relire que les fichiers ajoutés ou modifiés
+    for nom in list(entrepot.tables):
+        if nom not in fichiers:
+            del entrepot.tables[nom]
+    for nom, path in fichiers.items():
+        if entrepot.signatures.get(nom) != signatures[nom]:
+            entrepot.tables[nom] = lire_table(path)
+    entrepot.signatures = signatures
+    entrepot.version += 1
+    entrepot.derives = {}
+
+
+def charger_dataframes(csv_path=CSV_PATH):
+    """
+    Renvoie le dictionnaire {nom de fichier: DataFrame} du répertoire csv_path.
+    Les DataFrames renvoyés sont des copies superficielles des tables partagées :
+    ajouter ou remplacer une colonne dans une page n'affecte pas les autres sessions.
+    """
+    with _verrou:
+        entrepot = _entrepot(csv_path)
+        _rafraichir(entrepot, csv_path)
+        tables = dict(entrepot.tables)
+    return {nom: df.copy(deep=False) for nom, df in tables.items()}
+
+
+def signatures(csv_path=CSV_PATH):
+    # Signatures (mtime, taille) des fichiers actuellement chargés, annexes comprises
+    with _verrou:
+        entrepot = _entrepot(csv_path)
+        _rafraichir(entrepot, csv_path)
+        return dict(entrepot.signatures)
+
+
+def version_donnees(csv_path=CSV_PATH):
+    # Incrémentée à chaque rechargement : sert de clé aux structures dérivées
+    with _verrou:
+        return _entrepot(csv_path).version
+
+
+def structure_derivee(nom, construire, csv_path=CSV_PATH):
+    """
+    Renvoie la structure nom (index, agrégat...) calculée par construire(tables)
+    sur les tables partagées. Elle est construite une fois par version des données
+    et partagée, en lecture seule, entre toutes les sessions.
+    """
+    with _verrou:
+        entrepot = _entrepot(csv_path)
+        _rafraichir(entrepot, csv_path)
+        version, structure = entrepot.derives.get(nom, (None, None))
+        if version != entrepot.version:
+            structure = construire(dict(entrepot.tables))
+            entrepot.derives[nom] = (entrepot.version, structure)
+        return structure
+
+
+def structure_bornee(famille, cle, construire, maximum, csv_path=CSV_PATH):
+    """
+    Comme structure_derivee, pour une famille de structures distinguées par cle (un
+    filtre, une taille d'échantillon...) : seules les maximum plus récemment demandées
+    sont gardées pour la version courante des données.
+    """
+    with _verrou:
+        memo = structure_derivee(f"{famille}/*", lambda tables: collections.OrderedDict(), csv_path)
+        if cle in memo:
+            memo.move_to_end(cle)
+            return memo[cle]
+        structure = construire(dict(_entrepot(csv_path).tables))
+        memo[cle] = structure
+        while len(memo) > maximum:
+            memo.popitem(last=False)
+        return structure
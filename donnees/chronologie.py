@@ -0,0 +1,110 @@
+"""Cube chronologique : tweets agrégés par (crise, heure) et par (crise, jour).
+
+Chaque cellule porte le nombre de tweets, leur répartition par sentiment, par niveau
+de priorité et le nombre de demandes d'aide. Le cube est calculé une fois par version
+des données ; les courbes temporelles des pages n'interrogent plus que ces quelques
+milliers de lignes au lieu de regrouper les tweets à chaque interaction.
+"""
+import numpy as np
+import pandas as pd
+
+from donnees import chargement, faits, jointures
+
+SENTIMENTS = {"negative": -1, "neutral": 0, "positive": 1}
+PRIORITES = ["Low", "Medium", "High", "Critical", "Unknown"]
+PAS = {"heure": "h", "jour": "D"}
+
+
+def _indicatrices(serie, modalites, prefixe):
+    # Une colonne 0/1 par modalité (les valeurs inconnues ou manquantes n'en ont aucune)
+    valeurs = pd.Categorical(serie, categories=modalites)
+    return pd.DataFrame(
+        np.eye(len(modalites), dtype=np.int32)[valeurs.codes] * (valeurs.codes >= 0)[:, None],
+        columns=[f"{prefixe}_{m}" for m in modalites],
+    )
+
+
+class CubeTemporel:
+    def __init__(self, crises, created_at, sentiment=None, priorite=None, aide=None, attributs=None):
+        base = pd.DataFrame({"crise": np.asarray(crises, dtype=object), "date": pd.to_datetime(np.asarray(created_at))})
+        base["nb_tweets"] = 1
+        mesures = [base]
+        if sentiment is not None:
+            mesures.append(_indicatrices(sentiment, list(SENTIMENTS), "sentiment"))
+        if priorite is not None:
+            mesures.append(_indicatrices(priorite, PRIORITES, "priorite"))
+        if aide is not None:
+            mesures.append(pd.DataFrame({"aide": np.asarray(aide, dtype=np.int32)}))
+        base = pd.concat(mesures, axis=1).dropna(subset=["crise", "date"])
+
+        # Niveau le plus fin (heure) puis cumul au jour sur les cellules déjà agrégées
+        self.niveaux = {}
+        cellules = base.assign(date=base["date"].dt.floor(PAS["heure"]))
+        self.niveaux["heure"] = cellules.groupby(["crise", "date"], sort=True).sum().reset_index()
+        cellules = self.niveaux["heure"].assign(date=self.niveaux["heure"]["date"].dt.floor(PAS["jour"]))
+        self.niveaux["jour"] = cellules.groupby(["crise", "date"], sort=True).sum().reset_index()
+
+        # Attributs par crise (ex. event_type) pour regrouper plusieurs crises
+        self.attributs = attributs if attributs is not None else pd.DataFrame(index=pd.Index([], name="crise"))
+
+    @property
+    def mesures(self):
+        return [c for c in self.niveaux["jour"].columns if c not in ("crise", "date")]
+
+    def serie(self, pas="jour", crises=None, par=None):
+        """
+        Série temporelle au pas donné ("jour" ou "heure"), restreinte aux crises données.
+        par : None (toutes crises cumulées), "crise", ou un attribut des crises (ex. event_type).
+        """
+        df = self.niveaux[pas]
+        if crises is not None:
+            df = df[df["crise"].isin(list(crises))]
+        if par is None:
+            df = df.drop(columns="crise").groupby("date", sort=True).sum().reset_index()
+        elif par != "crise":
+            df = df.assign(**{par: df["crise"].map(self.attributs[par])})
+            df = df.drop(columns="crise").groupby(["date", par], sort=True).sum().reset_index()
+        return self._avec_sentiment_moyen(df)
+
+    @staticmethod
+    def _avec_sentiment_moyen(df):
+        colonnes = [f"sentiment_{s}" for s in SENTIMENTS]
+        if not set(colonnes).issubset(df.columns):
+            return df
+        annotes = df[colonnes].sum(axis=1)
+        scores = sum(df[f"sentiment_{s}"] * score for s, score in SENTIMENTS.items())
+        return df.assign(sentiment_moyen=scores / annotes.where(annotes > 0))
+
+
+def _cube_tweets(tables, table):
+    tweets = tables[table]
+    aide = jointures.MoteurJointures(tables).positions("help_requests", "tweet_id", tweets["tweet_id"]) >= 0
+    return CubeTemporel(
+        tweets["topic"], tweets["created_at"],
+        sentiment=tweets.get("sentiment"),
+        priorite=tweets.get("annotation_postPriority"),
+        aide=aide,
+    )
+
+
+def _cube_faits(csv_path):
+    table = faits.table_faits(csv_path)
+    tweets = table.tweets
+    attributs = table.evenements.drop_duplicates("event_id").set_index("event_id")[["event_type"]]
+    return CubeTemporel(
+        tweets["event_id"], tweets["created_at"],
+        sentiment=tweets.get("sentiment"),
+        priorite=tweets["annotation_postPriority"],
+        aide=tweets["is_help"],
+        attributs=attributs,
+    )
+
+
+def cube_tweets(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """Cube des tweets de table, par topic (identifiant TRECIS de la crise)."""
+    return chargement.structure_derivee(f"chronologie/{table}", lambda tables: _cube_tweets(tables, table), csv_path)
+
+
+def cube_faits(csv_path=chargement.CSV_PATH):
+    """Cube de la table de faits, par crise (event_id), avec l'event_type de chaque crise."""
+    return chargement.structure_derivee("chronologie/faits", lambda tables: _cube_faits(csv_path), csv_path)
@@ -0,0 +1,42 @@
+"""Composants Streamlit communs aux deux versions du tableau de bord (code/ et code2/).
+
+Saisie d'une zone géographique pour l'index spatial et carte choroplèthe des régions :
+les pages des deux versions les importent d'ici.
+"""
+import plotly.express as px
+import streamlit as st
+
+from donnees import spatial
+
+
+def figure_regions(effectifs, contours):
+    """Carte choroplèthe des tweets par région."""
+    return px.choropleth_mapbox(
+        effectifs,
+        geojson=contours,
+        locations="code_region",
+        color="nb_tweets",
+        hover_name="libelle",
+        hover_data={"code_region": False},
+        color_continuous_scale="YlOrRd",
+        opacity=0.6,
+        zoom=2,
+        height=700
+    )
+
+
+def choisir_zone(cle):
+    """Zone géographique saisie dans la page (spatial.Cercle ou spatial.Rectangle), None si aucune."""
+    with st.expander("🗺️ Zone géographique"):
+        mode = st.radio("Filtrer par zone :", ["Aucune", "Autour d'un point", "Rectangle"], horizontal=True, key=f"{cle}_mode")
+        if mode == "Autour d'un point":
+            col_lat, col_lon, col_rayon = st.columns(3)
+            latitude = col_lat.number_input("Latitude :", min_value=-90.0, max_value=90.0, value=0.0, key=f"{cle}_lat")
+            longitude = col_lon.number_input("Longitude :", min_value=-180.0, max_value=180.0, value=0.0, key=f"{cle}_lon")
+            rayon = col_rayon.number_input("Rayon (km) :", min_value=1.0, max_value=20000.0, value=50.0, key=f"{cle}_rayon")
+            return spatial.Cercle(latitude, longitude, rayon)
+        if mode == "Rectangle":
+            lat_min, lat_max = st.slider("Latitudes :", min_value=-90.0, max_value=90.0, value=(-90.0, 90.0), key=f"{cle}_lats")
+            lon_min, lon_max = st.slider("Longitudes :", min_value=-180.0, max_value=180.0, value=(-180.0, 180.0), key=f"{cle}_lons")
+            return spatial.Rectangle(lat_min, lat_max, lon_min, lon_max)
+    return None
@@ -0,0 +1,136 @@
+"""Disposition (layout) multiniveau par forces d'un graphe, vectorisée avec numpy.
+
+Le graphe est d'abord contracté niveau par niveau : chaque nœud propose le voisin de
+son arête de plus petite clé aléatoire, les propositions réciproques sont fusionnées
+(appariement) et les autres nœuds rejoignent le groupe du voisin proposé, jusqu'à
+quelques dizaines de nœuds. Le graphe le plus grossier est disposé, puis chaque niveau
+hérite des positions de son parent et est affiné par quelques itérations de
+Fruchterman-Reingold :
+    - attraction le long des arêtes (d² / k), cumulée par np.bincount ;
+    - répulsion (k² / d) approchée par les masses et barycentres des cellules d'une
+      grille, au lieu des n² paires de nœuds.
+Chaque itération coûte O(arêtes + nœuds × cellules). Les arêtes parallèles créées par
+la contraction sont fusionnées, et au-delà de NOEUDS_AFFINES nœuds un niveau reçoit
+moins d'itérations (au moins ITERATIONS_MIN) : le coût de chaque niveau reste borné.
+"""
+import numpy as np
+
+# Taille du graphe le plus grossier ; itérations au niveau le plus grossier et aux
+# niveaux plus fins
+TAILLE_MINIMALE = 50
+ITERATIONS_GROSSIER = 200
+ITERATIONS_FIN = 30
+# Au-delà de NOEUDS_AFFINES nœuds, les itérations d'un niveau diminuent en proportion
+NOEUDS_AFFINES = 10_000
+ITERATIONS_MIN = 5
+# Grille de la répulsion approchée (GRILLE × GRILLE cellules)
+GRILLE = 16
+# Nombre de couples (nœud, cellule) traités par bloc
+_BLOC = 1 << 20
+
+
+def _contracter(n, source, cible, aleatoire):
+    # Parent de chaque nœud au niveau suivant (appariement par propositions réciproques)
+    s = np.concatenate([source, cible])
+    c = np.concatenate([cible, source])
+    garde = s != c
+    s, c = s[garde], c[garde]
+    cles = aleatoire.random(len(s))
+    ordre = np.lexsort((cles, s))
+    s, c = s[ordre], c[ordre]
+    premiers = np.flatnonzero(np.r_[True, s[1:] != s[:-1]]) if len(s) else np.empty(0, dtype=np.int64)
+    proposition = np.arange(n)
+    proposition[s[premiers]] = c[premiers]
+    apparies = proposition[proposition] == np.arange(n)
+    representant = np.where(apparies, np.minimum(np.arange(n), proposition), np.arange(n))
+    # Nœuds non appariés : rattachés au groupe du voisin proposé (étoiles, chaînes)
+    seuls = ~apparies & (proposition != np.arange(n))
+    representant[seuls] = representant[proposition[seuls]]
+    # Nœuds isolés : regroupés deux à deux
+    isoles = np.flatnonzero(proposition == np.arange(n))
+    representant[isoles[1::2]] = isoles[0::2][:len(isoles) // 2]
+    _, parent = np.unique(representant, return_inverse=True)
+    return parent
+
+
+def _repulsion(positions, k):
+    # Force de répulsion de chaque nœud, approchée par les cellules d'une grille
+    minimum = positions.min(axis=0)
+    cote = max(float((positions.max(axis=0) - minimum).max()) / GRILLE, 1e-9)
+    cellules = np.minimum(((positions - minimum) / cote).astype(np.int64), GRILLE - 1)
+    codes = cellules[:, 0] * GRILLE + cellules[:, 1]
+    masses = np.bincount(codes, minlength=GRILLE * GRILLE).astype(np.float64)
+    occupees = masses > 0
+    centres = np.column_stack([
+        np.bincount(codes, weights=positions[:, 0], minlength=GRILLE * GRILLE)[occupees],
+        np.bincount(codes, weights=positions[:, 1], minlength=GRILLE * GRILLE)[occupees],
+    ]) / masses[occupees, None]
+    masses = masses[occupees]
+    forces = np.empty_like(positions)
+    # Adoucissement : un nœud ne se repousse pas (presque) lui-même via sa cellule
+    adoucissement = (0.5 * cote) ** 2 + k * k * 1e-4
+    pas = max(1, _BLOC // len(masses))
+    for debut in range(0, len(positions), pas):
+        dx = positions[debut:debut + pas, 0, None] - centres[None, :, 0]
+        dy = positions[debut:debut + pas, 1, None] - centres[None, :, 1]
+        intensites = masses / (dx * dx + dy * dy + adoucissement)
+        forces[debut:debut + pas, 0] = (dx * intensites).sum(axis=1)
+        forces[debut:debut + pas, 1] = (dy * intensites).sum(axis=1)
+    return forces * (k * k)
+
+
+def _affiner(positions, source, cible, poids, iterations, temperature):
+    n = len(positions)
+    k = np.sqrt(1.0 / n)
+    for i in range(iterations):
+        deplacements = _repulsion(positions, k)
+        ecarts = positions[source] - positions[cible]
+        distances = np.sqrt((ecarts ** 2).sum(axis=1)) + 1e-12
+        attraction = ecarts * (distances * poids / k)[:, None]
+        for axe in range(2):
+            deplacements[:, axe] -= np.bincount(source, weights=attraction[:, axe], minlength=n)
+            deplacements[:, axe] += np.bincount(cible, weights=attraction[:, axe], minlength=n)
+        # Déplacement borné par la température, qui décroît linéairement
+        normes = np.sqrt((deplacements ** 2).sum(axis=1)) + 1e-12
+        limite = temperature * (1 - i / iterations)
+        positions = positions + deplacements * (np.minimum(normes, limite) / normes)[:, None]
+    return positions
+
+
+def disposition(n, source, cible, poids=None, graine=42):
+    """
+    Positions (n × 2, dans [0, 1]²) des nœuds 0..n-1 du graphe d'arêtes
+    source → cible.
+    """
+    if n == 0:
+        return np.empty((0, 2))
+    aleatoire = np.random.default_rng(graine)
+    source = np.asarray(source, dtype=np.int64)
+    cible = np.asarray(cible, dtype=np.int64)
+    poids = np.ones(len(source)) if poids is None else np.asarray(poids, dtype=np.float64)
+
+    # Niveaux de contraction : (nb_noeuds, source, cible, poids, parent au niveau
+    # suivant)
+    niveaux = []
+    while n > TAILLE_MINIMALE:
+        parent = _contracter(n, source, cible, aleatoire)
+        nb_parents = int(parent.max()) + 1
+        if nb_parents > 0.95 * n:
+            break
+        niveaux.append((n, source, cible, poids, parent))
+        source, cible = parent[source], parent[cible]
+        garde = source != cible
+        # Arêtes parallèles fusionnées (poids cumulés) : même attraction, moins d'arêtes
+        cles, inverse = np.unique(source[garde] * nb_parents + cible[garde], return_inverse=True)
+        poids = np.bincount(inverse, weights=poids[garde], minlength=len(cles))
+        source, cible, n = cles // nb_parents, cles % nb_parents, nb_parents
+
+    positions = _affiner(aleatoire.random((n, 2)), source, cible, poids, ITERATIONS_GROSSIER, 0.1)
+    for n, source, cible, poids, parent in reversed(niveaux):
+        k = np.sqrt(1.0 / n)
+        positions = positions[parent] + aleatoire.uniform(-k, k, (n, 2)) * 0.1
+        iterations = max(ITERATIONS_MIN, ITERATIONS_FIN * min(1, NOEUDS_AFFINES / n))
+        positions = _affiner(positions, source, cible, poids, int(iterations), k)
+
+    etendue = np.maximum(positions.max(axis=0) - positions.min(axis=0), 1e-12)
+    return (positions - positions.min(axis=0)) / etendue
@@ -0,0 +1,176 @@
+"""Export des résultats filtrés en CSV compressé (gzip) ou Parquet.
+
+Le fichier n'est produit que sur demande (bouton « Préparer l'export ») et non à chaque
+ré-exécution de la page. Il est écrit par lots de lignes lus à partir des positions
+retenues : la mémoire de pointe dépend de la taille d'un lot et non de celle du
+résultat. Le fichier prêt est gardé pour la session tant que les lignes exportées et le
+format ne changent pas. Les fichiers temporaires sont suivis dans un registre borné
+(les plus anciens sont supprimés au-delà de EXPORTS_GARDES) et supprimés à l'arrêt.
+"""
+import atexit
+import collections
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from donnees import bitmaps
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow absent : export CSV seulement
+    pa = None
+    pq = None
+
+TAILLE_LOT = 50_000
+EXPORTS_GARDES = 32
+
+# Fichiers d'export encore sur disque, du plus ancien au plus récent (toutes sessions)
+_fichiers = collections.OrderedDict()
+_verrou = threading.Lock()
+
+
+def _supprimer_fichier(chemin):
+    try:
+        os.remove(chemin)
+    except FileNotFoundError:
+        pass
+
+
+def _enregistrer(chemin):
+    with _verrou:
+        _fichiers[chemin] = None
+        anciens = [_fichiers.popitem(last=False)[0] for _ in range(len(_fichiers) - EXPORTS_GARDES)]
+    for ancien in anciens:
+        _supprimer_fichier(ancien)
+
+
+@atexit.register
+def nettoyer():
+    """Supprime tous les fichiers d'export encore sur disque."""
+    with _verrou:
+        chemins = list(_fichiers)
+        _fichiers.clear()
+    for chemin in chemins:
+        _supprimer_fichier(chemin)
+
+
+def _ecrire_csv_gz(lots, chemin):
+    with gzip.open(chemin, "wt", encoding="utf-8", newline="") as f:
+        for i, lot in enumerate(lots):
+            lot.to_csv(f, header=i == 0, index=False)
+
+
+def _ecrire_parquet(lots, chemin):
+    writer = None
+    try:
+        for lot in lots:
+            table = pa.Table.from_pandas(lot, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(chemin, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+# format -> (extension, type MIME, fonction d'écriture)
+FORMATS = {"CSV (gzip)": (".csv.gz", "application/gzip", _ecrire_csv_gz)}
+if pq is not None:
+    FORMATS["Parquet"] = (".parquet", "application/vnd.apache.parquet", _ecrire_parquet)
+
+
+class Export:
+    def __init__(self, chemin, format_, empreinte):
+        self.chemin = chemin
+        self.format = format_
+        self.empreinte = empreinte
+
+    @property
+    def mime(self):
+        return FORMATS[self.format][1]
+
+    def nom_fichier(self, base):
+        return base + FORMATS[self.format][0]
+
+    def ouvrir(self):
+        return open(self.chemin, "rb")
+
+    def supprimer(self):
+        with _verrou:
+            _fichiers.pop(self.chemin, None)
+        _supprimer_fichier(self.chemin)
+
+
+def lots(df, positions=None, colonnes=None, taille_lot=TAILLE_LOT):
+    """
+    Lignes de df (aux positions ou Bitmap donnés, toutes sinon) par lots de taille_lot.
+    Les positions se lisent dans l'ordre des lignes de df, quel que soit son index.
+    """
+    if isinstance(positions, bitmaps.Bitmap):
+        if positions.taille != len(df):
+            raise ValueError(f"Bitmap de {positions.taille} lignes pour un DataFrame de {len(df)} lignes")
+        positions = positions.positions()
+    elif positions is not None:
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(positions) and (positions.min() < 0 or positions.max() >= len(df)):
+            raise ValueError("Positions hors du DataFrame exporté")
+    nb_lignes = len(df) if positions is None else len(positions)
+    # Un lot vide pour un résultat vide : le fichier garde l'en-tête / le schéma
+    for debut in range(0, max(nb_lignes, 1), taille_lot):
+        if positions is None:
+            lot = df.iloc[debut:debut + taille_lot]
+        else:
+            lot = df.iloc[positions[debut:debut + taille_lot]]
+        yield lot if colonnes is None else lot[colonnes]
+
+
+def empreinte(df, positions=None, colonnes=None, format_=None):
+    # Identifie le contenu exporté : lignes retenues (tweet_id de df, ou ses valeurs, à
+    # défaut de positions), colonnes et format ; l'index de df n'y entre pas
+    h = hashlib.md5(repr((len(df), list(df.columns) if colonnes is None else list(colonnes), format_)).encode())
+    if isinstance(positions, bitmaps.Bitmap):
+        # Bitset haché tel quel, sans énumérer les lignes
+        h.update(positions.octets().tobytes())
+    elif positions is not None:
+        h.update(np.ascontiguousarray(positions, dtype=np.int64).tobytes())
+    else:
+        lignes = df["tweet_id"] if "tweet_id" in df.columns else df
+        h.update(pd.util.hash_pandas_object(lignes, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def exporter(df, positions=None, colonnes=None, format_="CSV (gzip)", taille_lot=TAILLE_LOT):
+    """Écrit les lignes retenues dans un fichier temporaire, lot par lot ; renvoie l'Export."""
+    extension, _, ecrire = FORMATS[format_]
+    descripteur, chemin = tempfile.mkstemp(prefix="export_", suffix=extension)
+    os.close(descripteur)
+    try:
+        ecrire(lots(df, positions, colonnes, taille_lot), chemin)
+    except Exception:
+        os.remove(chemin)
+        raise
+    _enregistrer(chemin)
+    return Export(chemin, format_, empreinte(df, positions, colonnes, format_))
+
+
+def courant(etat, cle, empreinte_):
+    """Export de la session (etat : st.session_state) s'il correspond encore aux lignes affichées."""
+    export = etat.get(cle)
+    if export is not None and export.empreinte == empreinte_ and os.path.exists(export.chemin):
+        return export
+    return None
+
+
+def preparer(etat, cle, df, positions=None, colonnes=None, format_="CSV (gzip)", taille_lot=TAILLE_LOT):
+    """Produit l'export et le garde dans la session, en supprimant le fichier précédent."""
+    precedent = etat.get(cle)
+    if precedent is not None:
+        precedent.supprimer()
+    etat[cle] = exporter(df, positions, colonnes, format_, taille_lot)
+    return etat[cle]
@@ -0,0 +1,151 @@
+"""Recherche à facettes : lignes filtrées et effectifs de chaque facette.
+
+Une RequeteFacettee (une par session) mémorise les filtres posés sur les facettes
+(topic, sentiment, lieu, jour) et un filtre de base (mots-clés). Les effectifs d'une
+facette sont calculés sur les lignes qui satisfont tous les autres filtres, ce qui
+permet d'afficher les alternatives à la sélection courante. Ils sont mémorisés selon
+l'état des autres filtres : modifier une facette ne recalcule que les effectifs des
+facettes dont le contexte a changé. Les filtres sont combinés en un seul ET de bitmaps,
+et les effectifs de toutes les valeurs d'une facette sont comptés en une passe sur les
+lignes du contexte. Une période de dates est résolue par l'index temporel
+(cf. donnees/temps.py) en une fenêtre de lignes, une zone géographique par l'index
+spatial (cf. donnees/spatial.py) ou le géocodage des tweets en pays et régions
+(cf. donnees/regions.py) ; toutes sont converties en bitmap. Les bitmaps des filtres et
+des recherches par mots-clés sont gardés dans le moteur, partagé entre les sessions.
+"""
+import threading
+from collections import namedtuple
+
+from donnees import bitmaps, chargement, recherche, regions, spatial, temps
+
+FACETTES = ["topic", "sentiment", "lieu_extrait", "jour"]
+_TAILLE_CACHE = 256
+
+# Filtre d'une facette date sur un intervalle [debut, fin] plutôt que sur une liste de valeurs
+Periode = namedtuple("Periode", ["debut", "fin"])
+
+
+class MoteurFacettes:
+    def __init__(self, index, index_temps=None, index_spatial=None, index_regions=None, index_texte=None):
+        self.index = index
+        self.index_temps = index_temps
+        self.index_spatial = index_spatial
+        self.index_regions = index_regions
+        self.index_texte = index_texte
+        # Partagé entre les sessions (threads de Streamlit) : accès sous verrou
+        self._verrou = threading.Lock()
+        self._unions = {}
+
+    def _bitmap(self, facette, valeurs):
+        if isinstance(valeurs, Periode):
+            if self.index_temps is None:
+                raise ValueError("Filtre par période sans index temporel")
+            return bitmaps.Bitmap.depuis_positions(self.index_temps.positions(*valeurs), self.index.taille)
+        if isinstance(valeurs, (spatial.Rectangle, spatial.Cercle)):
+            if self.index_spatial is None:
+                raise ValueError("Filtre par zone sans index spatial")
+            return bitmaps.Bitmap.depuis_positions(self.index_spatial.positions(valeurs), self.index.taille)
+        if isinstance(valeurs, regions.Territoires):
+            if self.index_regions is None:
+                raise ValueError("Filtre par territoire sans géocodage des tweets")
+            return bitmaps.Bitmap.depuis_positions(self.index_regions.positions(*valeurs), self.index.taille)
+        return self.index.parmi(facette, valeurs)
+
+    def _memoriser(self, cle, construire):
+        with self._verrou:
+            if cle not in self._unions:
+                if len(self._unions) > _TAILLE_CACHE:
+                    self._unions.clear()
+                self._unions[cle] = construire()
+            return self._unions[cle]
+
+    def bitmap_filtre(self, facette, valeurs):
+        # Union des bitmaps des valeurs retenues (ou fenêtre de dates, zone)
+        return self._memoriser((facette, valeurs), lambda: self._bitmap(facette, valeurs))
+
+    def bitmap_texte(self, requete, textes):
+        """Lignes dont le texte (textes : colonne de la table) satisfait la requête par mots-clés."""
+        if self.index_texte is None:
+            raise ValueError("Recherche par mots-clés sans index du texte")
+        return self._memoriser(
+            ("texte", requete),
+            lambda: bitmaps.Bitmap.depuis_positions(self.index_texte.rechercher(requete, textes), self.index.taille),
+        )
+
+
+class RequeteFacettee:
+    def __init__(self, moteur):
+        self.moteur = moteur
+        self.filtres = {}        # facette -> tuple trié des valeurs retenues, Periode ou zone
+        self.cle_base = None     # identifie le filtre de base (ex. la requête texte)
+        self.base = None
+        self._comptes = {}
+
+    def definir_base(self, cle, bitmap):
+        if cle != self.cle_base:
+            self.cle_base, self.base = cle, bitmap
+
+    def filtrer(self, facette, valeurs):
+        """Retient les lignes dont la facette prend une des valeurs (aucun filtre si vide)."""
+        if valeurs:
+            self.filtres[facette] = tuple(sorted(valeurs))
+        else:
+            self.filtres.pop(facette, None)
+
+    def filtrer_periode(self, facette, debut, fin):
+        """Retient les lignes publiées entre debut et fin (dates incluses)."""
+        self.filtres[facette] = Periode(debut, fin)
+
+    def filtrer_zone(self, facette, zone):
+        """
+        Retient les tweets géolocalisés dans zone (spatial.Rectangle, spatial.Cercle ou
+        regions.Territoires ; aucun filtre si None).
+        """
+        if zone is None:
+            self.filtres.pop(facette, None)
+        else:
+            self.filtres[facette] = zone
+
+    def _signature(self, exclue=None):
+        return self.cle_base, tuple(sorted((f, v) for f, v in self.filtres.items() if f != exclue))
+
+    def _contexte(self, exclue=None):
+        filtres = [self.moteur.bitmap_filtre(f, v) for f, v in self.filtres.items() if f != exclue]
+        return bitmaps.intersection(filtres + ([self.base] if self.base is not None else []))
+
+    def comptes(self, facette):
+        """Effectif de chaque valeur de facette sous les autres filtres (valeurs non nulles)."""
+        cle = (facette, self._signature(exclue=facette))
+        if cle not in self._comptes:
+            if len(self._comptes) > _TAILLE_CACHE:
+                self._comptes.clear()
+            serie = self.moteur.index.comptes(facette, self._contexte(exclue=facette))
+            self._comptes[cle] = serie[serie > 0]
+        return self._comptes[cle]
+
+    def resultat(self):
+        """Bitmap des lignes qui satisfont tous les filtres."""
+        contexte = self._contexte()
+        return self.moteur.index.tous() if contexte is None else contexte
+
+
+def moteur_facettes(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    return chargement.structure_derivee(
+        f"facettes/{table}",
+        lambda tables: MoteurFacettes(bitmaps.index_bitmaps(table, csv_path), temps.index_temporel(table, csv_path=csv_path),
+                                      spatial.index_spatial(table, csv_path),
+                                      regions.regions(table, csv_path) if regions.disponible(csv_path) else None,
+                                      recherche.index_texte(table, csv_path=csv_path)),
+        csv_path,
+    )
+
+
+def requete(etat, cle="requete_facettes", table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """
+    Requête à facettes de la session (etat : st.session_state), recréée quand les
+    données, et donc le moteur, ont changé.
+    """
+    moteur = moteur_facettes(table, csv_path)
+    if cle not in etat or etat[cle].moteur is not moteur:
+        etat[cle] = RequeteFacettee(moteur)
+    return etat[cle]
@@ -0,0 +1,244 @@
+"""Table de faits des tweets (une ligne par tweet) et dimensions utilisateurs / événements.
+
+Les attributs d'un tweet sont dispersés entre plusieurs fichiers : crise via is_about_clean
+et Event_clean, demande d'aide via help_requests, auteur via posted_clean, gravité et texte
+via tweets_<type>, date et sentiment via Tweet_date_clean / Tweet_sentiment_localisation.
+Ils sont rassemblés ici une seule fois, et les pages n'ont plus qu'à découper la table.
+
+La table est persistée dans CSV/snapshots/faits/ par groupes de colonnes. Chaque groupe
+mémorise les signatures de ses tables sources : quand une source change, seuls les
+groupes qui en dépendent sont recalculés (tant que l'ensemble des tweets est inchangé).
+En mémoire, les tweets sont rangés par crise (schema.ORDRE_PHYSIQUE) : les tweets d'une
+crise ou d'un type d'événement sont des tranches de la table (cf. donnees/partitions.py).
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from donnees import chargement, jointures, partitions, schema, snapshot
+
+VERSION_FAITS = 2
+FAITS_DIR = "faits"
+
+TWEETS_PAR_TYPE = [f"tweets_{event_type}" for event_type in schema.EVENT_TYPES]
+
+# Tables dont les tweet_id définissent les lignes de la table de faits
+SOURCES_UNIVERS = ["posted_clean", "is_about_clean", "Tweet_date_clean", "Tweet_sentiment_localisation"] + TWEETS_PAR_TYPE
+
+
+def _univers(tables):
+    ids = [tables[nom]["tweet_id"].dropna().to_numpy(dtype=np.int64) for nom in SOURCES_UNIVERS if nom in tables]
+    if not ids:
+        return np.empty(0, dtype=np.int32)
+    return np.unique(np.concatenate(ids)).astype(np.int32)
+
+
+def _rassembler(moteur, table, tweet_ids, colonnes, cle="tweet_id"):
+    # Colonnes de table alignées sur tweet_ids (jointure gauche par positions)
+    positions = moteur.positions(table, cle, tweet_ids)
+    droite = moteur.tables[table]
+    return {
+        nom: jointures.prendre(droite[colonne], positions).values
+        for colonne, nom in colonnes.items() if colonne in droite.columns
+    }
+
+
+# --- Groupes de colonnes : (tables sources, fonction de calcul) ---
+
+def _annotations(moteur, tweet_ids):
+    # Fichiers tweets_<type> : crise annotée, gravité et texte
+    tables = [moteur.tables[nom] for nom in TWEETS_PAR_TYPE if nom in moteur.tables]
+    if not tables:
+        return pd.DataFrame(index=range(len(tweet_ids)))
+    annotations = pd.concat([t[["tweet_id", "event_id", "annotation_postPriority", "text"]] for t in tables], ignore_index=True)
+    return pd.DataFrame(_rassembler(jointures.MoteurJointures({"annotations": annotations}), "annotations", tweet_ids, {
+        "event_id": "event_node",
+        "annotation_postPriority": "annotation_postPriority",
+        "text": "text",
+    }))
+
+
+def _groupe_annotation(moteur, tweet_ids):
+    df = _annotations(moteur, tweet_ids).drop(columns="event_node", errors="ignore")
+    if "annotation_postPriority" in df.columns:
+        df["annotation_postPriority"] = df["annotation_postPriority"].astype("category")
+    return df
+
+
+def _groupe_evenement(moteur, tweet_ids):
+    # Crise du tweet : is_about_clean, à défaut l'event_id du fichier tweets_<type>
+    noeuds = pd.Series(_rassembler(moteur, "is_about_clean", tweet_ids, {"event_id": "event_node"})["event_node"])
+    annotations = _annotations(moteur, tweet_ids)
+    if "event_node" in annotations.columns:
+        noeuds = noeuds.fillna(annotations["event_node"])
+    df = pd.DataFrame({"event_node": noeuds.fillna(-1).to_numpy(dtype=np.int32)})
+    df = df.assign(**_rassembler(moteur, "Event_clean", df["event_node"].where(df["event_node"] >= 0), {
+        "event_id": "event_id",
+        "event_type": "event_type",
+        "trecis_id": "topic",
+    }, cle="node_id"))
+    for colonne in ["event_id", "event_type", "topic"]:
+        df[colonne] = df[colonne].astype("category")
+    return df
+
+
+def _groupe_aide(moteur, tweet_ids):
+    df = pd.DataFrame(_rassembler(moteur, "help_requests", tweet_ids, {"category_name": "category_name"}))
+    df["is_help"] = df["category_name"].notna()
+    return df
+
+
+def _groupe_auteur(moteur, tweet_ids):
+    df = pd.DataFrame(_rassembler(moteur, "posted_clean", tweet_ids, {"user_id": "user_id"}))
+    df["user_id"] = df["user_id"].astype("Int32")
+    return df
+
+
+def _groupe_date(moteur, tweet_ids):
+    # dans_tweet_date : le tweet a une ligne dans Tweet_date_clean (cf. tweets_avec_crise)
+    if "Tweet_date_clean" not in moteur.tables:
+        return pd.DataFrame({"dans_tweet_date": np.zeros(len(tweet_ids), dtype=bool)})
+    df = pd.DataFrame(_rassembler(moteur, "Tweet_date_clean", tweet_ids, {
+        "created_at": "created_at",
+        "retweet_count": "retweet_count",
+        "favorite_count": "favorite_count",
+        "possibly_sensitive": "possibly_sensitive",
+    }))
+    df["dans_tweet_date"] = moteur.positions("Tweet_date_clean", "tweet_id", tweet_ids) >= 0
+    return df
+
+
+def _groupe_sentiment(moteur, tweet_ids):
+    if "Tweet_sentiment_localisation" not in moteur.tables:
+        return pd.DataFrame(index=range(len(tweet_ids)))
+    return pd.DataFrame(_rassembler(moteur, "Tweet_sentiment_localisation", tweet_ids, {
+        "sentiment": "sentiment",
+        "latitude": "latitude",
+        "longitude": "longitude",
+        "lieu_extrait": "lieu_extrait",
+    }))
+
+
+GROUPES = {
+    "evenement": (["is_about_clean", "Event_clean"] + TWEETS_PAR_TYPE, _groupe_evenement),
+    "annotation": (TWEETS_PAR_TYPE, _groupe_annotation),
+    "aide": (["help_requests"], _groupe_aide),
+    "auteur": (["posted_clean"], _groupe_auteur),
+    "date": (["Tweet_date_clean"], _groupe_date),
+    "sentiment": (["Tweet_sentiment_localisation"], _groupe_sentiment),
+}
+
+
+class Faits:
+    def __init__(self, tweets, utilisateurs, evenements, version):
+        self.tweets = tweets              # une ligne par tweet, rangées par crise
+        self.utilisateurs = utilisateurs  # dimension User_clean + nb_tweets
+        self.evenements = evenements      # dimension Event_clean + nb_tweets / nb_aide
+        self.version = version
+        self.partitions = partitions.Partitions.depuis_colonne(tweets[schema.PARTITIONS["faits"]])
+
+    def tweets_avec_crise(self):
+        """
+        Tweets ayant une crise et une ligne dans Tweet_date_clean : les lignes de l'ancienne
+        jointure interne Tweet_date_clean ⋈ is_about_clean des pages de demandes d'aide.
+        L'index garde les positions dans la table.
+        """
+        tweets = self.tweets.iloc[self.partitions.etendue()]
+        return tweets[tweets["dans_tweet_date"].to_numpy()]
+
+    def crise(self, event_id):
+        return self.tweets.iloc[self.partitions.tranche(event_id)]
+
+    def crises_du_type(self, event_type):
+        evenements = self.evenements[self.evenements["event_type"] == event_type]
+        return evenements["event_id"].dropna().unique().tolist()
+
+    def type_evenement(self, event_type):
+        return self.partitions.extraire(self.tweets, self.crises_du_type(event_type))
+
+
+def chemin_faits(csv_path):
+    return os.path.join(csv_path, snapshot.SNAPSHOT_DIR, FAITS_DIR)
+
+
+def _lire_manifeste(dossier):
+    try:
+        with open(os.path.join(dossier, "manifeste.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _ecrire_groupe(dossier, nom, df):
+    tmp_path = os.path.join(dossier, nom + ".feather.tmp")
+    df.reset_index(drop=True).to_feather(tmp_path, compression="uncompressed")
+    os.replace(tmp_path, os.path.join(dossier, nom + ".feather"))
+
+
+def _construire_tweets(tables, signatures, csv_path):
+    moteur = jointures.MoteurJointures(tables)
+    tweet_ids = _univers(tables)
+    persister = snapshot.disponible()
+    dossier = chemin_faits(csv_path)
+    manifeste = _lire_manifeste(dossier) if persister else {}
+
+    # Même version de code et même ensemble de tweets : les groupes à jour sont relus
+    cles_path = os.path.join(dossier, "cles.npy")
+    reutilisable = (
+        manifeste.get("version") == [VERSION_FAITS, schema.VERSION]
+        and os.path.exists(cles_path)
+        and np.array_equal(np.load(cles_path), tweet_ids)
+    )
+    anciens_groupes = manifeste.get("groupes", {}) if reutilisable else {}
+
+    colonnes = [pd.DataFrame({"tweet_id": tweet_ids})]
+    groupes = {}
+    for nom, (sources, calculer) in GROUPES.items():
+        signature_sources = {source: list(signatures[source]) for source in sources if source in signatures}
+        if anciens_groupes.get(nom) == signature_sources:
+            df = snapshot.lire_snapshot(os.path.join(dossier, nom + ".feather"))
+        else:
+            df = calculer(moteur, tweet_ids)
+            if persister:
+                os.makedirs(dossier, exist_ok=True)
+                _ecrire_groupe(dossier, nom, df)
+        colonnes.append(df.reset_index(drop=True))
+        groupes[nom] = signature_sources
+
+    if persister:
+        np.save(cles_path, tweet_ids)
+        with open(os.path.join(dossier, "manifeste.json"), "w") as f:
+            json.dump({"version": [VERSION_FAITS, schema.VERSION], "groupes": groupes}, f)
+
+    tweets = schema.ordonner("faits", pd.concat(colonnes, axis=1))
+    version = hashlib.md5(json.dumps(groupes, sort_keys=True).encode()).hexdigest()[:12]
+    return tweets, version
+
+
+def _dimensions(tables, tweets):
+    utilisateurs = tables["User_clean"].copy()
+    positions = jointures.IndexPositions(utilisateurs["user_id"].to_numpy()).positions_de(tweets["user_id"])
+    utilisateurs["nb_tweets"] = np.bincount(positions[positions >= 0], minlength=len(utilisateurs))
+
+    evenements = tables["Event_clean"].copy()
+    noeuds = tweets["event_node"].to_numpy()
+    avec_crise = noeuds >= 0
+    positions = jointures.IndexPositions(evenements["node_id"].to_numpy()).positions_de(noeuds[avec_crise])
+    aide = tweets["is_help"].to_numpy()[avec_crise]
+    evenements["nb_tweets"] = np.bincount(positions[positions >= 0], minlength=len(evenements))
+    evenements["nb_aide"] = np.bincount(positions[positions >= 0], weights=aide[positions >= 0], minlength=len(evenements)).astype(np.int64)
+    return utilisateurs, evenements
+
+
+def construire_faits(tables, csv_path=chargement.CSV_PATH):
+    tweets, version = _construire_tweets(tables, chargement.signatures(csv_path), csv_path)
+    utilisateurs, evenements = _dimensions(tables, tweets)
+    return Faits(tweets, utilisateurs, evenements, version)
+
+
+def table_faits(csv_path=chargement.CSV_PATH):
+    """Table de faits partagée, (re)construite quand une table source change."""
+    return chargement.structure_derivee("faits", lambda tables: construire_faits(tables, csv_path), csv_path)
@@ -0,0 +1,276 @@
+"""Agrégation spatiale multi-résolution des tweets géolocalisés.
+
+Les tweets géolocalisés (coordonnées renseignées et non nulles) sont regroupés dans une
+grille régulière en degrés, à plusieurs mailles (PAS, de la plus grossière à la plus
+fine). Chaque cellule porte, par crise et par sentiment, le nombre de tweets, la somme
+des retweets et le barycentre des tweets. Le cube est calculé une fois par version des
+données ; les cartes affichent ces cellules (quelques centaines à quelques milliers de
+marqueurs) au lieu d'un point par tweet, et ne reviennent aux points que lorsque la
+sélection en compte peu.
+
+Les points affichés un à un (PointsCarte) sont préparés une fois par version des
+données : tweets géolocalisés de chaque crise triés par nombre de retweets, décalage
+aléatoire (jitter) et taille des marqueurs déjà calculés. Le seuil « nombre minimal de
+retweets » des cartes devient un searchsorted puis une tranche de fin de plage.
+
+Les filtres par zone des cartes (rectangle, rayon) passent par l'index spatial
+(cf. donnees/spatial.py), qui renvoie les positions des tweets de la zone.
+
+Le résumé par crise (effectif, part de positifs, barycentre, exemple de texte) des
+marqueurs de la carte de chaleur est obtenu en un seul regroupement (resume_crises).
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from donnees import bitmaps, chargement, jointures, partitions
+
+# Cartes rendues gardées en cache (une par filtre), les plus anciennes évincées
+CARTES_GARDEES = 8
+
+# Mailles en degrés, de la plus grossière à la plus fine
+PAS = [2.0, 0.5, 0.1, 0.02]
+# Nombre de cellules au-delà duquel une maille est jugée trop fine pour l'affichage
+BUDGET_CELLULES = 2000
+# En dessous de ce nombre de tweets, les cartes affichent les points eux-mêmes
+SEUIL_POINTS = 2000
+
+
+def _coordonnees(df):
+    # Lignes aux coordonnées renseignées et non nulles
+    latitude = pd.to_numeric(df["latitude"], errors="coerce").to_numpy(dtype=np.float64)
+    longitude = pd.to_numeric(df["longitude"], errors="coerce").to_numpy(dtype=np.float64)
+    valides = np.isfinite(latitude) & np.isfinite(longitude) & (latitude != 0) & (longitude != 0)
+    return latitude, longitude, valides
+
+
+def _cellules(latitude, longitude, retweets, groupes, pas):
+    # Somme par (groupes..., cellule) : effectif, retweets et sommes des coordonnées
+    cles = pd.DataFrame({
+        **groupes,
+        "cellule_lat": np.floor(latitude / pas).astype(np.int64),
+        "cellule_lon": np.floor(longitude / pas).astype(np.int64),
+    })
+    mesures = pd.DataFrame({
+        "nb_tweets": np.ones(len(latitude), dtype=np.int64),
+        "retweets": retweets,
+        "somme_lat": latitude,
+        "somme_lon": longitude,
+    })
+    colonnes = list(cles.columns)
+    return pd.concat([cles, mesures], axis=1).groupby(colonnes, sort=True, observed=True).sum().reset_index()
+
+
+def _finaliser(cellules, par_sentiment):
+    # Cellules -> marqueurs : barycentre, effectif, retweets (et sentiment le cas échéant)
+    colonnes = ["cellule_lat", "cellule_lon"] + (["sentiment"] if par_sentiment else [])
+    cellules = cellules.groupby(colonnes, sort=False, observed=True)[["nb_tweets", "retweets", "somme_lat", "somme_lon"]].sum()
+    cellules = cellules.reset_index()
+    return pd.DataFrame({
+        "latitude": cellules["somme_lat"] / cellules["nb_tweets"],
+        "longitude": cellules["somme_lon"] / cellules["nb_tweets"],
+        "nb_tweets": cellules["nb_tweets"].to_numpy(),
+        "retweets": cellules["retweets"].to_numpy(),
+        **({"sentiment": cellules["sentiment"].to_numpy()} if par_sentiment else {}),
+    })
+
+
+def agreger(df, pas, par_sentiment=False):
+    """Cellules de df (sélection quelconque) à la maille pas, calculées à la volée."""
+    latitude, longitude, valides = _coordonnees(df)
+    retweets = pd.to_numeric(df["retweet_count"], errors="coerce").fillna(0).to_numpy()[valides] if "retweet_count" in df.columns else 0
+    groupes = {"sentiment": df["sentiment"].astype(object).fillna("inconnu").to_numpy()[valides]} if par_sentiment else {}
+    cellules = _cellules(latitude[valides], longitude[valides], retweets, groupes, pas)
+    return _finaliser(cellules, par_sentiment)
+
+
+def niveau_adapte(df, budget=BUDGET_CELLULES):
+    """Indice dans PAS de la maille la plus fine dont le nombre de cellules de df tient dans budget."""
+    latitude, longitude, valides = _coordonnees(df)
+    niveau = 0
+    for i, pas in enumerate(PAS):
+        codes = np.floor(latitude[valides] / pas).astype(np.int64) * 1_000_003 + np.floor(longitude[valides] / pas).astype(np.int64)
+        if len(np.unique(codes)) > budget:
+            break
+        niveau = i
+    return niveau
+
+
+class CubeSpatial:
+    def __init__(self, df, taille_table=None):
+        self.taille_table = len(df) if taille_table is None else taille_table
+        latitude, longitude, valides = _coordonnees(df)
+        self.nb_tweets = int(valides.sum())
+        retweets = pd.to_numeric(df["retweet_count"], errors="coerce").fillna(0).to_numpy()[valides]
+        groupes = {
+            "crise": df["topic"].astype(object).fillna("inconnue").to_numpy()[valides],
+            "sentiment": df["sentiment"].astype(object).fillna("inconnu").to_numpy()[valides],
+        }
+        # Une table de cellules (crise, sentiment, cellule) par maille
+        self.niveaux = [_cellules(latitude[valides], longitude[valides], retweets, groupes, pas) for pas in PAS]
+
+    def _selection(self, niveau, crises=None, sentiments=None):
+        cellules = self.niveaux[niveau]
+        if crises is not None:
+            cellules = cellules[cellules["crise"].isin(list(crises))]
+        if sentiments is not None:
+            cellules = cellules[cellules["sentiment"].isin(list(sentiments))]
+        return cellules
+
+    def niveau_adapte(self, crises=None, budget=BUDGET_CELLULES):
+        """Maille la plus fine dont le nombre de cellules (toutes sentiments confondus) tient dans budget."""
+        niveau = 0
+        for i in range(len(PAS)):
+            cellules = self._selection(i, crises)
+            if len(cellules.drop_duplicates(["cellule_lat", "cellule_lon"])) > budget:
+                break
+            niveau = i
+        return niveau
+
+    def cellules(self, niveau, crises=None, sentiments=None, par_sentiment=False):
+        """Marqueurs de la maille PAS[niveau] : latitude, longitude (barycentre), nb_tweets, retweets[, sentiment]."""
+        return _finaliser(self._selection(niveau, crises, sentiments), par_sentiment)
+
+
+# Colonnes gardées pour les points des cartes
+COLONNES_POINTS = ["latitude", "longitude", "retweet_count", "sentiment", "text", "topic"]
+# Amplitude du décalage aléatoire (degrés) évitant le chevauchement sur la carte de chaleur
+JITTER = 0.01
+NB_CLASSES_HISTOGRAMME = 30
+
+
+class PointsCarte:
+    def __init__(self, df, graine=42):
+        points = df[COLONNES_POINTS].copy()
+        points["retweet_count"] = pd.to_numeric(points["retweet_count"], errors="coerce").fillna(0)
+        # Crise par crise (plages contiguës), puis par retweets croissants dans chaque crise
+        points = points.sort_values(["topic", "retweet_count"], kind="stable", na_position="last")
+        aleatoire = np.random.default_rng(graine)
+        points["latitude_jitter"] = points["latitude"].to_numpy() + aleatoire.uniform(-JITTER, JITTER, len(points))
+        points["longitude_jitter"] = points["longitude"].to_numpy() + aleatoire.uniform(-JITTER, JITTER, len(points))
+        points["taille_point"] = (points["retweet_count"] * 0.5).clip(5, 40)
+        self.points = points
+
+        self.partitions = partitions.Partitions.depuis_colonne(points["topic"])
+        self.retweets = points["retweet_count"].to_numpy()
+        # Toutes crises : ordre global par retweets croissants
+        self.ordre = np.argsort(self.retweets, kind="stable")
+        self.retweets_tries = self.retweets[self.ordre]
+        # Ligne de chaque position de la table parmi les points (-1 hors carte)
+        index = points.index.to_numpy(dtype=np.int64)
+        self.rangs = np.full(int(index.max()) + 1 if len(index) else 0, -1, dtype=np.int64)
+        self.rangs[index] = np.arange(len(index))
+        self._histogrammes = {}
+
+    def __len__(self):
+        return len(self.points)
+
+    def _retweets(self, crise=None):
+        # Retweets croissants des points de la crise (toutes crises si None) et début de leur plage
+        if crise is None:
+            return self.retweets_tries, 0
+        tranche = self.partitions.tranche(crise)
+        return self.retweets[tranche], tranche.start
+
+    def effectif(self, crise=None):
+        return len(self._retweets(crise)[0])
+
+    def bornes(self, crise=None):
+        """Nombres minimal et maximal de retweets des points de la crise ((0, 0) si aucun)."""
+        retweets, _ = self._retweets(crise)
+        if not len(retweets):
+            return 0, 0
+        return int(retweets[0]), int(retweets[-1])
+
+    def au_moins(self, seuil, crise=None, zone=None):
+        """
+        Points de la crise (toutes si None) ayant au moins seuil retweets, par retweets
+        croissants ; zone restreint aux positions de table données.
+        """
+        retweets, debut = self._retweets(crise)
+        if zone is not None:
+            zone = np.asarray(zone, dtype=np.int64)
+            lignes = self.rangs[zone[zone < len(self.rangs)]]
+            lignes = lignes[lignes >= 0]
+            if crise is not None:
+                lignes = lignes[(lignes >= debut) & (lignes < debut + len(retweets))]
+            lignes = lignes[self.retweets[lignes] >= seuil]
+            return self.points.iloc[np.sort(lignes)]
+        k = int(np.searchsorted(retweets, seuil, side="left"))
+        if crise is None:
+            return self.points.iloc[self.ordre[k:]]
+        return self.points.iloc[debut + k:debut + len(retweets)]
+
+    def histogramme(self, crise=None, nb_classes=NB_CLASSES_HISTOGRAMME):
+        """Nombre de points par classe de retweets (index : borne basse de la classe)."""
+        cle = (crise, nb_classes)
+        if cle not in self._histogrammes:
+            retweets, _ = self._retweets(crise)
+            if len(retweets):
+                bas, haut = self.bornes(crise)
+                effectifs, bords = np.histogram(retweets, bins=max(1, min(nb_classes, haut - bas + 1)), range=(bas, haut + 1))
+            else:
+                effectifs, bords = np.zeros(0, dtype=np.int64), np.zeros(1)
+            self._histogrammes[cle] = pd.Series(effectifs, index=pd.Index(np.floor(bords[:-1]).astype(np.int64), name="retweets"),
+                                                name="nb_tweets")
+        return self._histogrammes[cle]
+
+
+def resume_crises(df):
+    """Une ligne par crise des tweets géolocalisés de df : nb_tweets, part_positifs (%), latitude, longitude, exemple."""
+    geo_df = df.dropna(subset=["latitude", "longitude"])
+    resume = geo_df.assign(positif=geo_df["sentiment"].eq("positive")).groupby("topic", observed=True, sort=False).agg(
+        nb_tweets=("latitude", "size"),
+        nb_positifs=("positif", "sum"),
+        latitude=("latitude", "mean"),
+        longitude=("longitude", "mean"),
+        exemple=("text", "first"),
+    )
+    resume["part_positifs"] = resume["nb_positifs"] / resume["nb_tweets"] * 100
+    resume["exemple"] = resume["exemple"].fillna("").astype(str).str[:100] + "..."
+    return resume.drop(columns="nb_positifs").reset_index()
+
+
+def signature_carte(df):
+    # Identifie ce qu'une carte rendue affiche de df : ses tweets (tweet_id, dans l'ordre)
+    # et les libellés des crises
+    topics = df["topic"]
+    libelles = topics.cat.categories if isinstance(topics.dtype, pd.CategoricalDtype) else topics.dropna().unique()
+    h = hashlib.md5(repr(sorted(map(str, libelles))).encode())
+    lignes = df["tweet_id"] if "tweet_id" in df.columns else df[["latitude", "longitude"]]
+    h.update(pd.util.hash_pandas_object(lignes, index=False).to_numpy().tobytes())
+    return f"{len(df)}-{h.hexdigest()}"
+
+
+def _construire(tables, table, csv_path):
+    # Tweets affichables sur les cartes : bitmap « geolocalise »
+    geolocalises = bitmaps.index_bitmaps(table, csv_path).valeur("geolocalise", True)
+    return CubeSpatial(tables[table].iloc[geolocalises.positions()], taille_table=len(tables[table]))
+
+
+def cube_spatial(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    return chargement.structure_derivee(f"geo/{table}", lambda tables: _construire(tables, table, csv_path), csv_path)
+
+
+def points_carte(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """Points géolocalisés de table triés par retweets, crise par crise (cf. PointsCarte)."""
+    def construire(tables):
+        geolocalises = bitmaps.index_bitmaps(table, csv_path).valeur("geolocalise", True)
+        return PointsCarte(tables[table].iloc[geolocalises.positions()])
+    return chargement.structure_derivee(f"geo/points/{table}", construire, csv_path)
+
+
+def cellules(df=None, crises=None, par_sentiment=False, table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """
+    (maille, cellules) à afficher pour df, à la maille la plus fine qui tient dans
+    BUDGET_CELLULES. Le cube partagé sert quand df est absent ou est la table entière
+    (restreint aux crises données) ; pour un autre filtre, les cellules sont calculées
+    à la volée sur ses lignes.
+    """
+    cube = cube_spatial(table, csv_path)
+    if df is None or jointures.est_table_entiere(df, table, csv_path=csv_path):
+        niveau = cube.niveau_adapte(crises)
+        return PAS[niveau], cube.cellules(niveau, crises, par_sentiment=par_sentiment)
+    niveau = niveau_adapte(df)
+    return PAS[niveau], agreger(df, PAS[niveau], par_sentiment)
@@ -0,0 +1,212 @@
+"""Réseau complet des interactions entre utilisateurs, stocké au format CSR.
+
+Trois relations relient les utilisateurs :
+    - retweet : retweeter_id → original_user_id (retweets_clean), pondéré par times ;
+    - réponse : auteur du tweet start_id → end_id (reply_tweet_to_user) ;
+    - mention : auteur du tweet → utilisateur mentionné (« @nom » du texte, User_clean).
+Les arêtes identiques (source, cible, type, crise) sont fusionnées, leurs poids additionnés.
+Les utilisateurs sont renumérotés en nœuds int32 contigus (noeuds[i] : user_id du nœud i)
+et les arêtes rangées par source : les voisins sortants du nœud i sont
+indices[indptr[i]:indptr[i + 1]]. Réponses et mentions portent la crise (event_id) du
+tweet ; un retweet, qui ne désigne pas de tweet, n'a pas de crise. ordre_crises range
+les arêtes par crise : celles d'une crise sont une plage de cet ordre (Partitions).
+
+Le graphe est construit une fois, écrit dans CSV/snapshots/graphe/ (un .npy par tableau)
+et relu en projection mémoire (np.load(mmap_mode="r")) tant que ses sources sont
+inchangées.
+"""
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from donnees import chargement, faits, jointures, partitions, schema, snapshot
+
+VERSION_GRAPHE = 1
+GRAPHE_DIR = "graphe"
+TYPES = ["retweet", "reponse", "mention"]
+SOURCES = ["retweets_clean", "reply_tweet_to_user", "User_clean"]
+TABLEAUX = ["noeuds", "indptr", "indices", "types", "poids", "crises", "ordre_crises"]
+
+# Arêtes d'une sélection : tableaux alignés (indices de nœuds, type dans TYPES, poids)
+Aretes = namedtuple("Aretes", ["source", "cible", "type", "poids"])
+
+
+def _ids(serie):
+    return pd.to_numeric(serie, errors="coerce").to_numpy(dtype=np.float64)
+
+
+class GrapheInteractions:
+    def __init__(self, noeuds, indptr, indices, types, poids, crises, ordre_crises, libelles_crises):
+        self.noeuds = noeuds                # user_id de chaque nœud (croissants)
+        self.indptr = indptr                # int64, nb_noeuds + 1
+        self.indices = indices              # int32 : cible de chaque arête
+        self.types = types                  # int8 : indice dans TYPES
+        self.poids = poids                  # float32
+        self.crises = crises                # int32 : indice dans libelles_crises (-1 : sans crise)
+        self.ordre_crises = ordre_crises    # arêtes rangées par crise
+        self.libelles_crises = list(libelles_crises)
+        codes = np.asarray(crises)[np.asarray(ordre_crises)]
+        libelles = pd.Series(np.asarray(self.libelles_crises + [None], dtype=object)[codes])
+        self.partitions = partitions.Partitions.depuis_colonne(libelles)
+
+    @property
+    def nb_noeuds(self):
+        return len(self.noeuds)
+
+    @property
+    def nb_aretes(self):
+        return len(self.indices)
+
+    def sources(self):
+        """Source de chaque arête (forme COO de l'adjacence)."""
+        return np.repeat(np.arange(self.nb_noeuds, dtype=np.int32), np.diff(self.indptr))
+
+    def voisins(self, noeud):
+        return self.indices[self.indptr[noeud]:self.indptr[noeud + 1]]
+
+    def indices_noeuds(self, user_ids):
+        """Nœud de chaque user_id (-1 si absent du graphe)."""
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        rangs = np.searchsorted(self.noeuds, user_ids).clip(max=max(self.nb_noeuds - 1, 0))
+        if not self.nb_noeuds:
+            return np.full(len(user_ids), -1, dtype=np.int64)
+        return np.where(self.noeuds[rangs] == user_ids, rangs, -1)
+
+    def aretes(self, crises=None, types=None):
+        """Arêtes des crises données (toutes si None), restreintes aux types donnés (noms)."""
+        if crises is None:
+            selection = slice(None)
+            source = self.sources()
+        else:
+            selection = self.ordre_crises[self.partitions.positions(crises)]
+            source = np.searchsorted(self.indptr, selection, side="right").astype(np.int32) - 1
+        aretes = Aretes(source, np.asarray(self.indices[selection]), np.asarray(self.types[selection]),
+                        np.asarray(self.poids[selection]))
+        if types is not None:
+            garde = np.isin(aretes.type, [TYPES.index(t) for t in types])
+            aretes = Aretes(*(tableau[garde] for tableau in aretes))
+        return aretes
+
+    def effectifs(self, crises=None):
+        """Nombre d'arêtes de chaque type (crises données, toutes si None)."""
+        types = self.aretes(crises).type
+        return pd.Series(np.bincount(types, minlength=len(TYPES)), index=TYPES)
+
+    def sauver(self, dossier):
+        os.makedirs(dossier, exist_ok=True)
+        for nom in TABLEAUX:
+            tmp_path = os.path.join(dossier, nom + ".tmp.npy")
+            np.save(tmp_path, np.asarray(getattr(self, nom)))
+            os.replace(tmp_path, os.path.join(dossier, nom + ".npy"))
+
+    @classmethod
+    def charger(cls, dossier, libelles_crises):
+        tableaux = {nom: np.load(os.path.join(dossier, nom + ".npy"), mmap_mode="r") for nom in TABLEAUX}
+        return cls(libelles_crises=libelles_crises, **tableaux)
+
+
+def construire(tables, table_faits):
+    """Graphe des retweets, réponses et mentions."""
+    tweets = table_faits.tweets
+    evenements = tweets["event_id"].astype("category")
+    libelles_crises = [str(c) for c in evenements.cat.categories]
+    crises_tweets = evenements.cat.codes.to_numpy(dtype=np.int32)
+    auteurs = _ids(tweets["user_id"])
+    morceaux = []
+
+    # Retweets : pas de tweet désigné, donc pas de crise
+    retweets = tables["retweets_clean"]
+    morceaux.append(pd.DataFrame({
+        "source": _ids(retweets["retweeter_id"]),
+        "cible": _ids(retweets["original_user_id"]),
+        "type": np.int8(TYPES.index("retweet")),
+        "crise": np.int32(-1),
+        "poids": np.nan_to_num(_ids(retweets["times"]), nan=1.0),
+    }))
+
+    # Réponses : auteur et crise du tweet de départ (table de faits)
+    reponses = tables["reply_tweet_to_user"]
+    lignes = jointures.IndexPositions(tweets["tweet_id"].to_numpy()).positions_de(reponses["start_id"])
+    trouvees = lignes >= 0
+    morceaux.append(pd.DataFrame({
+        "source": auteurs[lignes[trouvees]],
+        "cible": _ids(reponses["end_id"])[trouvees],
+        "type": np.int8(TYPES.index("reponse")),
+        "crise": crises_tweets[lignes[trouvees]],
+        "poids": 1.0,
+    }))
+
+    # Mentions « @nom » du texte, jointes à User_clean par screen_name
+    mentions = tweets["text"].astype(str).reset_index(drop=True).str.extractall(r"@(\w+)")[0]
+    utilisateurs = tables["User_clean"].drop_duplicates("screen_name", keep="last")
+    rangs = pd.Index(utilisateurs["screen_name"]).get_indexer(mentions.to_numpy())
+    lignes = mentions.index.get_level_values(0).to_numpy()[rangs >= 0]
+    morceaux.append(pd.DataFrame({
+        "source": auteurs[lignes],
+        "cible": _ids(utilisateurs["user_id"])[rangs[rangs >= 0]],
+        "type": np.int8(TYPES.index("mention")),
+        "crise": crises_tweets[lignes],
+        "poids": 1.0,
+    }))
+
+    # Fusion des arêtes identiques ; le tri (source, cible) donne directement l'ordre CSR
+    aretes = pd.concat(morceaux, ignore_index=True).dropna(subset=["source", "cible"])
+    aretes = aretes.groupby(["source", "cible", "type", "crise"], sort=True)["poids"].sum().reset_index()
+    noeuds = np.unique(np.concatenate([
+        _ids(tables["User_clean"]["user_id"]), aretes["source"].to_numpy(), aretes["cible"].to_numpy(),
+    ]))
+    noeuds = noeuds[~np.isnan(noeuds)].astype(np.int32)
+    sources = np.searchsorted(noeuds, aretes["source"].to_numpy())
+    crises = aretes["crise"].to_numpy(dtype=np.int32)
+    # Arêtes sans crise rangées en dernier
+    ordre_crises = np.argsort(np.where(crises < 0, len(libelles_crises), crises), kind="stable").astype(np.int64)
+    return GrapheInteractions(
+        noeuds=noeuds,
+        indptr=np.searchsorted(sources, np.arange(len(noeuds) + 1)).astype(np.int64),
+        indices=np.searchsorted(noeuds, aretes["cible"].to_numpy()).astype(np.int32),
+        types=aretes["type"].to_numpy(dtype=np.int8),
+        poids=aretes["poids"].to_numpy(dtype=np.float32),
+        crises=crises,
+        ordre_crises=ordre_crises,
+        libelles_crises=libelles_crises,
+    )
+
+
+def chemin_graphe(csv_path):
+    return os.path.join(csv_path, snapshot.SNAPSHOT_DIR, GRAPHE_DIR)
+
+
+def _construire(tables, csv_path):
+    table_faits = faits.table_faits(csv_path)
+    if not snapshot.disponible():
+        return construire(tables, table_faits)
+
+    # Graphe relu en projection mémoire tant que la table de faits et les sources sont inchangées
+    signatures = chargement.signatures(csv_path)
+    cle = {
+        "version": [VERSION_GRAPHE, schema.VERSION],
+        "faits": table_faits.version,
+        "sources": {nom: list(signatures[nom]) for nom in SOURCES if nom in signatures},
+    }
+    dossier = chemin_graphe(csv_path)
+    try:
+        with open(os.path.join(dossier, "manifeste.json")) as f:
+            manifeste = json.load(f)
+    except (OSError, ValueError):
+        manifeste = {}
+    if manifeste.get("cle") == cle:
+        return GrapheInteractions.charger(dossier, manifeste["crises"])
+
+    graphe = construire(tables, table_faits)
+    graphe.sauver(dossier)
+    with open(os.path.join(dossier, "manifeste.json"), "w") as f:
+        json.dump({"cle": cle, "crises": graphe.libelles_crises}, f)
+    return GrapheInteractions.charger(dossier, graphe.libelles_crises)
+
+
+def graphe_interactions(csv_path=chargement.CSV_PATH):
+    """Graphe complet des interactions, partagé et projeté en mémoire depuis le disque."""
+    return chargement.structure_derivee("graphe", lambda tables: _construire(tables, csv_path), csv_path)
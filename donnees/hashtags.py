@@ -0,0 +1,141 @@
+"""Cube creux hashtag × crise et classements pré-triés.
+
+Les comptages (hashtag, crise) non nuls sont rangés deux fois : par hashtag (format
+CSR, pour retrouver les crises d'un hashtag) et par crise, triés par nombre
+d'occurrences décroissant. Un top N, global ou pour une crise, n'est alors qu'une
+tranche des N premières entrées : le slider ne déclenche plus aucun regroupement.
+"""
+import numpy as np
+import pandas as pd
+
+from donnees import chargement, jointures, listes
+
+
+class CubeHashtags:
+    def __init__(self, hashtags, crises, codes_hashtags, codes_crises, poids):
+        self.hashtags = np.asarray(hashtags, dtype=object)
+        self.crises = np.asarray(crises, dtype=object)
+        nb_hashtags, nb_crises = len(self.hashtags), len(self.crises)
+
+        # Somme des poids par cellule (hashtag, crise) non vide
+        cles = np.asarray(codes_hashtags, dtype=np.int64) * nb_crises + np.asarray(codes_crises, dtype=np.int64)
+        # (seules les cellules occupées sont agrégées, pas de tableau H x C)
+        presents, inverse = np.unique(cles, return_inverse=True)
+        cellules = np.bincount(inverse, weights=poids, minlength=len(presents))
+        non_nulles = cellules != 0
+        presents = presents[non_nulles]
+        lignes, colonnes = presents // nb_crises, presents % nb_crises
+        valeurs = cellules[non_nulles].astype(np.int64)
+
+        # Par hashtag (CSR) : crises de la ligne h = colonnes[offsets[h]:offsets[h + 1]]
+        self.colonnes = colonnes
+        self.valeurs = valeurs
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(lignes, minlength=nb_hashtags))])
+
+        # Classement global : tri stable, les ex æquo restent dans l'ordre alphabétique
+        self.totaux = np.bincount(lignes, weights=valeurs, minlength=nb_hashtags).astype(np.int64)
+        self.ordre = np.argsort(-self.totaux, kind="stable")[:np.count_nonzero(self.totaux)]
+
+        # Classement par crise : entrées triées par (crise, occurrences décroissantes)
+        ordre_crises = np.lexsort((-valeurs, colonnes))
+        self.lignes_par_crise = lignes[ordre_crises]
+        self.valeurs_par_crise = valeurs[ordre_crises]
+        self.offsets_crises = np.concatenate([[0], np.cumsum(np.bincount(colonnes, minlength=nb_crises))])
+        self._position_crise = {crise: i for i, crise in enumerate(self.crises)}
+
+    @classmethod
+    def depuis_listes(cls, liste, crises):
+        """Cube des hashtags d'une ColonneListe, croisés avec la crise (Series alignée) de chaque ligne."""
+        codes_crises, etiquettes = pd.factorize(crises, sort=True)
+        crise_elements = np.asarray(codes_crises)[liste.lignes()]
+        avec_crise = crise_elements >= 0
+        # Vocabulaire trié : ordre alphabétique pour départager les ex æquo
+        rangs = np.argsort(np.argsort(liste.vocabulaire.astype(str), kind="stable"))
+        return cls(np.sort(liste.vocabulaire.astype(str)), etiquettes, rangs[liste.codes[avec_crise]],
+                   crise_elements[avec_crise], np.ones(avec_crise.sum()))
+
+    @classmethod
+    def depuis_occurrences(cls, hashtags, occurences):
+        """Classement seul (une crise fictive) à partir d'un tableau hashtag / occurrences."""
+        noms = pd.Series(hashtags).str.lower().str.strip()
+        codes, vocabulaire = pd.factorize(noms, sort=True)
+        renseignes = codes >= 0
+        return cls(vocabulaire, ["Toutes"], codes[renseignes], np.zeros(renseignes.sum()),
+                   np.asarray(occurences, dtype=np.float64)[renseignes])
+
+    @property
+    def nb_hashtags(self):
+        return len(self.ordre)
+
+    def nb_hashtags_crise(self, crise):
+        i = self._position_crise.get(crise)
+        return 0 if i is None else int(self.offsets_crises[i + 1] - self.offsets_crises[i])
+
+    def _noms_crises(self, noms_crises):
+        if not noms_crises:
+            return self.crises
+        return np.array([noms_crises.get(c, c) for c in self.crises], dtype=object)
+
+    def crises_de(self, positions, noms_crises=None):
+        # Liste lisible des crises de chaque hashtag, lue dans la ligne CSR du hashtag
+        noms = self._noms_crises(noms_crises)
+        return [
+            ", ".join(sorted(set(noms[self.colonnes[self.offsets[h]:self.offsets[h + 1]]])))
+            for h in positions
+        ]
+
+    def top(self, n, crise=None, noms_crises=None):
+        """Les n hashtags les plus fréquents (toutes crises, ou la crise donnée) : O(n)."""
+        if crise is None:
+            positions = self.ordre[:n]
+            occurences = self.totaux[positions]
+        else:
+            i = self._position_crise.get(crise)
+            if i is None:
+                return pd.DataFrame({"hashtag": [], "occurences": [], "crises": []})
+            debut = self.offsets_crises[i]
+            fin = min(debut + n, self.offsets_crises[i + 1])
+            positions = self.lignes_par_crise[debut:fin]
+            occurences = self.valeurs_par_crise[debut:fin]
+        return pd.DataFrame({
+            "hashtag": self.hashtags[positions],
+            "occurences": occurences,
+            "crises": self.crises_de(positions, noms_crises),
+        })
+
+    def detail(self, n, noms_crises=None):
+        """Occurrences par (hashtag, crise) des n premiers hashtags du classement global."""
+        positions = self.ordre[:n]
+        longueurs = self.offsets[positions + 1] - self.offsets[positions]
+        debuts = np.concatenate([[0], np.cumsum(longueurs)])
+        entrees = np.repeat(self.offsets[positions] - debuts[:-1], longueurs) + np.arange(debuts[-1])
+        return pd.DataFrame({
+            "hashtag": np.repeat(self.hashtags[positions], longueurs),
+            "topic": self._noms_crises(noms_crises)[self.colonnes[entrees]],
+            "occurences": self.valeurs[entrees],
+        })
+
+
+def classement_hashtags(csv_path=chargement.CSV_PATH):
+    """Classement des hashtags de Hashtag_clean (noms normalisés, occurrences cumulées)."""
+    return chargement.structure_derivee(
+        "hashtags/Hashtag_clean",
+        lambda tables: CubeHashtags.depuis_occurrences(tables["Hashtag_clean"]["hashtag_id"], tables["Hashtag_clean"]["occurences"]),
+        csv_path,
+    )
+
+
+def cube_tweets(df=None, table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """
+    Cube hashtag × topic des tweets de table, partagé. Pour un df autre que la table
+    entière, le cube est construit à la volée sur ses lignes.
+    """
+    if df is not None and not jointures.est_table_entiere(df, table, csv_path=csv_path):
+        return CubeHashtags.depuis_listes(listes.pour(df, "hashtags", table, True, csv_path), df["topic"])
+    return chargement.structure_derivee(
+        f"hashtags/{table}",
+        lambda tables: CubeHashtags.depuis_listes(
+            listes.colonne_liste(table, "hashtags", True, csv_path), tables[table]["topic"]
+        ),
+        csv_path,
+    )
@@ -0,0 +1,144 @@
+"""Classement d'influence sur le réseau complet des interactions (cf. donnees/graphe.py).
+
+Trois mesures sont calculées par itérations de produits matrice creuse × vecteur
+(scipy.sparse), sur toutes les arêtes (retweets, réponses, mentions, pondérées) :
+    - PageRank (amortissement 0,85 ; la masse des nœuds sans arête sortante est
+      redistribuée uniformément) ;
+    - HITS : score d'autorité (cité par de bons pivots) et de pivot ;
+    - degré entrant pondéré (somme des poids des arêtes reçues).
+Le classement global et celui de chaque crise (arêtes de la crise seule, sur ses seuls
+nœuds) sont calculés une fois par version des données ; une autre sélection de crises
+est calculée à la demande puis gardée.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from donnees import chargement, graphe
+
+try:
+    import scipy.sparse as sparse
+except ImportError:  # scipy absent : produits calculés par np.bincount
+    sparse = None
+
+AMORTISSEMENT = 0.85
+TOLERANCE = 1e-10
+MAX_ITERATIONS = 200
+CRITERES = {
+    "pagerank": "PageRank",
+    "autorite": "Autorité (HITS)",
+    "pivot": "Pivot (HITS)",
+    "degre_entrant": "Degré entrant pondéré",
+}
+_TAILLE_CACHE = 64
+
+
+class _Adjacence:
+    # Produits A·x et Aᵀ·x de la matrice d'adjacence pondérée (source → cible)
+    def __init__(self, source, cible, poids, n):
+        self.n = n
+        if sparse is not None:
+            self.matrice = sparse.csr_matrix((poids, (source, cible)), shape=(n, n), dtype=np.float64)
+            self.transposee = self.matrice.T.tocsr()
+        else:
+            self.source, self.cible, self.poids = source, cible, poids.astype(np.float64)
+
+    def produit(self, x):
+        if sparse is not None:
+            return self.matrice @ x
+        return np.bincount(self.source, weights=self.poids * x[self.cible], minlength=self.n)
+
+    def produit_transpose(self, x):
+        if sparse is not None:
+            return self.transposee @ x
+        return np.bincount(self.cible, weights=self.poids * x[self.source], minlength=self.n)
+
+
+def pagerank(adjacence, amortissement=AMORTISSEMENT, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    n = adjacence.n
+    sortants = adjacence.produit(np.ones(n))
+    pendants = sortants == 0
+    inverse = np.divide(1.0, sortants, out=np.zeros(n), where=~pendants)
+    rang = np.full(n, 1.0 / n)
+    for _ in range(max_iterations):
+        suivant = amortissement * (adjacence.produit_transpose(rang * inverse) + rang[pendants].sum() / n) \
+            + (1 - amortissement) / n
+        ecart = np.abs(suivant - rang).sum()
+        rang = suivant
+        if ecart < n * tolerance:
+            break
+    return rang / rang.sum()
+
+
+def hits(adjacence, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """(autorités, pivots), chacun normalisé à une somme de 1."""
+    n = adjacence.n
+    pivots = np.full(n, 1.0 / n)
+    autorites = pivots
+    for _ in range(max_iterations):
+        autorites = adjacence.produit_transpose(pivots)
+        autorites /= max(autorites.sum(), 1e-300)
+        suivants = adjacence.produit(autorites)
+        suivants /= max(suivants.sum(), 1e-300)
+        ecart = np.abs(suivants - pivots).sum()
+        pivots = suivants
+        if ecart < n * tolerance:
+            break
+    return autorites, pivots
+
+
+def mesures(aretes, noeuds):
+    """Mesures d'influence des nœuds touchés par aretes (graphe.Aretes) : une ligne par user_id."""
+    presents, locaux = np.unique(np.concatenate([aretes.source, aretes.cible]), return_inverse=True)
+    if not len(presents):
+        # Sélection sans arête : table vide, mais typée comme les autres (nlargest...)
+        return pd.DataFrame({
+            "user_id": np.empty(0, dtype=np.asarray(noeuds).dtype),
+            **{critere: np.empty(0, dtype=np.float64) for critere in CRITERES},
+        })
+    source, cible = locaux[:len(aretes.source)], locaux[len(aretes.source):]
+    poids = np.asarray(aretes.poids, dtype=np.float64)
+    adjacence = _Adjacence(source, cible, poids, len(presents))
+    autorites, pivots = hits(adjacence)
+    return pd.DataFrame({
+        "user_id": np.asarray(noeuds)[presents],
+        "pagerank": pagerank(adjacence),
+        "autorite": autorites,
+        "pivot": pivots,
+        "degre_entrant": np.bincount(cible, weights=poids, minlength=len(presents)),
+    })
+
+
+class Classement:
+    def __init__(self, reseau, utilisateurs):
+        self.reseau = reseau
+        self.noms = utilisateurs.drop_duplicates("user_id").set_index("user_id")["screen_name"]
+        self._verrou = threading.Lock()
+        self._mesures = {None: mesures(reseau.aretes(), reseau.noeuds)}
+        for crise in reseau.partitions.valeurs:
+            self._mesures[(crise,)] = mesures(reseau.aretes([crise]), reseau.noeuds)
+
+    def mesures(self, crises=None):
+        """Mesures de toutes les crises (None) ou des crises données, réunies en un seul graphe."""
+        cle = None if crises is None else tuple(sorted(crises))
+        with self._verrou:
+            if cle not in self._mesures:
+                if len(self._mesures) > _TAILLE_CACHE + len(self.reseau.partitions.valeurs):
+                    self._mesures = {c: m for c, m in self._mesures.items() if c is None or len(c) == 1}
+                self._mesures[cle] = mesures(self.reseau.aretes(list(cle)), self.reseau.noeuds)
+            return self._mesures[cle]
+
+    def top(self, crises=None, critere="pagerank", k=10):
+        """Les k utilisateurs les mieux classés selon critere, avec leur screen_name."""
+        resultat = self.mesures(crises).nlargest(k, critere)
+        return resultat.assign(screen_name=resultat["user_id"].map(self.noms)).reset_index(drop=True)
+
+
+def classement(csv_path=chargement.CSV_PATH):
+    """Classements d'influence global et par crise, calculés une fois par version des données."""
+    return chargement.structure_derivee(
+        "influence",
+        lambda tables: Classement(graphe.graphe_interactions(csv_path), tables["User_clean"]),
+        csv_path,
+    )
@@ -0,0 +1,216 @@
+"""Jointures par positions entières entre tweets, posted, is_about, événements et demandes d'aide.
+
+Plutôt que des DataFrame.merge sur des identifiants convertis en str à chaque affichage,
+on construit une fois (par version des données) des index denses identifiant -> position
+de ligne. Une jointure devient alors un simple rassemblement de tableaux (np.take).
+"""
+import numpy as np
+import pandas as pd
+
+from donnees import chargement
+
+
+class IndexPositions:
+    """
+    Index identifiant entier -> position de ligne (-1 si absent).
+    Les identifiants du projet sont des indices de nœuds presque contigus : un tableau
+    dense de taille max(id) + 1 suffit ; sinon on retombe sur une recherche dichotomique.
+    En cas de doublon, positions_de retient la première ligne ; correspondances donne
+    toutes les lignes de chaque identifiant.
+    """
+
+    def __init__(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        lignes = np.arange(len(ids), dtype=np.int32)
+        self.taille = len(ids)
+        self.ids = ids
+        self._ordre = None
+        self.dense = len(ids) > 0 and ids.min() >= 0 and ids.max() < 4 * len(ids) + 1024
+
+        if self.dense:
+            self.positions = np.full(int(ids.max()) + 1, -1, dtype=np.int32)
+            # Écriture à rebours : la première occurrence d'un doublon gagne
+            self.positions[ids[::-1]] = lignes[::-1]
+        else:
+            ordre = np.argsort(ids, kind="stable")
+            self.ids_tries, premiers = np.unique(ids[ordre], return_index=True)
+            self.positions = lignes[ordre][premiers]
+        self.unique = len(np.unique(ids)) == len(ids)
+
+    def positions_de(self, ids):
+        ids = np.asarray(ids, dtype=np.float64 if _a_des_manquants(ids) else np.int64)
+        resultat = np.full(len(ids), -1, dtype=np.int32)
+        if self.taille == 0:
+            return resultat
+        valides = ~np.isnan(ids) if ids.dtype.kind == "f" else np.ones(len(ids), dtype=bool)
+        cles = ids[valides].astype(np.int64)
+
+        if self.dense:
+            dans_bornes = (cles >= 0) & (cles < len(self.positions))
+            trouvees = np.full(len(cles), -1, dtype=np.int32)
+            trouvees[dans_bornes] = self.positions[cles[dans_bornes]]
+        else:
+            rangs = np.searchsorted(self.ids_tries, cles).clip(max=len(self.ids_tries) - 1)
+            trouvees = np.where(self.ids_tries[rangs] == cles, self.positions[rangs], -1).astype(np.int32)
+
+        resultat[valides] = trouvees
+        return resultat
+
+    def correspondances(self, ids):
+        """
+        Couples (rang dans ids, position de ligne) de toutes les lignes de même identifiant,
+        dans l'ordre de ids puis des lignes, comme l'expansion plusieurs-à-plusieurs de
+        merge. Un identifiant sans correspondance donne un seul couple, de position -1.
+        """
+        if self._ordre is None:
+            self._ordre = np.argsort(self.ids, kind="stable")
+        ids_tries = self.ids[self._ordre]
+        ids = np.asarray(ids, dtype=np.float64 if _a_des_manquants(ids) else np.int64)
+        valides = ~np.isnan(ids) if ids.dtype.kind == "f" else np.ones(len(ids), dtype=bool)
+        debuts = np.zeros(len(ids), dtype=np.int64)
+        fins = np.zeros(len(ids), dtype=np.int64)
+        cles = ids[valides].astype(np.int64)
+        debuts[valides] = np.searchsorted(ids_tries, cles, side="left")
+        fins[valides] = np.searchsorted(ids_tries, cles, side="right")
+
+        nombres = np.maximum(fins - debuts, 1)
+        rangs = np.repeat(np.arange(len(ids)), nombres)
+        decalages = np.arange(len(rangs)) - np.repeat(np.cumsum(nombres) - nombres, nombres)
+        lignes = np.minimum(debuts[rangs] + decalages, max(self.taille - 1, 0))
+        trouvees = np.repeat(fins > debuts, nombres)
+        positions = np.where(trouvees, self._ordre[lignes] if self.taille else -1, -1).astype(np.int32)
+        return rangs, positions
+
+
+def _a_des_manquants(ids):
+    return isinstance(ids, pd.Series) and ids.isna().any()
+
+
+def prendre(serie, positions):
+    """
+    Valeurs de serie aux positions données (-1 -> valeur manquante). Comme merge, une
+    colonne entière avec des absents devient float (NaN) ; les autres types sont conservés.
+    """
+    valeurs = serie.array
+    if len(positions) and positions.min() < 0:
+        if serie.dtype.kind in "iu":
+            valeurs = pd.array(serie.to_numpy(dtype=np.float64))
+        elif serie.dtype.kind == "b":
+            valeurs = pd.array(serie.to_numpy(), dtype="boolean")
+    return pd.Series(valeurs.take(positions, allow_fill=True))
+
+
+class MoteurJointures:
+    def __init__(self, tables):
+        self.tables = tables
+        self._index = {}
+
+    def index(self, table, cle):
+        if (table, cle) not in self._index:
+            self._index[(table, cle)] = IndexPositions(self.tables[table][cle].to_numpy())
+        return self._index[(table, cle)]
+
+    def positions(self, table, cle, ids):
+        return self.index(table, cle).positions_de(ids)
+
+    def joindre(self, df, cle_gauche, table, cle, colonnes, interne=False):
+        """
+        Équivalent de df.merge(table[[cle] + colonnes], left_on=cle_gauche, right_on=cle)
+        (how="left", ou "inner" si interne). Si la clé droite a des doublons, chaque ligne
+        de df est répétée pour chacune de ses correspondances, comme avec merge.
+        colonnes : liste, ou dict {colonne de table: nom dans le résultat}.
+        """
+        if not isinstance(colonnes, dict):
+            colonnes = {c: c for c in colonnes}
+        index = self.index(table, cle)
+        if index.unique:
+            rangs, positions = None, index.positions_de(df[cle_gauche])
+        else:
+            rangs, positions = index.correspondances(df[cle_gauche])
+        if interne:
+            garder = positions >= 0
+            rangs = np.flatnonzero(garder) if rangs is None else rangs[garder]
+            positions = positions[garder]
+        if rangs is not None:
+            df = df.iloc[rangs]
+        droite = self.tables[table]
+        ajouts = {nom: prendre(droite[colonne], positions).values for colonne, nom in colonnes.items()}
+        return df.reset_index(drop=True).assign(**ajouts)
+
+    # --- Jointures métier partagées par les pages ---
+
+    def engagement(self, table="Tweet_date_clean"):
+        """
+        Engagement par (utilisateur, crise) : nombre de tweets, retweets, réponses reçues,
+        score = retweets + réponses reçues, plus screen_name / followers_count.
+        """
+        tweets = self.tables[table]
+        base = pd.DataFrame({"tweet_id": tweets["tweet_id"].to_numpy()})
+        base["retweet_count"] = tweets["retweet_count"].to_numpy()
+        base["reply_count"] = tweets["reply_count"].to_numpy() if "reply_count" in tweets.columns else 0
+        base = self.joindre(base, "tweet_id", "posted_clean", "tweet_id", ["user_id"])
+        base = self.joindre(base, "tweet_id", "is_about_clean", "tweet_id", ["event_id"])
+
+        engagement = base.groupby(["user_id", "event_id"]).agg(
+            nb_tweets=("tweet_id", "count"),
+            total_retweets=("retweet_count", "sum"),
+            total_replies=("reply_count", "sum"),
+        ).reset_index()
+        engagement["user_id"] = engagement["user_id"].astype(np.int32)
+        engagement["event_id"] = engagement["event_id"].astype(np.int32)
+
+        # Réponses reçues : comptage par position d'utilisateur (bincount)
+        users = self.tables["User_clean"]
+        positions_cibles = self.positions("User_clean", "user_id", self.tables["reply_tweet_to_user"]["end_id"])
+        recues = np.bincount(positions_cibles[positions_cibles >= 0], minlength=len(users))
+        positions_users = self.positions("User_clean", "user_id", engagement["user_id"])
+        engagement["nb_replies_received"] = np.where(positions_users >= 0, recues[positions_users], 0)
+
+        engagement["engagement_score"] = engagement["total_retweets"] + engagement["nb_replies_received"]
+        engagement["retweet_ratio"] = engagement["total_retweets"] / engagement["nb_tweets"]
+
+        engagement = self.joindre(engagement, "user_id", "User_clean", "user_id", ["screen_name", "followers_count"])
+        engagement = self.joindre(engagement, "event_id", "Event_clean", "node_id", {"event_id": "event_name"})
+        # Crise absente d'Event_clean : « inconnu », pour rester sélectionnable dans les pages
+        engagement["event_name"] = engagement["event_name"].astype(object).fillna("inconnu")
+        return engagement
+
+
+def moteur(csv_path=chargement.CSV_PATH):
+    return chargement.structure_derivee("jointures", MoteurJointures, csv_path)
+
+
+def est_table_entiere(df, table, cle="tweet_id", csv_path=chargement.CSV_PATH):
+    """Vrai si df a exactement les lignes de la table partagée, dans le même ordre (vérifié sur cle)."""
+    source = moteur(csv_path).tables[table]
+    if len(df) != len(source) or cle not in df.columns:
+        return False
+    return df[cle].reset_index(drop=True).equals(source[cle].reset_index(drop=True))
+
+
+def positions_lignes(df, table, cle="tweet_id", csv_path=chargement.CSV_PATH):
+    """
+    Positions dans la table partagée des lignes de df, un filtre de celle-ci. L'index de
+    df (conservé par les filtres booléens et iloc) n'est retenu que si la colonne cle y
+    concorde avec la table ; après un reset_index ou un concat, les lignes sont
+    retrouvées par leur cle. ValueError si une ligne est absente de la table.
+    """
+    moteur_ = moteur(csv_path)
+    source = moteur_.tables[table]
+    if cle not in df.columns:
+        raise ValueError(f"Colonne {cle} absente : lignes de {table} impossibles à situer")
+    index = df.index.to_numpy()
+    if index.dtype.kind in "iu" and (not len(index) or (index.min() >= 0 and index.max() < len(source))):
+        if source[cle].iloc[index].reset_index(drop=True).equals(df[cle].reset_index(drop=True)):
+            return index.astype(np.int64)
+    positions = moteur_.positions(table, cle, df[cle])
+    if len(positions) and positions.min() < 0:
+        raise ValueError(f"Lignes absentes de la table {table}")
+    return positions.astype(np.int64)
+
+
+def engagement(table="Tweet_date_clean", csv_path=chargement.CSV_PATH):
+    """Engagement par (utilisateur, crise) de toutes les crises, calculé une fois par version des données."""
+    return chargement.structure_derivee(
+        f"jointures/engagement/{table}", lambda tables: moteur(csv_path).engagement(table), csv_path
+    )
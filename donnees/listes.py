@@ -0,0 +1,147 @@
+"""Colonnes de listes (hashtags, post_category) stockées au format CSR.
+
+Dans les CSV, ces colonnes contiennent des listes Python sérialisées ("['a', 'b']").
+Elles sont analysées une seule fois, à la compilation des instantanés, sans eval :
+les éléments de toutes les lignes sont mis bout à bout dans un tableau de codes
+(encodage par dictionnaire sur un vocabulaire), et offsets[i]:offsets[i + 1] délimite
+les éléments de la ligne i. Les comptages par crise deviennent de simples bincount.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from donnees import chargement, jointures
+
+# Élément entre apostrophes ou entre guillemets (repr d'une chaîne Python)
+_ELEMENT = r"""'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)\""""
+_VIDES = ["", "nan", "None", "[]"]
+
+
+class ColonneListe:
+    """Les éléments de la ligne i sont vocabulaire[codes[offsets[i]:offsets[i + 1]]]."""
+
+    def __init__(self, codes, offsets, vocabulaire):
+        self.codes = np.asarray(codes, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.vocabulaire = np.asarray(vocabulaire, dtype=object)
+
+    @classmethod
+    def depuis_serie(cls, serie):
+        texte = pd.Series(serie.to_numpy(dtype=object), dtype="string").str.strip()
+        est_liste = texte.str.startswith("[").fillna(False).to_numpy()
+
+        # Listes sérialisées : extraction vectorisée des éléments entre quotes
+        elements = texte[est_liste].str.extractall(_ELEMENT)
+        valeurs = elements[0].fillna(elements[1]).str.replace(r"\\(.)", r"\1", regex=True)
+        lignes = elements.index.get_level_values(0).to_numpy()
+
+        # Valeur isolée (non sérialisée) : liste à un élément, comme l'ancien to_list
+        isoles = texte[~est_liste & texte.notna().to_numpy() & ~texte.isin(_VIDES).to_numpy()]
+        valeurs = pd.concat([valeurs, isoles], ignore_index=True).str.strip()
+        lignes = np.concatenate([lignes, isoles.index.to_numpy()])
+
+        garder = (valeurs != "").to_numpy()
+        valeurs, lignes = valeurs[garder], lignes[garder]
+        ordre = np.argsort(lignes, kind="stable")
+        codes, vocabulaire = pd.factorize(valeurs.to_numpy(dtype=object)[ordre])
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(lignes, minlength=len(texte)))])
+        return cls(codes, offsets, vocabulaire)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def longueurs(self):
+        return np.diff(self.offsets)
+
+    def lignes(self):
+        # Ligne d'origine de chaque élément
+        return np.repeat(np.arange(len(self)), self.longueurs())
+
+    def sous_ensemble(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        longueurs = self.longueurs()[positions]
+        offsets = np.concatenate([[0], np.cumsum(longueurs)])
+        debuts = np.repeat(self.offsets[positions] - offsets[:-1], longueurs)
+        elements = debuts + np.arange(offsets[-1])
+        return ColonneListe(self.codes[elements], offsets, self.vocabulaire)
+
+    def en_minuscules(self):
+        # Normalisation sur le vocabulaire (une opération par valeur distincte)
+        correspondance, vocabulaire = pd.factorize(pd.Series(self.vocabulaire, dtype=object).str.lower())
+        return ColonneListe(correspondance[self.codes], self.offsets, vocabulaire)
+
+    def compter(self, nom_valeur="valeur"):
+        """Nombre d'occurrences de chaque valeur, par ordre décroissant."""
+        comptes = np.bincount(self.codes, minlength=len(self.vocabulaire))
+        presents = np.flatnonzero(comptes)
+        resultat = pd.DataFrame({nom_valeur: self.vocabulaire[presents], "count": comptes[presents]})
+        return resultat.sort_values("count", ascending=False, kind="stable").reset_index(drop=True)
+
+    def compter_par(self, groupes, nom_valeur="valeur"):
+        """
+        Équivalent de explode + groupby([groupes, valeur]).size() : groupes est une
+        Series alignée sur les lignes (ex. topic). Les lignes sans groupe sont ignorées.
+        """
+        if isinstance(groupes.dtype, pd.CategoricalDtype):
+            codes_groupes, etiquettes = groupes.cat.codes.to_numpy(), groupes.cat.categories
+        else:
+            codes_groupes, etiquettes = pd.factorize(groupes, sort=True)
+        groupe_elements = np.asarray(codes_groupes)[self.lignes()]
+        avec_groupe = groupe_elements >= 0
+
+        taille = len(self.vocabulaire)
+        cles = groupe_elements[avec_groupe].astype(np.int64) * taille + self.codes[avec_groupe]
+        comptes = np.bincount(cles)
+        presents = np.flatnonzero(comptes)
+        return pd.DataFrame({
+            groupes.name or "groupe": np.asarray(etiquettes, dtype=object)[presents // taille],
+            nom_valeur: self.vocabulaire[presents % taille],
+            "count": comptes[presents],
+        }).sort_values([groupes.name or "groupe", nom_valeur], kind="stable").reset_index(drop=True)
+
+    def sauver(self, chemin):
+        tmp_path = chemin + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, codes=self.codes, offsets=self.offsets, vocabulaire=self.vocabulaire.astype(str))
+        os.replace(tmp_path, chemin)
+
+    @classmethod
+    def charger(cls, chemin):
+        with np.load(chemin) as fichier:
+            return cls(fichier["codes"], fichier["offsets"], fichier["vocabulaire"].astype(object))
+
+
+def _construire(tables, table, colonne, csv_path):
+    from donnees import snapshot
+
+    # Listes compilées avec l'instantané (cf. snapshot.compiler_table), sinon analyse ici
+    file_path = os.path.join(csv_path, table + ".csv")
+    chemin = snapshot.chemin_liste(file_path, colonne)
+    if snapshot.disponible() and os.path.exists(chemin) \
+            and os.stat(chemin).st_mtime_ns >= os.stat(snapshot.chemin_snapshot(file_path)).st_mtime_ns:
+        liste = ColonneListe.charger(chemin)
+        if len(liste) == len(tables[table]):
+            return liste
+    return ColonneListe.depuis_serie(tables[table][colonne])
+
+
+def colonne_liste(table, colonne, minuscules=False, csv_path=chargement.CSV_PATH):
+    """Colonne de listes de table, analysée une fois par version des données."""
+    if minuscules:
+        return chargement.structure_derivee(
+            f"listes/{table}.{colonne}/minuscules",
+            lambda tables: colonne_liste(table, colonne, csv_path=csv_path).en_minuscules(),
+            csv_path,
+        )
+    return chargement.structure_derivee(
+        f"listes/{table}.{colonne}",
+        lambda tables: _construire(tables, table, colonne, csv_path),
+        csv_path,
+    )
+
+
+def pour(df, colonne, table="Tweet_sentiment_localisation", minuscules=False, csv_path=chargement.CSV_PATH):
+    """Listes des lignes de df, un filtre de la table partagée (cf. jointures.positions_lignes)."""
+    positions = jointures.positions_lignes(df, table, csv_path=csv_path)
+    return colonne_liste(table, colonne, minuscules, csv_path).sous_ensemble(positions)
@@ -0,0 +1,128 @@
+"""Pagination des résultats de recherche à partir d'ordres de tri pré-calculés.
+
+Pour chaque colonne triable, l'ordre des lignes de la table partagée (argsort stable,
+valeurs manquantes en fin) et le rang de chaque ligne sont calculés une fois par version
+des données. Une page de N lignes d'un résultat (Bitmap ou positions) s'obtient alors :
+    - résultat creux : par les rangs de ses seules lignes (sélection partielle, O(résultat)) ;
+    - résultat dense : en parcourant l'ordre pré-calculé par blocs et en gardant les
+      lignes du résultat, jusqu'à remplir la page (coût lié à la profondeur de la page).
+Seules les lignes de la page sont ensuite lues dans la table (texte compris) et envoyées
+au navigateur.
+La colonne topic est triée sur le nom de crise affiché et non sur le code TRECIS.
+"""
+import numpy as np
+import pandas as pd
+
+from donnees import bitmaps, chargement, schema
+
+COLONNES_TRI = {
+    "created_at": "Date",
+    "retweet_count": "Retweets",
+    "favorite_count": "Likes",
+    "sentiment": "Sentiment",
+    "lieu_extrait": "Lieu",
+    "topic": "Crise",
+}
+TAILLES_PAGE = [25, 50, 100]
+
+# En dessous d'une ligne sur 16 dans le résultat, la sélection par rangs est plus rapide
+_RATIO_CREUX = 16
+_BLOC = 4096
+
+
+def _libelles_affiches(serie, correspondance):
+    # Valeurs telles qu'affichées, catégories remises dans l'ordre alphabétique
+    serie = schema.renommer_modalites(serie, correspondance)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.reorder_categories(sorted(serie.cat.categories, key=str))
+    return serie
+
+
+def libelles_crises(tables):
+    """{"topic": {code TRECIS: nom de la crise}} d'après Event_clean (vide sans Event_clean)."""
+    if "Event_clean" not in tables:
+        return {}
+    evenements = tables["Event_clean"][["trecis_id", "event_id"]].dropna().drop_duplicates("trecis_id")
+    return {"topic": dict(zip(evenements["trecis_id"], evenements["event_id"]))}
+
+
+class IndexTri:
+    def __init__(self, df, libelles=None):
+        # libelles : {colonne: {valeur: libellé affiché}}, la colonne est triée sur les libellés
+        self._df = df
+        self._libelles = libelles or {}
+        self.taille = len(df)
+        self._ordres = {}
+
+    def ordre(self, colonne):
+        """(ordre, rangs, nb_valides) de colonne : les nb_valides premières lignes de l'ordre sont renseignées."""
+        if colonne not in self._ordres:
+            serie = self._df[colonne].reset_index(drop=True)
+            if colonne in self._libelles:
+                serie = _libelles_affiches(serie, self._libelles[colonne])
+            ordre = serie.sort_values(kind="stable", na_position="last").index.to_numpy(dtype=np.int64)
+            rangs = np.empty(self.taille, dtype=np.int64)
+            rangs[ordre] = np.arange(self.taille)
+            self._ordres[colonne] = (ordre, rangs, int(serie.notna().sum()))
+        return self._ordres[colonne]
+
+    def _parcours(self, colonne, descendant):
+        # Blocs successifs de l'ordre de tri ; en décroissant, les valeurs manquantes restent en fin
+        ordre, _, nb_valides = self.ordre(colonne)
+        if descendant:
+            for fin in range(nb_valides, 0, -_BLOC):
+                yield ordre[max(fin - _BLOC, 0):fin][::-1]
+            debut = nb_valides
+        else:
+            debut = 0
+        for i in range(debut, self.taille, _BLOC):
+            yield ordre[i:i + _BLOC]
+
+    def page(self, lignes, colonne, numero, taille_page, descendant=False):
+        """
+        Positions des lignes de la page numero (à partir de 0) du résultat lignes
+        (Bitmap, positions triées ou None pour toute la table), trié selon colonne.
+        Les positions sont celles de la table partagée, pas l'index d'un filtre : pour
+        un DataFrame filtré, passer jointures.positions_lignes(df, table).
+        """
+        debut, fin = numero * taille_page, (numero + 1) * taille_page
+        if isinstance(lignes, bitmaps.Bitmap):
+            if lignes.taille != self.taille:
+                raise ValueError(f"Bitmap de {lignes.taille} lignes pour une table de {self.taille} lignes")
+        elif lignes is not None:
+            lignes = np.asarray(lignes, dtype=np.int64)
+            if len(lignes) and (lignes.min() < 0 or lignes.max() >= self.taille):
+                raise ValueError("Positions hors de la table")
+            lignes = bitmaps.Bitmap.depuis_positions(lignes, self.taille)
+
+        if lignes is not None and lignes.compte() * _RATIO_CREUX < self.taille:
+            positions = lignes.positions().astype(np.int64)
+            _, rangs, nb_valides = self.ordre(colonne)
+            cles = rangs[positions]
+            if descendant:
+                cles = np.where(cles < nb_valides, nb_valides - 1 - cles, cles)
+            if fin < len(cles):
+                retenues = np.argpartition(cles, fin - 1)[:fin]
+            else:
+                retenues = np.arange(len(cles))
+            retenues = retenues[np.argsort(cles[retenues], kind="stable")]
+            return positions[retenues[debut:fin]]
+
+        # Résultat dense : parcours de l'ordre jusqu'à avoir fin lignes du résultat
+        trouves, nb = [], 0
+        for bloc in self._parcours(colonne, descendant):
+            garde = bloc if lignes is None else bloc[lignes.contient(bloc)]
+            trouves.append(garde)
+            nb += len(garde)
+            if nb >= fin:
+                break
+        if not trouves:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(trouves)[debut:fin]
+
+
+def index_tri(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """Ordres de tri de table, calculés à la première demande pour chaque colonne."""
+    return chargement.structure_derivee(
+        f"pagination/{table}", lambda tables: IndexTri(tables[table], libelles_crises(tables)), csv_path
+    )
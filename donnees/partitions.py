@@ -0,0 +1,142 @@
+"""Partitionnement des tables de tweets par crise.
+
+Les tables déclarées dans schema.PARTITIONS sont rangées par crise à l'ingestion
+(schema.ORDRE_PHYSIQUE) : les lignes d'une crise forment une plage contiguë
+[debut, fin). Sur disque, l'instantané Feather est écrit avec un lot (record batch)
+par crise et les bornes des plages dans ses métadonnées (cf. donnees/snapshot.py) ;
+en mémoire, le registre ci-dessous rend les lignes d'une crise par un df.iloc sur une
+tranche, une vue sans copie, au lieu d'un masque df["topic"] == code sur toute la table.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from donnees import chargement, schema
+
+
+class Partitions:
+    def __init__(self, valeurs, debuts, fins, taille, colonne=None):
+        self.valeurs = list(valeurs)
+        self.debuts = np.asarray(debuts, dtype=np.int64)
+        self.fins = np.asarray(fins, dtype=np.int64)
+        self.taille = taille
+        self.colonne = colonne  # colonne de partitionnement, qui sert à vérifier extraire
+        self._rang = {valeur: i for i, valeur in enumerate(self.valeurs)}
+
+    @classmethod
+    def depuis_colonne(cls, serie):
+        """Plages de chaque valeur de serie ; erreur si une valeur n'est pas contiguë."""
+        codes, valeurs = pd.factorize(serie)
+        ruptures = np.flatnonzero(np.diff(codes)) + 1
+        debuts = np.concatenate([[0], ruptures]).astype(np.int64)[:len(codes)]
+        fins = np.concatenate([ruptures, [len(codes)]]).astype(np.int64)[:len(codes)]
+        codes_plages = codes[debuts]
+        if len(np.unique(codes_plages)) != len(codes_plages):
+            raise ValueError(f"Colonne {serie.name} non contiguë : table non triée selon schema.ORDRE_PHYSIQUE")
+        renseignees = codes_plages >= 0
+        return cls(pd.Index(valeurs).take(codes_plages[renseignees]).tolist(),
+                   debuts[renseignees], fins[renseignees], len(codes), serie.name)
+
+    def vers_json(self):
+        return json.dumps({
+            "taille": self.taille,
+            "colonne": self.colonne,
+            "plages": [[valeur, int(d), int(f)] for valeur, d, f in zip(self.valeurs, self.debuts, self.fins)],
+        })
+
+    @classmethod
+    def depuis_json(cls, texte):
+        contenu = json.loads(texte)
+        plages = contenu["plages"]
+        return cls([p[0] for p in plages], [p[1] for p in plages], [p[2] for p in plages], contenu["taille"],
+                   contenu.get("colonne"))
+
+    def __contains__(self, valeur):
+        return valeur in self._rang
+
+    def effectifs(self):
+        return pd.Series(self.fins - self.debuts, index=self.valeurs, dtype="int64")
+
+    def tranche(self, valeur):
+        """Lignes de la partition valeur, sous forme de slice (vide si absente)."""
+        i = self._rang.get(valeur)
+        if i is None:
+            return slice(0, 0)
+        return slice(int(self.debuts[i]), int(self.fins[i]))
+
+    def etendue(self):
+        """Lignes dont la valeur est renseignée (les valeurs manquantes sont rangées en fin)."""
+        if not self.valeurs:
+            return slice(0, 0)
+        return slice(int(self.debuts.min()), int(self.fins.max()))
+
+    def _plages(self, valeurs):
+        # Plages des valeurs retenues, dans l'ordre des lignes, les voisines fusionnées
+        rangs = sorted(self._rang[v] for v in set(valeurs) if v in self._rang)
+        plages = []
+        for i in rangs:
+            debut, fin = int(self.debuts[i]), int(self.fins[i])
+            if plages and plages[-1][1] == debut:
+                plages[-1][1] = fin
+            else:
+                plages.append([debut, fin])
+        return plages
+
+    def positions(self, valeurs):
+        """Positions triées des lignes des partitions retenues (seules ces plages sont lues)."""
+        plages = self._plages(valeurs)
+        if not plages:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(debut, fin) for debut, fin in plages])
+
+    def extraire(self, df, valeurs):
+        """
+        Lignes de df appartenant à la crise valeur (ou à une liste de crises). df est la
+        table partitionnée ou un filtre de celle-ci qui garde son index (positions
+        d'origine, croissantes) : chaque plage y est retrouvée par recherche dichotomique.
+        Les lignes obtenues sont contrôlées sur la colonne de partitionnement ; si l'index
+        ne donne pas les positions (reset_index, tri, concat), la colonne est filtrée.
+        """
+        liste = list(valeurs) if isinstance(valeurs, (list, tuple, set, np.ndarray, pd.Index)) else [valeurs]
+        index = df.index
+        if index.dtype.kind in "iu" and index.is_monotonic_increasing and index.is_unique \
+                and (not len(index) or (index[0] >= 0 and index[-1] < self.taille)):
+            plages = [[index.searchsorted(d), index.searchsorted(f)] for d, f in self._plages(liste)]
+            if self.colonne not in df.columns or self._plages_exactes(df[self.colonne], plages, liste):
+                if not plages:
+                    return df.iloc[0:0]
+                if len(plages) == 1:
+                    return df.iloc[plages[0][0]:plages[0][1]]
+                return df.iloc[np.concatenate([np.arange(d, f) for d, f in plages])]
+        if self.colonne not in df.columns:
+            raise ValueError("Index de df sans positions dans la table et colonne de partitionnement absente")
+        return df[df[self.colonne].isin(liste).to_numpy()]
+
+    @staticmethod
+    def _plages_exactes(colonne, plages, valeurs):
+        # Chaque plage ne contient que les valeurs retenues et en est bordée d'autres
+        # valeurs : à l'ordre des lignes conservé, ce sont toutes les lignes retenues
+        if not plages:
+            return not colonne.isin(valeurs).any()
+        lignes = np.concatenate([np.arange(d, f) for d, f in plages])
+        voisines = np.array([i for d, f in plages for i in (d - 1, f) if 0 <= i < len(colonne)], dtype=np.int64)
+        return bool(colonne.iloc[lignes].isin(valeurs).all()) and not colonne.iloc[voisines].isin(valeurs).any()
+
+
+def _construire(tables, table, csv_path):
+    from donnees import snapshot
+
+    # Bornes lues dans les métadonnées de l'instantané, sinon recalculées sur la colonne
+    df = tables[table]
+    partitions = snapshot.lire_partitions(os.path.join(csv_path, table + ".csv"))
+    if partitions is None or partitions.taille != len(df):
+        partitions = Partitions.depuis_colonne(df[schema.PARTITIONS[table]])
+    partitions.colonne = schema.PARTITIONS[table]
+    return partitions
+
+
+def partitions(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """Registre des partitions par crise de table (cf. schema.PARTITIONS)."""
+    return chargement.structure_derivee(f"partitions/{table}", lambda tables: _construire(tables, table, csv_path), csv_path)
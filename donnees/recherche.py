@@ -0,0 +1,157 @@
+"""Index inversé sur le texte des tweets pour la recherche par mots-clés.
+
+Le texte est découpé en mots (minuscules, \\w+). Pour chaque mot du vocabulaire trié,
+la liste triée des lignes qui le contiennent est stockée au format CSR :
+lignes[offsets[m]:offsets[m + 1]]. Une requête est résolue par union / intersection
+de ces listes, sans parcourir les tweets. Le coût dépend donc de la longueur des
+listes concernées et non de la taille du corpus.
+
+Syntaxe des requêtes :
+    flood rescue        les deux mots (ET)
+    flood OU fire       l'un ou l'autre (OR et | sont aussi acceptés)
+    resc*               mots commençant par « resc »
+    "need help"         expression exacte (sous-chaîne littérale, casse ignorée)
+"""
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from donnees import chargement
+
+_MOT = r"\w+"
+_TERME = re.compile(r'"([^"]*)"|(\S+)')
+_OU = {"ou", "or", "|"}
+
+
+class IndexTexte:
+    def __init__(self, vocabulaire, offsets, lignes, nb_lignes):
+        self.vocabulaire = np.asarray(vocabulaire, dtype=object)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.lignes = np.asarray(lignes, dtype=np.int32)
+        self.nb_lignes = nb_lignes
+
+    @classmethod
+    def depuis_serie(cls, textes):
+        mots = pd.Series(textes.to_numpy(dtype=object), dtype="string").str.lower().str.findall(_MOT)
+        longueurs = mots.str.len().fillna(0).to_numpy(dtype=np.int64)
+        mots = mots.explode().dropna()
+        codes, vocabulaire = pd.factorize(mots.to_numpy(dtype=object), sort=True)
+        lignes = np.repeat(np.arange(len(textes), dtype=np.int64), longueurs)
+
+        # Couples (mot, ligne) uniques, triés par mot puis par ligne
+        couples = np.unique(codes.astype(np.int64) * len(textes) + lignes)
+        codes, lignes = couples // len(textes), couples % len(textes)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(vocabulaire)))])
+        return cls(vocabulaire, offsets, lignes, len(textes))
+
+    def _liste(self, i):
+        return self.lignes[self.offsets[i]:self.offsets[i + 1]]
+
+    def mot(self, mot):
+        """Lignes contenant exactement ce mot."""
+        i = np.searchsorted(self.vocabulaire, mot)
+        if i < len(self.vocabulaire) and self.vocabulaire[i] == mot:
+            return self._liste(i)
+        return np.empty(0, dtype=np.int32)
+
+    def prefixe(self, prefixe):
+        """Lignes contenant un mot commençant par prefixe (plage contiguë du vocabulaire trié)."""
+        debut = np.searchsorted(self.vocabulaire, prefixe, side="left")
+        fin = np.searchsorted(self.vocabulaire, prefixe + "\U0010ffff", side="left")
+        if fin - debut == 1:
+            return self._liste(debut)
+        return np.unique(self.lignes[self.offsets[debut]:self.offsets[fin]])
+
+    def _terme(self, terme, textes):
+        if terme.endswith("*") and len(terme) > 1:
+            return self.prefixe(terme[:-1])
+        mots = re.findall(_MOT, terme)
+        if not mots:
+            return np.empty(0, dtype=np.int32)
+        candidats = _intersection([self.mot(m) for m in mots])
+        if len(mots) == 1 and mots[0] == terme:
+            return candidats
+        # Expression ou ponctuation : vérification littérale sur les seuls candidats
+        if textes is None:
+            return candidats
+        valides = textes.iloc[candidats].str.contains(terme, case=False, regex=False, na=False).to_numpy()
+        return candidats[valides]
+
+    def rechercher(self, requete, textes=None):
+        """
+        Positions (triées) des lignes qui satisfont la requête. textes : la colonne indexée,
+        utilisée pour vérifier les expressions entre guillemets.
+        """
+        groupes, courant = [], []
+        for expression, mot in _TERME.findall(requete.lower()):
+            if not expression and mot in _OU:
+                groupes.append(courant)
+                courant = []
+            else:
+                courant.append(expression or mot)
+        groupes.append(courant)
+        resultats = [_intersection([self._terme(t, textes) for t in groupe]) for groupe in groupes if groupe]
+        if not resultats:
+            return np.arange(self.nb_lignes)
+        return resultats[0] if len(resultats) == 1 else np.unique(np.concatenate(resultats))
+
+    def sauver(self, chemin):
+        tmp_path = chemin + ".tmp"
+        with open(tmp_path, "wb") as f:
+            # Vocabulaire stocké en un seul bloc UTF-8 (les mots \w+ ne contiennent pas de saut de ligne)
+            vocabulaire = np.frombuffer("\n".join(self.vocabulaire).encode(), dtype=np.uint8)
+            np.savez(f, vocabulaire=vocabulaire, offsets=self.offsets, lignes=self.lignes,
+                     nb_lignes=np.array(self.nb_lignes))
+        os.replace(tmp_path, chemin)
+
+    @classmethod
+    def charger(cls, chemin):
+        with np.load(chemin) as fichier:
+            texte = fichier["vocabulaire"].tobytes().decode()
+            vocabulaire = texte.split("\n") if texte else []
+            return cls(vocabulaire, fichier["offsets"], fichier["lignes"], int(fichier["nb_lignes"]))
+
+
+def _intersection(listes):
+    # Intersection de listes triées, en commençant par la plus courte
+    listes = sorted(listes, key=len)
+    resultat = listes[0]
+    for liste in listes[1:]:
+        if not len(resultat):
+            break
+        resultat = resultat[np.isin(resultat, liste, assume_unique=True)]
+    return resultat
+
+
+def _construire(tables, table, colonne, csv_path):
+    from donnees import snapshot
+
+    # Index persisté à côté de l'instantané, reconstruit quand celui-ci est plus récent
+    file_path = os.path.join(csv_path, table + ".csv")
+    textes = tables[table][colonne]
+    if not snapshot.disponible():
+        return IndexTexte.depuis_serie(textes)
+    chemin = snapshot.chemin_index(file_path, colonne)
+    if os.path.exists(chemin) and os.stat(chemin).st_mtime_ns >= os.stat(snapshot.chemin_snapshot(file_path)).st_mtime_ns:
+        index = IndexTexte.charger(chemin)
+        if index.nb_lignes == len(textes):
+            return index
+    index = IndexTexte.depuis_serie(textes)
+    index.sauver(chemin)
+    return index
+
+
+def index_texte(table="Tweet_sentiment_localisation", colonne="text", csv_path=chargement.CSV_PATH):
+    return chargement.structure_derivee(
+        f"recherche/{table}.{colonne}",
+        lambda tables: _construire(tables, table, colonne, csv_path),
+        csv_path,
+    )
+
+
+def rechercher(df, requete, colonne="text", table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """Lignes de df, la table partagée table (non filtrée), qui satisfont la requête."""
+    positions = index_texte(table, colonne, csv_path).rechercher(requete, df[colonne])
+    return df.iloc[positions]
@@ -0,0 +1,271 @@
+"""Géocodage inverse hors ligne : pays et région (admin-1) des tweets géolocalisés.
+
+Les frontières sont lues dans un fichier GeoJSON déposé à côté des CSV
+(CSV/frontieres.geojson, par exemple « Admin 1 – States, Provinces » de Natural Earth) ;
+aucun fichier n'est livré avec le dépôt : sans lui, regions() lève une erreur portant
+MESSAGE_FRONTIERES, que les pages affichent à la place des filtres par pays et de la
+carte par région (cf. disponible). Chaque contour n'est testé que sur les tweets de son
+rectangle englobant (index spatial, cf. donnees/spatial.py), par un lancer de rayon
+vectorisé sur les points et les arêtes (règle pair-impair : trous et parties multiples
+d'un contour sont traités ensemble).
+
+Les codes pays / région de chaque ligne sont persistés à côté de l'instantané
+(<table>.regions.npz) et recalculés quand l'instantané ou le fichier de frontières
+change ; ce fichier fait partie des signatures de chargement (FICHIERS_ANNEXES), si
+bien que l'ajouter ou le remplacer invalide aussi les structures en mémoire. Les effectifs par crise et par région (cartes choroplèthes) et la liste des
+lignes de chaque pays ou région (filtres) en sont déduits une fois par version des
+données.
+"""
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from donnees import chargement, spatial
+
+FICHIER_FRONTIERES = "frontieres.geojson"
+MESSAGE_FRONTIERES = (
+    "Filtres par pays et carte par région indisponibles : déposer un fichier de frontières "
+    "GeoJSON (Polygon / MultiPolygon, par exemple « Admin 1 – States, Provinces » de "
+    "Natural Earth) sous CSV/" + FICHIER_FRONTIERES + "."
+)
+# Propriétés GeoJSON lues, par ordre de préférence (Natural Earth, GADM, ...)
+PROPRIETES_PAYS = ["admin", "ADMIN", "country", "NAME_0", "geonunit"]
+PROPRIETES_REGION = ["name", "NAME_1", "region"]
+# Nombre de couples (point, arête) testés par bloc
+_BLOC = 1 << 22
+
+# Contour d'une entité GeoJSON : arêtes (x1, y1, x2, y2) de tous ses anneaux
+Contour = namedtuple("Contour", ["pays", "region", "lon_min", "lat_min", "lon_max", "lat_max", "aretes"])
+# Filtre par pays et / ou régions (noms de pays, codes de régions)
+Territoires = namedtuple("Territoires", ["pays", "regions"])
+
+
+def chemin_frontieres(csv_path=chargement.CSV_PATH):
+    return os.path.join(csv_path, FICHIER_FRONTIERES)
+
+
+def disponible(csv_path=chargement.CSV_PATH):
+    """Vrai si le fichier de frontières est présent."""
+    return os.path.exists(chemin_frontieres(csv_path))
+
+
+def _propriete(proprietes, noms):
+    for nom in noms:
+        if proprietes.get(nom):
+            return str(proprietes[nom])
+    return ""
+
+
+def lire_frontieres(chemin):
+    """Contours des entités Polygon / MultiPolygon d'un fichier GeoJSON."""
+    with open(chemin, encoding="utf-8") as f:
+        contenu = json.load(f)
+    contours = []
+    for entite in contenu.get("features", []):
+        geometrie = entite.get("geometry") or {}
+        if geometrie.get("type") == "Polygon":
+            polygones = [geometrie["coordinates"]]
+        elif geometrie.get("type") == "MultiPolygon":
+            polygones = geometrie["coordinates"]
+        else:
+            continue
+        aretes = []
+        for anneau in (a for polygone in polygones for a in polygone):
+            points = np.asarray(anneau, dtype=np.float64)[:, :2]
+            if len(points) < 3:
+                continue
+            if not np.array_equal(points[0], points[-1]):
+                points = np.vstack([points, points[:1]])
+            aretes.append(np.hstack([points[:-1], points[1:]]))
+        if not aretes:
+            continue
+        aretes = np.concatenate(aretes)
+        proprietes = entite.get("properties") or {}
+        contours.append(Contour(
+            _propriete(proprietes, PROPRIETES_PAYS), _propriete(proprietes, PROPRIETES_REGION),
+            aretes[:, 0].min(), aretes[:, 1].min(), aretes[:, 0].max(), aretes[:, 1].max(), aretes,
+        ))
+    return contours
+
+
+def dedans(longitude, latitude, aretes):
+    """Points (longitude, latitude) intérieurs au contour d'arêtes données (pair-impair)."""
+    resultat = np.zeros(len(longitude), dtype=bool)
+    x1, y1, x2, y2 = (aretes[:, i][None, :] for i in range(4))
+    pas = max(1, _BLOC // max(len(aretes), 1))
+    for debut in range(0, len(longitude), pas):
+        x = longitude[debut:debut + pas, None]
+        y = latitude[debut:debut + pas, None]
+        traverse = (y1 > y) != (y2 > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            abscisse = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        resultat[debut:debut + pas] = (traverse & (x < abscisse)).sum(axis=1) % 2 == 1
+    return resultat
+
+
+class Regions:
+    def __init__(self, pays, regions, pays_des_regions, codes_region, topics=None):
+        self.pays = list(pays)
+        self.regions = list(regions)
+        self.pays_des_regions = np.asarray(pays_des_regions, dtype=np.int32)
+        # Région de chaque ligne de la table (-1 : hors des contours ou non géolocalisée)
+        self.codes_region = np.asarray(codes_region, dtype=np.int32)
+        self.taille = len(self.codes_region)
+        self.codes_pays = np.full(self.taille, -1, dtype=np.int32)
+        assignees = self.codes_region >= 0
+        self.codes_pays[assignees] = self.pays_des_regions[self.codes_region[assignees]]
+
+        # Lignes de chaque région / pays, rangées par code (positions[bornes[c]:bornes[c + 1]])
+        self._lignes = {}
+        for niveau, codes, nb in (("region", self.codes_region, len(self.regions)), ("pays", self.codes_pays, len(self.pays))):
+            ordre = np.argsort(codes, kind="stable")
+            self._lignes[niveau] = (ordre, np.searchsorted(codes[ordre], np.arange(nb + 1)))
+
+        # Effectifs par crise et par région (crise manquante : « inconnue »)
+        assignees = np.flatnonzero(self.codes_region >= 0)
+        crises = (pd.Series(topics).iloc[assignees].astype(object).fillna("inconnue").to_numpy()
+                  if topics is not None else np.full(len(assignees), "inconnue", dtype=object))
+        self.effectifs_crises = pd.DataFrame({
+            "topic": crises, "code_region": self.codes_region[assignees],
+        }).groupby(["topic", "code_region"], sort=True).size().rename("nb_tweets").reset_index()
+
+    def __bool__(self):
+        return bool(self.regions)
+
+    def libelle_region(self, code):
+        region, pays = self.regions[code], self.pays[self.pays_des_regions[code]]
+        return f"{region} ({pays})" if region and region != pays else pays
+
+    def positions(self, pays=(), regions=()):
+        """Positions triées des lignes des pays (noms) et régions (codes) donnés."""
+        rang = {nom: i for i, nom in enumerate(self.pays)}
+        morceaux = []
+        for niveau, codes in (("pays", [rang[p] for p in pays if p in rang]), ("region", list(regions))):
+            ordre, bornes = self._lignes[niveau]
+            morceaux += [ordre[bornes[c]:bornes[c + 1]] for c in codes]
+        if not morceaux:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(morceaux))
+
+    def effectifs(self, crises=None, niveau="region"):
+        """
+        Tweets par région (code_region, libelle, nb_tweets) des crises données (toutes si
+        None). Au niveau « pays », chaque région porte l'effectif de son pays.
+        """
+        comptes = self.effectifs_crises
+        if crises is not None:
+            comptes = comptes[comptes["topic"].isin(list(crises))]
+        par_region = np.bincount(comptes["code_region"].to_numpy(dtype=np.int64),
+                                 weights=comptes["nb_tweets"].to_numpy(), minlength=len(self.regions)).astype(np.int64)
+        if niveau == "pays":
+            par_pays = np.bincount(self.pays_des_regions, weights=par_region, minlength=len(self.pays)).astype(np.int64)
+            valeurs = par_pays[self.pays_des_regions]
+            libelles = [self.pays[p] for p in self.pays_des_regions]
+        else:
+            valeurs = par_region
+            libelles = [self.libelle_region(c) for c in range(len(self.regions))]
+        resultat = pd.DataFrame({"code_region": np.arange(len(self.regions)), "libelle": libelles, "nb_tweets": valeurs})
+        return resultat[resultat["nb_tweets"] > 0].reset_index(drop=True)
+
+    def comptes_pays(self):
+        """Nombre de tweets de chaque pays (pays sans tweet exclus)."""
+        comptes = pd.Series(np.bincount(self.codes_pays[self.codes_pays >= 0], minlength=len(self.pays)), index=self.pays)
+        return comptes[comptes > 0]
+
+    def sauver(self, chemin):
+        tmp_path = chemin + ".tmp"
+        with open(tmp_path, "wb") as f:
+            # Noms stockés en un bloc UTF-8 par liste (séparés par des sauts de ligne)
+            np.savez(f, pays=np.frombuffer("\n".join(self.pays).encode(), dtype=np.uint8),
+                     regions=np.frombuffer("\n".join(self.regions).encode(), dtype=np.uint8),
+                     pays_des_regions=self.pays_des_regions, codes_region=self.codes_region)
+        os.replace(tmp_path, chemin)
+
+    @classmethod
+    def charger(cls, chemin, topics=None):
+        with np.load(chemin) as fichier:
+            pays = fichier["pays"].tobytes().decode()
+            regions = fichier["regions"].tobytes().decode()
+            nb_regions = len(fichier["pays_des_regions"])
+            return cls(pays.split("\n") if nb_regions else [], regions.split("\n") if nb_regions else [],
+                       fichier["pays_des_regions"], fichier["codes_region"], topics)
+
+
+def geocoder(contours, latitude, longitude, index, topics=None):
+    """
+    Regions des lignes de la table (coordonnées latitude / longitude), chaque contour
+    n'étant testé que sur les tweets de son rectangle englobant (index : IndexSpatial).
+    Un tweet couvert par plusieurs contours reçoit le premier.
+    """
+    codes_region = np.full(index.taille, -1, dtype=np.int32)
+    pays, regions, pays_des_regions = {}, {}, []
+    for contour in contours:
+        candidats = index.rectangle(contour.lat_min, contour.lat_max, contour.lon_min, contour.lon_max)
+        candidats = candidats[codes_region[candidats] < 0]
+        if not len(candidats):
+            continue
+        interieurs = candidats[dedans(longitude[candidats], latitude[candidats], contour.aretes)]
+        if not len(interieurs):
+            continue
+        code_pays = pays.setdefault(contour.pays, len(pays))
+        cle = (contour.pays, contour.region)
+        if cle not in regions:
+            regions[cle] = len(regions)
+            pays_des_regions.append(code_pays)
+        codes_region[interieurs] = regions[cle]
+    return Regions(list(pays), [region for _, region in regions], pays_des_regions, codes_region, topics)
+
+
+def _construire(tables, table, csv_path):
+    from donnees import snapshot
+
+    df = tables[table]
+    topics = df["topic"] if "topic" in df.columns else None
+    frontieres = chemin_frontieres(csv_path)
+    if not os.path.exists(frontieres):
+        raise FileNotFoundError(MESSAGE_FRONTIERES)
+
+    # Codes persistés à côté de l'instantané, recalculés quand lui ou les frontières sont plus récents
+    file_path = os.path.join(csv_path, table + ".csv")
+    chemin = snapshot.chemin_liste(file_path, "regions") if snapshot.disponible() else None
+    if chemin is not None and os.path.exists(chemin):
+        date = os.stat(chemin).st_mtime_ns
+        if date >= os.stat(snapshot.chemin_snapshot(file_path)).st_mtime_ns and date >= os.stat(frontieres).st_mtime_ns:
+            regions = Regions.charger(chemin, topics)
+            if regions.taille == len(df):
+                return regions
+
+    latitude = pd.to_numeric(df["latitude"], errors="coerce").to_numpy(dtype=np.float64)
+    longitude = pd.to_numeric(df["longitude"], errors="coerce").to_numpy(dtype=np.float64)
+    regions = geocoder(lire_frontieres(frontieres), latitude, longitude, spatial.index_spatial(table, csv_path), topics)
+    if chemin is not None:
+        regions.sauver(chemin)
+    return regions
+
+
+def regions(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """Pays et région de chaque tweet géolocalisé de table ; FileNotFoundError sans fichier de frontières."""
+    return chargement.structure_derivee(f"regions/{table}", lambda tables: _construire(tables, table, csv_path), csv_path)
+
+
+def _construire_geojson(csv_path, table):
+    # Entités du fichier identifiées par le code de leur région (featureidkey « id »)
+    index = regions(table, csv_path)
+    codes = {(index.pays[p], r): c for c, (r, p) in enumerate(zip(index.regions, index.pays_des_regions))}
+    with open(chemin_frontieres(csv_path), encoding="utf-8") as f:
+        contenu = json.load(f)
+    entites = []
+    for entite in contenu.get("features", []):
+        proprietes = entite.get("properties") or {}
+        code = codes.get((_propriete(proprietes, PROPRIETES_PAYS), _propriete(proprietes, PROPRIETES_REGION)))
+        if code is not None and entite.get("geometry"):
+            entites.append({"type": "Feature", "id": code, "properties": {}, "geometry": entite["geometry"]})
+    return {"type": "FeatureCollection", "features": entites}
+
+
+def geojson(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """Contours des régions ayant des tweets, pour px.choropleth_mapbox (locations : code_region)."""
+    return chargement.structure_derivee(f"regions/geojson/{table}", lambda tables: _construire_geojson(csv_path, table), csv_path)
@@ -0,0 +1,266 @@
+"""Registre des types de colonnes de chaque table du répertoire CSV.
+
+Le schéma est appliqué une seule fois, à l'ingestion (compilation des instantanés) :
+identifiants en int32, chaînes peu variées en catégories, booléens et dates déjà
+convertis. Les colonnes absentes d'une table sont ignorées, les colonnes non
+déclarées gardent le type inféré par read_csv.
+
+Utilisation (rapport mémoire avant / après typage) :
+    python -m donnees.schema [csv_path]
+"""
+import argparse
+import hashlib
+
+import pandas as pd
+
+# Types logiques du registre
+ID = "int32"            # identifiants de nœuds (tweets, utilisateurs, événements) < 2**31
+ENTIER = "int32"        # compteurs
+GRAND_ENTIER = "int64"  # identifiants Twitter d'origine
+REEL = "float64"
+CATEGORIE = "category"
+BOOLEEN = "bool"
+DATE = "datetime"
+TEXTE = "str"           # laissé tel quel
+LISTE = "liste"         # liste sérialisée en texte ("['a', 'b']")
+
+EVENT_TYPES = ["bombing", "earthquake", "flood", "shooting", "typhoon", "wildfire"]
+
+_TWEETS_PAR_TYPE = {
+    "tweet_id": ID,
+    "event_id": ID,
+    "eventType": CATEGORIE,
+    "text": TEXTE,
+    "date": DATE,
+    "user_id": ID,
+    "annotation_postPriority": CATEGORIE,
+}
+
+SCHEMA = {
+    "Event_clean": {
+        "node_id": ID,
+        "event_id": TEXTE,
+        "event_type": CATEGORIE,
+        "trecis_id": TEXTE,
+    },
+    "Hashtag_clean": {
+        "node_id": ID,
+        "hashtag_id": TEXTE,
+        "occurences": ENTIER,
+    },
+    "User_clean": {
+        "user_id": ID,
+        "screen_name": TEXTE,
+        "name": TEXTE,
+        "friends_count": ENTIER,
+        "followers_count": ENTIER,
+        "favourites_count": ENTIER,
+        "statuses_count": ENTIER,
+        "listed_count": ENTIER,
+        "tweets_count": ENTIER,
+        "is_verified": BOOLEEN,
+        "user_internal_id": GRAND_ENTIER,
+    },
+    "help_requests": {
+        "tweet_id": ID,
+        "text": TEXTE,
+        "created_at": DATE,
+        "category_name": CATEGORIE,
+    },
+    "is_about_clean": {
+        "is_about_id": ID,
+        "tweet_id": ID,
+        "event_id": ID,
+    },
+    "posted_clean": {
+        "posted_id": ID,
+        "user_id": ID,
+        "tweet_id": ID,
+    },
+    "reply_tweet_to_user": {
+        "reply_to_id": ID,
+        "start_id": ID,
+        "end_id": ID,
+    },
+    "retweets_clean": {
+        "retweets_id": ID,
+        "retweeter_id": ID,
+        "original_user_id": ID,
+        "times": ENTIER,
+    },
+    "Tweet_sentiment_localisation": {
+        "tweet_id": ID,
+        "created_at": DATE,
+        "text": TEXTE,
+        "topic": CATEGORIE,
+        "sentiment": CATEGORIE,
+        "lieu_extrait": CATEGORIE,
+        "latitude": REEL,
+        "longitude": REEL,
+        "retweet_count": ENTIER,
+        "favorite_count": ENTIER,
+        "annotation_annotated": BOOLEEN,
+        "annotation_postPriority": CATEGORIE,
+        "possibly_sensitive": BOOLEEN,
+        "hashtags": LISTE,
+        "post_category": LISTE,
+    },
+    "Tweet_date_clean": {
+        "tweet_id": ID,
+        "created_at": DATE,
+        "text": TEXTE,
+        "retweet_count": ENTIER,
+        "favorite_count": ENTIER,
+        "reply_count": ENTIER,
+        "possibly_sensitive": BOOLEEN,
+    },
+    "Tweet_clean": {
+        "tweet_id": ID,
+        "created_at": DATE,
+        "text": TEXTE,
+        "annotation_postPriority": CATEGORIE,
+    },
+    "tweets_par_event": {
+        "crise_id": CATEGORIE,
+        "topic": CATEGORIE,
+        "text": TEXTE,
+        "annotation_postPriority": CATEGORIE,
+    },
+    "tweets_par_categorie": {
+        "category_label": CATEGORIE,
+        "text": TEXTE,
+        "annotation_postPriority": CATEGORIE,
+    },
+}
+for _event_type in EVENT_TYPES:
+    SCHEMA[f"tweets_{_event_type}"] = _TWEETS_PAR_TYPE
+
+# Ordre physique des lignes à l'ingestion : tweets regroupés par crise puis triés par
+# date, pour qu'une crise et une fenêtre de temps soient des tranches contiguës
+ORDRE_PHYSIQUE = {
+    "Tweet_sentiment_localisation": ["topic", "created_at"],
+    "Tweet_date_clean": ["created_at"],
+    "faits": ["event_id", "created_at"],
+}
+
+# Colonne de partitionnement par crise : première clé de l'ordre physique, un lot
+# Arrow par valeur dans l'instantané
+PARTITIONS = {
+    "Tweet_sentiment_localisation": "topic",
+    "faits": "event_id",
+}
+
+# Change dès que le registre change : les instantanés compilés avec un ancien
+# schéma sont alors recompilés
+VERSION = hashlib.md5(repr((
+    sorted((nom, sorted(cols.items())) for nom, cols in SCHEMA.items()),
+    sorted(ORDRE_PHYSIQUE.items()),
+    sorted(PARTITIONS.items()),
+)).encode()).hexdigest()[:12]
+
+_VRAI = {"true", "1", "yes"}
+_FAUX = {"false", "0", "no"}
+
+
+def _convertir(serie, type_):
+    if type_ in (TEXTE, LISTE):
+        return serie
+    if type_ == CATEGORIE:
+        return serie.astype("category")
+    if type_ == DATE:
+        # Toutes les dates en UTC naïf : comparables entre tables
+        return pd.to_datetime(serie, errors="coerce", utc=True).dt.tz_localize(None)
+    if type_ == BOOLEEN:
+        if serie.dtype == bool:
+            return serie
+        if not pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            texte = serie.astype("string").str.strip().str.lower()
+            serie = texte.map(lambda x: True if x in _VRAI else (False if x in _FAUX else pd.NA))
+        serie = serie.astype("boolean")
+        return serie.astype(bool) if not serie.isna().any() else serie
+    if type_ in (ID, ENTIER, GRAND_ENTIER):
+        serie = pd.to_numeric(serie, errors="coerce")
+        if serie.isna().any():
+            # Entier « nullable » (Int32 / Int64) si des valeurs manquent
+            return serie.astype(type_.capitalize())
+        return serie.astype(type_)
+    return serie.astype(type_)
+
+
+def schema_table(nom):
+    return SCHEMA.get(nom, {})
+
+
+def colonnes_liste(nom):
+    return [colonne for colonne, type_ in schema_table(nom).items() if type_ == LISTE]
+
+
+def appliquer_schema(nom, df):
+    """Renvoie df avec les types déclarés pour la table nom."""
+    conversions = {
+        colonne: _convertir(df[colonne], type_)
+        for colonne, type_ in schema_table(nom).items()
+        if colonne in df.columns
+    }
+    return df.assign(**conversions)
+
+
+def ordonner(nom, df):
+    """Trie df selon l'ordre physique déclaré pour la table nom (valeurs manquantes en fin)."""
+    cles = [colonne for colonne in ORDRE_PHYSIQUE.get(nom, []) if colonne in df.columns]
+    if not cles:
+        return df
+    return df.sort_values(cles, kind="stable", na_position="last").reset_index(drop=True)
+
+
+def renommer_modalites(serie, correspondance):
+    """
+    Équivalent de serie.map(correspondance).fillna(serie) : pour une colonne
+    catégorielle, on renomme les catégories (une opération par modalité et non par ligne).
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        nouvelles = [correspondance.get(c, c) for c in serie.cat.categories]
+        if len(set(nouvelles)) == len(nouvelles):
+            return serie.cat.rename_categories(nouvelles)
+        serie = serie.astype(object)
+    return serie.map(correspondance).fillna(serie)
+
+
+def memoire_mo(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def rapport_memoire(tables_brutes, tables_typees):
+    lignes = []
+    for nom, df in tables_brutes.items():
+        avant = memoire_mo(df)
+        apres = memoire_mo(tables_typees[nom])
+        lignes.append({
+            "table": nom,
+            "avant_mo": round(avant, 2),
+            "apres_mo": round(apres, 2),
+            "gain": f"x{avant / apres:.1f}" if apres else "-",
+        })
+    return pd.DataFrame(lignes)
+
+
+def main():
+    from donnees import chargement
+
+    parser = argparse.ArgumentParser(description="Rapport mémoire par table avant / après application du schéma.")
+    parser.add_argument("csv_path", nargs="?", default=chargement.CSV_PATH)
+    args = parser.parse_args()
+
+    tables_brutes = {
+        nom: pd.read_csv(file_path, low_memory=False)
+        for nom, file_path in chargement.lister_csv(args.csv_path).items()
+    }
+    tables_typees = {nom: appliquer_schema(nom, df) for nom, df in tables_brutes.items()}
+    rapport = rapport_memoire(tables_brutes, tables_typees)
+    print(rapport.to_string(index=False))
+    total_avant, total_apres = rapport["avant_mo"].sum(), rapport["apres_mo"].sum()
+    print(f"\nTotal : {total_avant:.2f} Mo -> {total_apres:.2f} Mo")
+
+
+if __name__ == "__main__":
+    main()
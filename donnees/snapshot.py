@@ -0,0 +1,183 @@
+"""Instantanés colonnaires (Feather / Arrow IPC) des fichiers du répertoire CSV.
+
+Chaque fichier CSV/<nom>.csv est compilé en CSV/snapshots/<nom>.feather, typé selon
+donnees.schema et non compressé pour pouvoir être projeté en mémoire (memory-map) à la
+lecture. Les colonnes de listes sont en plus compilées au format CSR dans
+CSV/snapshots/<nom>.<colonne>.npz (cf. donnees.listes). Un instantané plus ancien que
+son CSV source, ou compilé avec une autre version du schéma, est recompilé
+automatiquement. Les tables partitionnées par crise (schema.PARTITIONS) sont écrites
+avec un lot Arrow par crise et les bornes de chaque crise dans les métadonnées
+(cf. donnees.partitions).
+
+Utilisation :
+    python -m donnees.snapshot            # compile les instantanés périmés
+    python -m donnees.snapshot --force    # recompile tout
+"""
+import argparse
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.ipc as ipc
+except ImportError:  # pyarrow absent : on retombe sur la lecture CSV
+    pa = None
+    feather = None
+
+from donnees import chargement, listes, partitions, schema
+
+SNAPSHOT_DIR = "snapshots"
+CLE_SCHEMA = b"donnees.schema"
+CLE_PARTITIONS = b"donnees.partitions"
+
+
+def disponible():
+    return feather is not None
+
+
+def nom_table(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def chemin_snapshot(file_path):
+    csv_path = os.path.dirname(file_path)
+    return os.path.join(csv_path, SNAPSHOT_DIR, nom_table(file_path) + ".feather")
+
+
+def chemin_liste(file_path, colonne):
+    csv_path = os.path.dirname(file_path)
+    return os.path.join(csv_path, SNAPSHOT_DIR, f"{nom_table(file_path)}.{colonne}.npz")
+
+
+def chemin_index(file_path, colonne):
+    csv_path = os.path.dirname(file_path)
+    return os.path.join(csv_path, SNAPSHOT_DIR, f"{nom_table(file_path)}.{colonne}.index.npz")
+
+
+def snapshot_a_jour(file_path):
+    snapshot_path = chemin_snapshot(file_path)
+    if not os.path.exists(snapshot_path):
+        return False
+    if os.stat(snapshot_path).st_mtime_ns < os.stat(file_path).st_mtime_ns:
+        return False
+    # Seul l'en-tête est lu pour comparer la version du schéma
+    with ipc.open_file(snapshot_path) as lecteur:
+        metadata = lecteur.schema.metadata or {}
+    return metadata.get(CLE_SCHEMA) == schema.VERSION.encode()
+
+
+def lire_csv_type(file_path):
+    df = pd.read_csv(file_path, low_memory=False)
+    df = schema.appliquer_schema(nom_table(file_path), df)
+    return schema.ordonner(nom_table(file_path), df)
+
+
+def compiler_table(file_path):
+    snapshot_path = chemin_snapshot(file_path)
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+
+    df = lire_csv_type(file_path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), CLE_SCHEMA: schema.VERSION.encode()}
+    colonne_partition = schema.PARTITIONS.get(nom_table(file_path))
+    plages = None
+    if colonne_partition in df.columns:
+        plages = partitions.Partitions.depuis_colonne(df[colonne_partition])
+        metadata[CLE_PARTITIONS] = plages.vers_json().encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # Écriture dans un fichier temporaire puis renommage : un lecteur concurrent
+    # ne voit jamais un instantané à moitié écrit
+    tmp_path = snapshot_path + ".tmp"
+    if plages is None:
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+    else:
+        # Un lot par crise (puis un lot pour les lignes sans crise) : lire_partition
+        # relit une crise seule, sans charger la table
+        bornes = sorted({0, len(df), *plages.debuts.tolist(), *plages.fins.tolist()})
+        with ipc.new_file(tmp_path, table.schema) as writer:
+            for debut, fin in zip(bornes[:-1], bornes[1:]):
+                writer.write_batch(table.slice(debut, fin - debut).combine_chunks().to_batches()[0])
+    os.replace(tmp_path, snapshot_path)
+
+    for colonne in schema.colonnes_liste(nom_table(file_path)):
+        if colonne in df.columns:
+            listes.ColonneListe.depuis_serie(df[colonne]).sauver(chemin_liste(file_path, colonne))
+    return snapshot_path
+
+
+def lire_snapshot(snapshot_path):
+    # memory_map : les colonnes numériques sans valeurs manquantes sont reprises
+    # sans copie depuis le fichier projeté (split_blocks évite la consolidation)
+    table = feather.read_table(snapshot_path, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def lire_partitions(file_path):
+    """Bornes des crises lues dans l'en-tête de l'instantané à jour de file_path (None sinon)."""
+    if not disponible() or not snapshot_a_jour(file_path):
+        return None
+    with ipc.open_file(chemin_snapshot(file_path)) as lecteur:
+        texte = (lecteur.schema.metadata or {}).get(CLE_PARTITIONS)
+    return None if texte is None else partitions.Partitions.depuis_json(texte.decode())
+
+
+def lire_partition(file_path, valeur):
+    """Lignes d'une seule crise, lues dans son lot de l'instantané projeté en mémoire."""
+    plages = lire_partitions(file_path)
+    if plages is None:
+        return None
+    tranche = plages.tranche(valeur)
+    with pa.memory_map(chemin_snapshot(file_path)) as source:
+        lecteur = ipc.open_file(source)
+        if tranche.stop == tranche.start:
+            return lecteur.schema.empty_table().to_pandas()
+        # Les lots sont projetés sans copie : seul celui de la crise est converti
+        debut = 0
+        for i in range(lecteur.num_record_batches):
+            lot = lecteur.get_batch(i)
+            if debut == tranche.start and lot.num_rows == tranche.stop - tranche.start:
+                return lot.to_pandas().set_axis(pd.RangeIndex(tranche.start, tranche.stop))
+            debut += lot.num_rows
+    return lire_snapshot(chemin_snapshot(file_path)).iloc[tranche]
+
+
+def charger_table(file_path):
+    """Lit une table via son instantané, en le (re)compilant si le CSV est plus récent."""
+    if not disponible():
+        return lire_csv_type(file_path)
+    if not snapshot_a_jour(file_path):
+        compiler_table(file_path)
+    return lire_snapshot(chemin_snapshot(file_path))
+
+
+def compiler_repertoire(csv_path=chargement.CSV_PATH, force=False):
+    compiles = []
+    for nom, file_path in chargement.lister_csv(csv_path).items():
+        if force or not snapshot_a_jour(file_path):
+            compiler_table(file_path)
+            compiles.append(nom)
+    return compiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile le répertoire CSV en instantanés Feather.")
+    parser.add_argument("csv_path", nargs="?", default=chargement.CSV_PATH, help="répertoire des fichiers CSV")
+    parser.add_argument("--force", action="store_true", help="recompiler même les instantanés à jour")
+    args = parser.parse_args()
+
+    if not disponible():
+        parser.error("pyarrow est nécessaire pour compiler les instantanés (pip install pyarrow)")
+
+    compiles = compiler_repertoire(args.csv_path, force=args.force)
+    if compiles:
+        for nom in compiles:
+            print(f"✅ {nom} -> {chemin_snapshot(os.path.join(args.csv_path, nom + '.csv'))}")
+    else:
+        print("Tous les instantanés sont à jour.")
+
+
+if __name__ == "__main__":
+    main()
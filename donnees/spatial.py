@@ -0,0 +1,130 @@
+"""Index spatial des tweets géolocalisés : requêtes par rectangle et par rayon.
+
+Les tweets géolocalisés sont rangés par cellule d'une grille régulière de PAS degrés,
+les cellules étant numérotées rangée par rangée (latitude, puis longitude). Un
+rectangle couvre ainsi, dans chaque rangée de cellules, une plage contiguë de codes :
+deux recherches dichotomiques par rangée donnent les candidats, filtrés ensuite sur
+leurs coordonnées exactes. Un cercle (rayon en km) est résolu par son rectangle
+englobant, puis par la distance de grand cercle des seuls candidats. Le coût dépend du
+nombre de rangées couvertes et de candidats, non de la taille de la table.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from donnees import bitmaps, chargement, tableaux
+
+# Maille de la grille en degrés (environ 11 km en latitude)
+PAS = 0.1
+RAYON_TERRE_KM = 6371.0088
+
+# Zones géographiques interrogeables (degrés décimaux ; lon_min > lon_max traverse l'antiméridien)
+Rectangle = namedtuple("Rectangle", ["lat_min", "lat_max", "lon_min", "lon_max"])
+Cercle = namedtuple("Cercle", ["latitude", "longitude", "rayon_km"])
+
+
+def distance_km(latitude, longitude, latitudes, longitudes):
+    """Distance de grand cercle (haversine) d'un point à chacun des points donnés."""
+    phi1, phi2 = np.radians(latitude), np.radians(latitudes)
+    dphi = phi2 - phi1
+    dlambda = np.radians(np.asarray(longitudes) - longitude)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * RAYON_TERRE_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class IndexSpatial:
+    def __init__(self, latitude, longitude, positions, taille, pas=PAS):
+        self.pas = pas
+        self.taille = taille
+        self._nb_colonnes = int(np.ceil(360 / pas)) + 1
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        codes = self._rangee(latitude) * self._nb_colonnes + self._colonne(longitude)
+        ordre = np.argsort(codes, kind="stable")
+        self.codes = codes[ordre]
+        self.latitude = latitude[ordre]
+        self.longitude = longitude[ordre]
+        # Position de chaque point dans la table indexée
+        self.positions_table = np.asarray(positions, dtype=np.int64)[ordre]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _rangee(self, latitude):
+        return np.floor((np.clip(latitude, -90, 90) + 90) / self.pas).astype(np.int64)
+
+    def _colonne(self, longitude):
+        return np.floor((np.clip(longitude, -180, 180) + 180) / self.pas).astype(np.int64)
+
+    def _candidats(self, lat_min, lat_max, lon_min, lon_max):
+        # Points des cellules couvrant le rectangle (sans traversée de l'antiméridien)
+        rangees = np.arange(self._rangee(lat_min), self._rangee(lat_max) + 1, dtype=np.int64) * self._nb_colonnes
+        debuts = np.searchsorted(self.codes, rangees + self._colonne(lon_min), side="left")
+        fins = np.searchsorted(self.codes, rangees + self._colonne(lon_max), side="right")
+        return tableaux.plages(debuts, fins)
+
+    def _dans_rectangle(self, lat_min, lat_max, lon_min, lon_max):
+        # Indices (dans l'ordre de l'index) des points du rectangle, bornes incluses
+        if lat_min > lat_max:
+            return np.empty(0, dtype=np.int64)
+        if lon_min <= lon_max:
+            morceaux = [(lon_min, lon_max)]
+        else:
+            morceaux = [(lon_min, 180.0), (-180.0, lon_max)]
+        trouves = []
+        for bas, haut in morceaux:
+            candidats = self._candidats(lat_min, lat_max, bas, haut)
+            lat, lon = self.latitude[candidats], self.longitude[candidats]
+            trouves.append(candidats[(lat >= lat_min) & (lat <= lat_max) & (lon >= bas) & (lon <= haut)])
+        return np.concatenate(trouves)
+
+    def rectangle(self, lat_min, lat_max, lon_min, lon_max):
+        """Positions triées (dans la table) des tweets du rectangle, bornes incluses."""
+        return np.sort(self.positions_table[self._dans_rectangle(lat_min, lat_max, lon_min, lon_max)])
+
+    def cercle(self, latitude, longitude, rayon_km):
+        """Positions triées (dans la table) des tweets à moins de rayon_km du point."""
+        angle = rayon_km / RAYON_TERRE_KM
+        dlat = np.degrees(angle)
+        lat_min, lat_max = latitude - dlat, latitude + dlat
+        # Rectangle englobant : toutes les longitudes si le cercle atteint un pôle
+        if lat_min <= -90 or lat_max >= 90 or angle >= np.pi / 2:
+            lon_min, lon_max = -180.0, 180.0
+        else:
+            dlon = np.degrees(np.arcsin(min(1.0, np.sin(angle) / np.cos(np.radians(latitude)))))
+            lon_min, lon_max = longitude - dlon, longitude + dlon
+            if lon_max - lon_min >= 360:
+                lon_min, lon_max = -180.0, 180.0
+            elif lon_min < -180:
+                lon_min += 360
+            elif lon_max > 180:
+                lon_max -= 360
+        candidats = self._dans_rectangle(max(lat_min, -90.0), min(lat_max, 90.0), lon_min, lon_max)
+        distances = distance_km(latitude, longitude, self.latitude[candidats], self.longitude[candidats])
+        return np.sort(self.positions_table[candidats[distances <= rayon_km]])
+
+    def positions(self, zone):
+        """Positions triées des tweets de zone (Rectangle ou Cercle)."""
+        if isinstance(zone, Cercle):
+            return self.cercle(*zone)
+        if isinstance(zone, Rectangle):
+            return self.rectangle(*zone)
+        raise TypeError(f"Zone inconnue : {zone!r}")
+
+    def bitmap(self, zone):
+        return bitmaps.Bitmap.depuis_positions(self.positions(zone), self.taille)
+
+
+def _construire(tables, table, csv_path):
+    # Tweets affichables sur les cartes : bitmap « geolocalise »
+    df = tables[table]
+    positions = bitmaps.index_bitmaps(table, csv_path).valeur("geolocalise", True).positions()
+    latitude = pd.to_numeric(df["latitude"], errors="coerce").to_numpy(dtype=np.float64)[positions]
+    longitude = pd.to_numeric(df["longitude"], errors="coerce").to_numpy(dtype=np.float64)[positions]
+    return IndexSpatial(latitude, longitude, positions, len(df))
+
+
+def index_spatial(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """Index spatial des tweets géolocalisés de table."""
+    return chargement.structure_derivee(f"spatial/{table}", lambda tables: _construire(tables, table, csv_path), csv_path)
@@ -0,0 +1,18 @@
+"""Opérations vectorisées sur des tableaux numpy, partagées par les index et les pages."""
+import numpy as np
+
+
+def plages(debuts, fins, intervalles=False):
+    """
+    Concaténation vectorisée des intervalles [debuts[i], fins[i]) ; avec intervalles,
+    renvoie aussi l'indice i de l'intervalle de chaque élément.
+    """
+    longueurs = np.maximum(fins - debuts, 0)
+    garde = np.flatnonzero(longueurs > 0)
+    debuts, longueurs = debuts[garde], longueurs[garde]
+    if not len(debuts):
+        vide = np.empty(0, dtype=np.int64)
+        return (vide, vide) if intervalles else vide
+    cumul = np.concatenate([[0], np.cumsum(longueurs)[:-1]])
+    elements = np.arange(int(longueurs.sum()), dtype=np.int64) + np.repeat(debuts - cumul, longueurs)
+    return (elements, np.repeat(garde, longueurs)) if intervalles else elements
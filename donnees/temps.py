@@ -0,0 +1,86 @@
+"""Index temporel : fenêtres de dates résolues en tranches contiguës.
+
+Les tweets sont rangés à l'ingestion par crise puis par date (schema.ORDRE_PHYSIQUE).
+L'instant de chaque tweet est gardé en entier int64 (nanosecondes depuis l'epoch) :
+une fenêtre [début, fin] se résout par deux recherches dichotomiques (searchsorted)
+au lieu d'un masque booléen sur toute la table. Une crise occupe une plage contiguë
+de lignes (cf. donnees/partitions.py) ; une crise et une fenêtre de dates donnent donc
+une seule tranche, que les pages appliquent avec df.iloc.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from donnees import chargement, partitions as partitions_, schema
+
+_NAT = np.iinfo(np.int64).min
+
+
+def _instant(valeur, fin=False):
+    # Borne en nanosecondes ; une date seule couvre toute la journée (fin incluse)
+    horodatage = pd.Timestamp(valeur)
+    if fin and isinstance(valeur, datetime.date) and not isinstance(valeur, datetime.datetime):
+        return (horodatage + pd.Timedelta(days=1)).value, "left"
+    return horodatage.value, "right" if fin else "left"
+
+
+class IndexTemporel:
+    def __init__(self, instants, partitions=None):
+        instants = pd.to_datetime(pd.Series(instants).reset_index(drop=True))
+        self.epoch = instants.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        valides = self.epoch != _NAT
+
+        # Ordre chronologique global (identité quand la table est triée par date seule)
+        self.ordre = np.flatnonzero(valides)[np.argsort(self.epoch[valides], kind="stable")]
+        self.epoch_trie = self.epoch[self.ordre]
+
+        # Plages des crises (Partitions) et fin des instants renseignés de chacune
+        # (les dates manquantes sont rangées en dernier dans la partition)
+        self.partitions = partitions
+        self._fins_valides = {}
+        if partitions is not None:
+            cumul = np.concatenate([[0], np.cumsum(valides)])
+            nb_valides = cumul[partitions.fins] - cumul[partitions.debuts]
+            self._fins_valides = dict(zip(partitions.valeurs, (partitions.debuts + nb_valides).tolist()))
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def bornes(self):
+        """Premier et dernier instants renseignés (None si aucun)."""
+        if not len(self.epoch_trie):
+            return None, None
+        return pd.Timestamp(self.epoch_trie[0]), pd.Timestamp(self.epoch_trie[-1])
+
+    def tranche(self, partition, debut=None, fin=None):
+        """Lignes de la partition (ex. topic) dans la fenêtre [debut, fin] : un slice."""
+        if self.partitions is None or partition not in self.partitions:
+            return slice(0, 0)
+        plage = self.partitions.tranche(partition)
+        if debut is None and fin is None:
+            return plage
+        premiere = plage.start
+        epoch = self.epoch[premiere:self._fins_valides[partition]]
+        a = 0 if debut is None else np.searchsorted(epoch, *_instant(debut))
+        b = len(epoch) if fin is None else np.searchsorted(epoch, *_instant(fin, fin=True))
+        return slice(premiere + int(a), premiere + int(max(a, b)))
+
+    def positions(self, debut=None, fin=None, partition=None):
+        """Positions triées des lignes dans la fenêtre [debut, fin], toutes partitions ou une seule."""
+        if partition is not None:
+            tranche = self.tranche(partition, debut, fin)
+            return np.arange(tranche.start, tranche.stop)
+        a = 0 if debut is None else np.searchsorted(self.epoch_trie, *_instant(debut))
+        b = len(self.epoch_trie) if fin is None else np.searchsorted(self.epoch_trie, *_instant(fin, fin=True))
+        return np.sort(self.ordre[a:max(a, b)])
+
+
+def _construire(tables, table, csv_path):
+    plages = partitions_.partitions(table, csv_path) if table in schema.PARTITIONS else None
+    return IndexTemporel(tables[table]["created_at"], plages)
+
+
+def index_temporel(table="Tweet_sentiment_localisation", csv_path=chargement.CSV_PATH):
+    """Index temporel de table, partitionné par crise pour les tables de schema.PARTITIONS."""
+    return chargement.structure_derivee(f"temps/{table}", lambda tables: _construire(tables, table, csv_path), csv_path)
@@ -13,7 +13,8 @@ required_packages = {
     "streamlit_folium": "streamlit-folium",
     "wordcloud": "wordcloud",
     "matplotlib": "matplotlib",
-    "networkx": "networkx"
+    "pyarrow": "pyarrow",
+    "scipy": "scipy"
 }
 
 # --- 2. Vérification et installation si manquant ---
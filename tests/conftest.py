@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Les tests importent le paquet donnees depuis la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CRISES = ["TRECIS-1", "TRECIS-2", "TRECIS-3"]
+HASHTAGS = ["flood", "help", "rescue", "Flood"]
+
+
+def tweets_synthetiques(nb=60, graine=0):
+    """Table Tweet_sentiment_localisation brute (telle que lue dans le CSV), non triée."""
+    aleatoire = np.random.default_rng(graine)
+    latitude = aleatoire.uniform(-60, 60, nb)
+    longitude = aleatoire.uniform(-170, 170, nb)
+    # Quelques tweets sans coordonnées ou aux coordonnées nulles
+    latitude[::7] = np.nan
+    longitude[3::11] = 0.0
+    return pd.DataFrame({
+        "tweet_id": aleatoire.permutation(np.arange(1000, 1000 + nb)),
+        "created_at": (pd.Timestamp("2020-01-01") + pd.to_timedelta(aleatoire.integers(0, 10 * 24 * 3600, nb), unit="s"))
+        .strftime("%Y-%m-%d %H:%M:%S"),
+        "text": [f"tweet {i} rescue needed" if i % 3 == 0 else f"tweet {i} flood water" for i in range(nb)],
+        "topic": aleatoire.choice(CRISES, nb),
+        "sentiment": aleatoire.choice(["positive", "neutral", "negative"], nb),
+        "lieu_extrait": aleatoire.choice(["Paris", "Manila", "Calgary", None], nb),
+        "latitude": latitude,
+        "longitude": longitude,
+        "retweet_count": aleatoire.integers(0, 100, nb),
+        "favorite_count": aleatoire.integers(0, 10, nb),
+        "hashtags": [repr(list(aleatoire.choice(HASHTAGS, aleatoire.integers(0, 3), replace=False))) for _ in range(nb)],
+        "post_category": [repr(["Request-Help"]) if i % 4 == 0 else "[]" for i in range(nb)],
+    })
+
+
+@pytest.fixture
+def repertoire_csv(tmp_path):
+    """Répertoire CSV temporaire contenant Tweet_sentiment_localisation.csv."""
+    tweets_synthetiques().to_csv(tmp_path / "Tweet_sentiment_localisation.csv", index=False)
+    return str(tmp_path)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from donnees import bitmaps
+
+TAILLE = 1000
+
+
+def _bitmap(positions, dense):
+    if dense:
+        return bitmaps.Bitmap.depuis_masque(np.isin(np.arange(TAILLE), positions))
+    return bitmaps.Bitmap(TAILLE, positions=np.asarray(positions, dtype=np.int32))
+
+
+@pytest.fixture
+def ensembles():
+    aleatoire = np.random.default_rng(0)
+    return [np.sort(aleatoire.choice(TAILLE, n, replace=False)) for n in (20, 400, 700)]
+
+
+@pytest.mark.parametrize("denses", [(False, False, False), (True, True, True), (False, True, True), (True, False, True)])
+def test_operations(ensembles, denses):
+    a, b, c = (_bitmap(e, d) for e, d in zip(ensembles, denses))
+    assert (a & b).positions().tolist() == np.intersect1d(ensembles[0], ensembles[1]).tolist()
+    assert (a | b).positions().tolist() == np.union1d(ensembles[0], ensembles[1]).tolist()
+    assert bitmaps.union([a, b, c], TAILLE).positions().tolist() == \
+        np.union1d(np.union1d(ensembles[0], ensembles[1]), ensembles[2]).tolist()
+    assert bitmaps.intersection([a, b, c]).positions().tolist() == \
+        np.intersect1d(np.intersect1d(ensembles[0], ensembles[1]), ensembles[2]).tolist()
+    assert (a & b).compte() == len(np.intersect1d(ensembles[0], ensembles[1]))
+
+
+def test_complement_ignore_le_bourrage():
+    bitmap = bitmaps.Bitmap.depuis_masque(np.array([True, False, True]))
+    assert (~bitmap).positions().tolist() == [1]
+    assert (~bitmap).compte() == 1
+
+
+def test_contient_creux_et_dense():
+    positions = [3, 17, 999]
+    for dense in (False, True):
+        assert _bitmap(positions, dense).contient([3, 4, 999]).tolist() == [True, False, True]
+
+
+def test_union_et_intersection_vides():
+    assert bitmaps.union([], TAILLE).compte() == 0
+    assert bitmaps.intersection([]) is None
+
+
+def test_index_parmi_et_comptes():
+    valeurs = np.array(["a", "b", None, "a", "c", "b", "a"], dtype=object)
+    index = bitmaps.IndexBitmap({"col": valeurs}, len(valeurs))
+    assert index.parmi("col", ["a", "c"]).positions().tolist() == [0, 3, 4, 6]
+    assert index.comptes("col").to_dict() == {"a": 3, "b": 2, "c": 1}
+    filtre = bitmaps.Bitmap(len(valeurs), positions=np.array([0, 1, 2, 5], dtype=np.int32))
+    assert index.comptes("col", filtre).to_dict() == {"a": 1, "b": 2, "c": 0}
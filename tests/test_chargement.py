@@ -0,0 +1,27 @@
+from donnees import chargement, geo
+
+from conftest import tweets_synthetiques
+
+
+def test_structure_bornee_evince_les_plus_anciennes(repertoire_csv):
+    appels = []
+
+    def construire(cle):
+        def construire_(tables):
+            appels.append(cle)
+            return cle * 2
+        return construire_
+
+    for cle in [1, 2, 3, 1, 4]:
+        assert chargement.structure_bornee("essai", cle, construire(cle), 3, repertoire_csv) == cle * 2
+    # 1 redemandé avant 4 : c'est 2 qui a été évincé
+    assert appels == [1, 2, 3, 4]
+    chargement.structure_bornee("essai", 2, construire(2), 3, repertoire_csv)
+    assert appels == [1, 2, 3, 4, 2]
+
+
+def test_signature_carte_distingue_les_filtres():
+    df = tweets_synthetiques()
+    # Même nombre de lignes, tweets différents
+    assert geo.signature_carte(df.iloc[:20]) != geo.signature_carte(df.iloc[20:40])
+    assert geo.signature_carte(df.iloc[:20]) == geo.signature_carte(df.iloc[:20].reset_index(drop=True))
@@ -0,0 +1,38 @@
+import numpy as np
+
+from donnees import disposition
+
+
+def test_disposition_normalisee_et_reproductible():
+    # Deux étoiles reliées par une arête : au-delà de TAILLE_MINIMALE, le graphe est contracté
+    n = 2 * disposition.TAILLE_MINIMALE + 2
+    centres = [0, n // 2]
+    source = np.array([0] * (n // 2 - 1) + [n // 2] * (n // 2 - 1) + [0])
+    cible = np.array(list(range(1, n // 2)) + list(range(n // 2 + 1, n)) + [n // 2])
+    positions = disposition.disposition(n, source, cible)
+    assert positions.shape == (n, 2)
+    assert positions.min() >= 0 and positions.max() <= 1
+    assert np.isfinite(positions).all()
+    assert np.array_equal(positions, disposition.disposition(n, source, cible))
+    # Chaque feuille est plus proche de son centre que de l'autre
+    feuilles = np.arange(1, n // 2)
+    proches = np.linalg.norm(positions[feuilles] - positions[centres[0]], axis=1)
+    lointaines = np.linalg.norm(positions[feuilles] - positions[centres[1]], axis=1)
+    assert (proches < lointaines).mean() > 0.9
+
+
+def test_disposition_vide():
+    assert disposition.disposition(0, [], []).shape == (0, 2)
+
+
+def test_disposition_iterations_bornees(monkeypatch):
+    # Arêtes en double et affinage réduit (NOEUDS_AFFINES abaissé) : positions valides
+    monkeypatch.setattr(disposition, "NOEUDS_AFFINES", 100)
+    aleatoire = np.random.default_rng(1)
+    n = 2000
+    source = np.concatenate([aleatoire.integers(0, n, 3 * n)] * 2)
+    cible = np.concatenate([aleatoire.integers(0, n, 3 * n)] * 2)
+    positions = disposition.disposition(n, source, cible)
+    assert positions.shape == (n, 2)
+    assert np.isfinite(positions).all()
+    assert positions.min() == 0 and positions.max() == 1
@@ -0,0 +1,77 @@
+import gzip
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from donnees import bitmaps, export
+
+
+def _df(nb=23):
+    return pd.DataFrame({"tweet_id": np.arange(100, 100 + nb), "valeur": np.arange(nb) * 2.0})
+
+
+def test_lots_couvrent_les_positions():
+    df = _df()
+    positions = np.array([1, 4, 5, 10, 22])
+    lots = list(export.lots(df, positions, taille_lot=2))
+    assert [len(lot) for lot in lots] == [2, 2, 1]
+    assert pd.concat(lots)["tweet_id"].tolist() == df["tweet_id"].iloc[positions].tolist()
+
+
+def test_lots_positions_sur_lignes_pas_sur_index():
+    df = _df().iloc[::-1]
+    bitmap = bitmaps.Bitmap.depuis_positions([0, 2], len(df))
+    assert pd.concat(export.lots(df, bitmap))["tweet_id"].tolist() == [122, 120]
+
+
+def test_lots_refusent_positions_etrangeres():
+    df = _df()
+    with pytest.raises(ValueError):
+        list(export.lots(df, bitmaps.Bitmap.depuis_positions([0], len(df) + 5)))
+    with pytest.raises(ValueError):
+        list(export.lots(df, np.array([len(df)])))
+
+
+def test_lots_resultat_vide():
+    lots = list(export.lots(_df(), np.array([], dtype=np.int64)))
+    assert len(lots) == 1 and lots[0].empty
+
+
+def test_empreinte_ignore_index():
+    df = _df()
+    assert export.empreinte(df) == export.empreinte(df.set_axis(np.arange(50, 50 + len(df))))
+    # Même taille, autres lignes : empreinte différente
+    assert export.empreinte(df.iloc[:10]) != export.empreinte(df.iloc[10:20])
+
+
+def test_exporter_csv():
+    df = _df()
+    fichier = export.exporter(df, np.array([0, 3]), taille_lot=1)
+    try:
+        with gzip.open(fichier.chemin, "rt") as f:
+            relu = pd.read_csv(f)
+        assert relu["tweet_id"].tolist() == [100, 103]
+    finally:
+        fichier.supprimer()
+
+
+def test_exports_bornes_et_nettoyes(monkeypatch):
+    monkeypatch.setattr(export, "EXPORTS_GARDES", 2)
+    export.nettoyer()
+    fichiers = [export.exporter(_df(), np.array([i])) for i in range(3)]
+    assert [os.path.exists(f.chemin) for f in fichiers] == [False, True, True]
+    assert export.courant({"cle": fichiers[0]}, "cle", fichiers[0].empreinte) is None
+    export.nettoyer()
+    assert not any(os.path.exists(f.chemin) for f in fichiers)
+
+
+def test_preparer_remplace_le_fichier_de_la_session():
+    etat = {}
+    premier = export.preparer(etat, "cle", _df(), np.array([0]))
+    second = export.preparer(etat, "cle", _df(), np.array([1]))
+    assert not os.path.exists(premier.chemin)
+    assert export.courant(etat, "cle", second.empreinte) is second
+    second.supprimer()
+    assert not os.path.exists(second.chemin)
@@ -0,0 +1,32 @@
+import datetime
+
+import numpy as np
+
+from donnees import chargement, facettes
+
+
+class _Etat(dict):
+    pass
+
+
+def test_requete_equivaut_aux_masques(repertoire_csv):
+    table = chargement.charger_dataframes(repertoire_csv)["Tweet_sentiment_localisation"]
+    requete = facettes.requete(_Etat(), csv_path=repertoire_csv)
+    requete.definir_base("rescue", requete.moteur.bitmap_texte("rescue", table["text"]))
+    requete.filtrer("sentiment", ["positive", "negative"])
+    requete.filtrer_periode("jour", datetime.date(2020, 1, 2), datetime.date(2020, 1, 8))
+
+    texte = table["text"].str.contains("rescue")
+    sentiment = table["sentiment"].isin(["positive", "negative"])
+    jour = table["created_at"].dt.date.between(datetime.date(2020, 1, 2), datetime.date(2020, 1, 8))
+    assert requete.resultat().positions().tolist() == np.flatnonzero(texte & sentiment & jour).tolist()
+
+    # Effectifs d'une facette : sous les autres filtres, sans le sien
+    attendu = table[texte & jour]["sentiment"].value_counts()
+    assert requete.comptes("sentiment").to_dict() == attendu[attendu > 0].to_dict()
+
+
+def test_moteur_partage_les_bitmaps(repertoire_csv):
+    moteur = facettes.moteur_facettes(csv_path=repertoire_csv)
+    assert moteur is facettes.moteur_facettes(csv_path=repertoire_csv)
+    assert moteur.bitmap_filtre("topic", ("TRECIS-1",)) is moteur.bitmap_filtre("topic", ("TRECIS-1",))
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from donnees.hashtags import CubeHashtags
+
+
+def _cube_aleatoire(graine=0, nb=500):
+    rng = np.random.default_rng(graine)
+    hashtags = [f"h{i:03d}" for i in range(40)]
+    crises = [f"C{i}" for i in range(6)]
+    codes_hashtags = rng.integers(0, len(hashtags), nb)
+    codes_crises = rng.integers(0, len(crises), nb)
+    poids = rng.integers(1, 4, nb).astype(float)
+    cube = CubeHashtags(hashtags, crises, codes_hashtags, codes_crises, poids)
+    reference = pd.DataFrame({
+        "hashtag": np.asarray(hashtags)[codes_hashtags],
+        "topic": np.asarray(crises)[codes_crises],
+        "occurences": poids.astype(np.int64),
+    }).groupby(["hashtag", "topic"], as_index=False)["occurences"].sum()
+    return cube, reference
+
+
+def test_detail_egal_au_groupby():
+    cube, reference = _cube_aleatoire()
+    detail = cube.detail(cube.nb_hashtags).sort_values(["hashtag", "topic"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(detail, reference, check_dtype=False)
+
+
+def test_top_global_et_par_crise():
+    cube, reference = _cube_aleatoire(graine=1)
+    totaux = reference.groupby("hashtag")["occurences"].sum()
+    attendu = totaux.sort_values(ascending=False, kind="stable").head(5)
+    top = cube.top(5)
+    assert top["hashtag"].tolist() == attendu.index.tolist()
+    assert top["occurences"].tolist() == attendu.tolist()
+
+    crise = reference[reference["topic"] == "C2"].set_index("hashtag")["occurences"]
+    attendu = crise.sort_values(ascending=False, kind="stable").head(5)
+    top = cube.top(5, crise="C2")
+    assert top["hashtag"].tolist() == attendu.index.tolist()
+    assert cube.nb_hashtags_crise("C2") == len(crise)
+
+
+def test_poids_nuls_ignores():
+    cube = CubeHashtags(["a", "b"], ["Toutes"], [0, 1, 1], [0, 0, 0], [0.0, 2.0, 1.0])
+    assert cube.nb_hashtags == 1
+    assert cube.top(5)["hashtag"].tolist() == ["b"]
+    assert cube.top(5)["occurences"].tolist() == [3]
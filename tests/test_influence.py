@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from donnees import graphe, influence
+
+# Petit graphe pondéré, avec un nœud sans arête sortante (4)
+SOURCE = np.array([0, 0, 1, 2, 2, 3, 3, 5])
+CIBLE = np.array([1, 2, 2, 0, 4, 2, 4, 3])
+POIDS = np.array([1.0, 2.0, 1.0, 1.0, 3.0, 1.0, 1.0, 2.0])
+N = 6
+
+
+def _matrice():
+    matrice = np.zeros((N, N))
+    np.add.at(matrice, (SOURCE, CIBLE), POIDS)
+    return matrice
+
+
+def _pagerank_reference(amortissement=influence.AMORTISSEMENT):
+    # Matrice de Google dense ; un nœud pendant renvoie vers tous les nœuds
+    matrice = _matrice()
+    sortants = matrice.sum(axis=1)
+    transition = np.where(sortants[:, None] > 0, matrice / np.maximum(sortants, 1e-300)[:, None], 1.0 / N)
+    google = amortissement * transition + (1 - amortissement) / N
+    valeurs, vecteurs = np.linalg.eig(google.T)
+    principal = np.real(vecteurs[:, np.argmax(np.real(valeurs))])
+    return principal / principal.sum()
+
+
+def _hits_reference():
+    matrice = _matrice()
+    _, vecteurs = np.linalg.eigh(matrice.T @ matrice)
+    autorites = np.abs(vecteurs[:, -1])
+    _, vecteurs = np.linalg.eigh(matrice @ matrice.T)
+    pivots = np.abs(vecteurs[:, -1])
+    return autorites / autorites.sum(), pivots / pivots.sum()
+
+
+@pytest.fixture(params=["scipy", "numpy"])
+def adjacence(request, monkeypatch):
+    if request.param == "numpy":
+        monkeypatch.setattr(influence, "sparse", None)
+    elif influence.sparse is None:
+        pytest.skip("scipy absent")
+    return influence._Adjacence(SOURCE, CIBLE, POIDS, N)
+
+
+def test_pagerank(adjacence):
+    rang = influence.pagerank(adjacence)
+    np.testing.assert_allclose(rang, _pagerank_reference(), atol=1e-8)
+    assert rang.sum() == pytest.approx(1.0)
+
+
+def test_hits(adjacence):
+    autorites, pivots = influence.hits(adjacence)
+    attendues, attendus = _hits_reference()
+    np.testing.assert_allclose(autorites, attendues, atol=1e-6)
+    np.testing.assert_allclose(pivots, attendus, atol=1e-6)
+
+
+def test_mesures_par_user_id():
+    aretes = graphe.Aretes(SOURCE, CIBLE, np.zeros(len(SOURCE), dtype=np.int8), POIDS)
+    noeuds = np.arange(100, 100 + N)
+    resultat = influence.mesures(aretes, noeuds)
+    assert resultat["user_id"].tolist() == noeuds.tolist()
+    assert resultat["degre_entrant"].tolist() == _matrice().sum(axis=0).tolist()
+    np.testing.assert_allclose(resultat["pagerank"], _pagerank_reference(), atol=1e-8)
+
+
+class _Reseau:
+    # Réseau minimal : crise "A" = toutes les arêtes, crise "B" sans arête
+    noeuds = np.arange(100, 100 + N)
+
+    class partitions:
+        valeurs = ["A", "B"]
+
+    def aretes(self, crises=None):
+        garde = np.full(len(SOURCE), crises is None or "A" in crises)
+        return graphe.Aretes(SOURCE[garde], CIBLE[garde], np.zeros(garde.sum(), dtype=np.int8), POIDS[garde])
+
+
+def test_top_selection_sans_arete():
+    vide = influence.mesures(_Reseau().aretes(["B"]), _Reseau.noeuds)
+    assert vide.empty and (vide.dtypes[list(influence.CRITERES)] == np.float64).all()
+    utilisateurs = pd.DataFrame({"user_id": _Reseau.noeuds, "screen_name": [f"u{i}" for i in range(N)]})
+    classement = influence.Classement(_Reseau(), utilisateurs)
+    for critere in influence.CRITERES:
+        assert classement.top(["B"], critere).empty
+    top = classement.top(["A", "B"], "degre_entrant", k=1)
+    assert top["screen_name"].tolist() == ["u2"]
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from donnees import jointures
+
+
+@pytest.fixture
+def tables():
+    return {
+        "posted_clean": pd.DataFrame({"tweet_id": [1, 2, 3, 4], "user_id": [10, 10, 11, 12]}),
+        # Le tweet 2 porte sur deux crises, le tweet 4 sur aucune
+        "is_about_clean": pd.DataFrame({"tweet_id": [1, 2, 2, 3], "event_id": [0, 0, 1, 1]}),
+    }
+
+
+@pytest.mark.parametrize("ids", [[1, 5, 2, 2, 1], [3, 1_000_000, 2]])
+def test_positions_premiere_ligne(ids):
+    index = jointures.IndexPositions(ids)
+    attendu = [ids.index(i) for i in ids]
+    assert index.positions_de(pd.Series(ids + [7])).tolist() == attendu + [-1]
+
+
+def test_positions_identifiants_manquants():
+    index = jointures.IndexPositions([4, 8])
+    assert index.positions_de(pd.Series([8, None, 4], dtype="Int64")).tolist() == [1, -1, 0]
+
+
+def test_correspondances_plusieurs_a_plusieurs():
+    index = jointures.IndexPositions([5, 7, 5, 9])
+    rangs, positions = index.correspondances([5, 6, 9])
+    assert rangs.tolist() == [0, 0, 1, 2]
+    assert positions.tolist() == [0, 2, -1, 3]
+
+
+@pytest.mark.parametrize("interne", [False, True])
+def test_joindre_equivaut_a_merge(tables, interne):
+    moteur = jointures.MoteurJointures(tables)
+    gauche = pd.DataFrame({"tweet_id": [4, 2, 1, 3, 2], "valeur": [1.0, 2.0, 3.0, 4.0, 5.0]})
+    resultat = moteur.joindre(gauche, "tweet_id", "is_about_clean", "tweet_id", ["event_id"], interne=interne)
+    attendu = gauche.merge(tables["is_about_clean"], on="tweet_id", how="inner" if interne else "left")
+    # Un entier avec des absents devient un flottant nullable (NA) plutôt que NaN
+    pd.testing.assert_frame_equal(resultat.astype(float), attendu.astype(float))
+
+
+def test_joindre_cle_unique_renomme(tables):
+    moteur = jointures.MoteurJointures(tables)
+    gauche = pd.DataFrame({"tweet_id": [3, 9]})
+    resultat = moteur.joindre(gauche, "tweet_id", "posted_clean", "tweet_id", {"user_id": "auteur"})
+    assert resultat["auteur"].iloc[0] == 11
+    assert pd.isna(resultat["auteur"].iloc[1])
+
+
+def test_engagement_crise_inconnue(tables):
+    tables = dict(tables,
+                  Tweet_date_clean=pd.DataFrame({"tweet_id": [1, 2, 3, 4], "retweet_count": [5, 1, 2, 0]}),
+                  User_clean=pd.DataFrame({"user_id": [10, 11, 12], "screen_name": ["a", "b", "c"],
+                                           "followers_count": [1, 2, 3]}),
+                  reply_tweet_to_user=pd.DataFrame({"end_id": [11]}),
+                  # La crise 1 est absente d'Event_clean
+                  Event_clean=pd.DataFrame({"node_id": [0], "event_id": ["fireColorado2012"]}))
+    engagement = jointures.MoteurJointures(tables).engagement()
+    noms = engagement.set_index(["user_id", "event_id"])["event_name"]
+    assert noms[(10, 0)] == "fireColorado2012"
+    assert noms[(10, 1)] == "inconnu" and noms[(11, 1)] == "inconnu"
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from donnees import chargement, listes
+
+
+def test_depuis_serie_sans_eval():
+    serie = pd.Series(["['a', 'b']", "[]", None, "seul", '["c\'est", "d"]'])
+    colonne = listes.ColonneListe.depuis_serie(serie)
+    lignes = [list(colonne.vocabulaire[colonne.codes[colonne.offsets[i]:colonne.offsets[i + 1]]]) for i in range(len(colonne))]
+    assert lignes == [["a", "b"], [], [], ["seul"], ["c'est", "d"]]
+
+
+def test_sauver_charger(tmp_path):
+    colonne = listes.ColonneListe.depuis_serie(pd.Series(["['x', 'y']", "['y']"]))
+    colonne.sauver(str(tmp_path / "liste.npz"))
+    relue = listes.ColonneListe.charger(str(tmp_path / "liste.npz"))
+    assert relue.codes.tolist() == colonne.codes.tolist()
+    assert relue.offsets.tolist() == colonne.offsets.tolist()
+    assert relue.vocabulaire.tolist() == ["x", "y"]
+
+
+def test_compter_par_equivaut_a_explode():
+    serie = pd.Series(["['a', 'b']", "['a']", "['b', 'c']", "[]"])
+    groupes = pd.Series(["x", "y", "x", "y"], name="topic")
+    resultat = listes.ColonneListe.depuis_serie(serie).compter_par(groupes, "tag")
+    attendu = (pd.DataFrame({"topic": groupes, "tag": serie.map(eval)}).explode("tag").dropna()
+               .groupby(["topic", "tag"]).size().reset_index(name="count"))
+    pd.testing.assert_frame_equal(resultat, attendu, check_dtype=False)
+
+
+def _hashtags_attendus(df):
+    return sorted(tag.lower() for valeur in df["hashtags"] for tag in eval(valeur))
+
+
+def test_pour_filtre_garde_index(repertoire_csv):
+    table = chargement.charger_dataframes(repertoire_csv)["Tweet_sentiment_localisation"]
+    filtre = table[table["retweet_count"] > 50]
+    liste = listes.pour(filtre, "hashtags", minuscules=True, csv_path=repertoire_csv)
+    assert sorted(liste.vocabulaire[liste.codes]) == _hashtags_attendus(filtre)
+
+
+@pytest.mark.parametrize("transformer", [
+    lambda df: df.reset_index(drop=True),
+    lambda df: df.sort_values("retweet_count").reset_index(drop=True),
+    lambda df: pd.concat([df.iloc[5:], df.iloc[:5]], ignore_index=True),
+])
+def test_pour_retrouve_les_lignes_sans_index(repertoire_csv, transformer):
+    table = chargement.charger_dataframes(repertoire_csv)["Tweet_sentiment_localisation"]
+    filtre = transformer(table[table["retweet_count"] > 30])
+    liste = listes.pour(filtre, "hashtags", minuscules=True, csv_path=repertoire_csv)
+    assert len(liste) == len(filtre)
+    # Ligne à ligne : la i-ème liste est celle du i-ème tweet de filtre
+    for i in np.flatnonzero(liste.longueurs()):
+        tags = liste.vocabulaire[liste.codes[liste.offsets[i]:liste.offsets[i + 1]]]
+        assert sorted(tags) == sorted(t.lower() for t in eval(filtre["hashtags"].iloc[i]))
+
+
+def test_pour_ligne_etrangere(repertoire_csv):
+    table = chargement.charger_dataframes(repertoire_csv)["Tweet_sentiment_localisation"]
+    intrus = table.iloc[:3].assign(tweet_id=[1, 2, 3]).reset_index(drop=True)
+    with pytest.raises(ValueError):
+        listes.pour(intrus, "hashtags", csv_path=repertoire_csv)
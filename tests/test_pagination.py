@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from donnees import bitmaps, chargement, jointures, pagination
+
+TABLE = "Tweet_sentiment_localisation"
+
+
+def _attendu(table, positions, colonne, numero, taille_page, descendant):
+    # Tri de référence : stable, valeurs manquantes en fin dans les deux sens
+    lignes = table.iloc[positions].assign(_position=positions)
+    lignes = lignes.sort_values(colonne, ascending=not descendant, kind="stable", na_position="last")
+    return lignes[colonne].iloc[numero * taille_page:(numero + 1) * taille_page].tolist()
+
+
+@pytest.mark.parametrize("colonne", ["retweet_count", "created_at", "lieu_extrait"])
+@pytest.mark.parametrize("descendant", [False, True])
+@pytest.mark.parametrize("numero", [0, 1, 3])
+def test_page_equivaut_au_tri(repertoire_csv, colonne, descendant, numero):
+    table = chargement.charger_dataframes(repertoire_csv)[TABLE]
+    index = pagination.IndexTri(table)
+    for positions in (np.arange(len(table)), np.arange(0, len(table), 3), np.array([4, 9, 30])):
+        lignes = index.page(positions, colonne, numero, 7, descendant)
+        assert table[colonne].iloc[lignes].tolist() == _attendu(table, positions, colonne, numero, 7, descendant)
+        assert set(lignes) <= set(positions)
+
+
+def test_page_bitmap_et_table_entiere(repertoire_csv):
+    table = chargement.charger_dataframes(repertoire_csv)[TABLE]
+    index = pagination.IndexTri(table)
+    positions = np.arange(0, len(table), 2)
+    bitmap = bitmaps.Bitmap.depuis_positions(positions, len(table))
+    assert index.page(bitmap, "favorite_count", 1, 10).tolist() == index.page(positions, "favorite_count", 1, 10).tolist()
+    assert len(index.page(None, "topic", 0, 25)) == 25
+
+
+def test_page_refuse_positions_etrangeres(repertoire_csv):
+    table = chargement.charger_dataframes(repertoire_csv)[TABLE]
+    index = pagination.IndexTri(table)
+    with pytest.raises(ValueError):
+        index.page(np.array([0, len(table)]), "topic", 0, 25)
+    with pytest.raises(ValueError):
+        index.page(bitmaps.Bitmap.depuis_positions([0], len(table) + 1), "topic", 0, 25)
+
+
+def test_page_filtre_reindexe(repertoire_csv):
+    # Après un reset_index, les positions viennent de jointures.positions_lignes, pas de l'index
+    table = chargement.charger_dataframes(repertoire_csv)[TABLE]
+    filtre = table[table["retweet_count"] > 40]
+    reindexe = filtre.sort_values("favorite_count").reset_index(drop=True)
+    positions = np.sort(jointures.positions_lignes(reindexe, TABLE, csv_path=repertoire_csv))
+    assert positions.tolist() == filtre.index.tolist()
+
+
+def test_topic_trie_sur_les_noms_affiches(repertoire_csv):
+    pd.DataFrame({
+        "node_id": [0, 1, 2],
+        "event_id": ["zeta2012", "alpha2013", "mu2014"],
+        "event_type": ["flood", "fire", "flood"],
+        "trecis_id": ["TRECIS-1", "TRECIS-2", "TRECIS-3"],
+    }).to_csv(os.path.join(repertoire_csv, "Event_clean.csv"), index=False)
+    table = chargement.charger_dataframes(repertoire_csv)[TABLE]
+    noms = {"TRECIS-1": "zeta2012", "TRECIS-2": "alpha2013", "TRECIS-3": "mu2014"}
+    affiches = table["topic"].map(noms)
+    index = pagination.index_tri(csv_path=repertoire_csv)
+    for descendant in (False, True):
+        lignes = index.page(None, "topic", 0, len(table), descendant)
+        valeurs = affiches.iloc[lignes].tolist()
+        assert valeurs == sorted(valeurs, reverse=descendant)
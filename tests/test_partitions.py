@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from donnees import chargement, hashtags, jointures, partitions
+
+TABLE = "Tweet_sentiment_localisation"
+
+
+def _table(repertoire_csv):
+    return chargement.charger_dataframes(repertoire_csv)[TABLE]
+
+
+def test_plages_contigues(repertoire_csv):
+    table = _table(repertoire_csv)
+    registre = partitions.partitions(TABLE, repertoire_csv)
+    assert registre.colonne == "topic"
+    for crise in registre.valeurs:
+        assert (table["topic"].iloc[registre.tranche(crise)] == crise).all()
+    assert registre.effectifs().sum() == table["topic"].notna().sum()
+
+
+def test_depuis_json():
+    registre = partitions.Partitions.depuis_colonne(pd.Series(["a", "a", "b"], name="topic"))
+    relu = partitions.Partitions.depuis_json(registre.vers_json())
+    assert relu.colonne == "topic"
+    assert relu.tranche("b") == slice(2, 3)
+
+
+@pytest.mark.parametrize("transformer", [
+    lambda df: df,
+    lambda df: df[df["retweet_count"] > 30],
+    lambda df: df[df["retweet_count"] > 30].reset_index(drop=True),
+    lambda df: df.sort_values("retweet_count"),
+    lambda df: pd.concat([df.iloc[20:], df.iloc[:20]], ignore_index=True),
+])
+@pytest.mark.parametrize("crises", ["TRECIS-2", ["TRECIS-1", "TRECIS-3"]])
+def test_extraire_equivaut_au_masque(repertoire_csv, transformer, crises):
+    df = transformer(_table(repertoire_csv))
+    registre = partitions.partitions(TABLE, repertoire_csv)
+    attendu = df[df["topic"].isin(crises if isinstance(crises, list) else [crises])]
+    resultat = registre.extraire(df, crises)
+    assert sorted(resultat["tweet_id"]) == sorted(attendu["tweet_id"])
+
+
+def test_extraire_sans_colonne_ni_positions(repertoire_csv):
+    df = _table(repertoire_csv).drop(columns="topic").reset_index(drop=True).iloc[::-1]
+    with pytest.raises(ValueError):
+        partitions.partitions(TABLE, repertoire_csv).extraire(df, "TRECIS-1")
+
+
+def test_table_entiere(repertoire_csv):
+    table = _table(repertoire_csv)
+    assert jointures.est_table_entiere(table, TABLE, csv_path=repertoire_csv)
+    assert jointures.est_table_entiere(table.reset_index(drop=True), TABLE, csv_path=repertoire_csv)
+    # Même nombre de lignes, ordre différent : ce n'est plus la table
+    assert not jointures.est_table_entiere(table.iloc[::-1], TABLE, csv_path=repertoire_csv)
+
+
+def test_cube_tweets_meme_taille_autre_ordre(repertoire_csv):
+    table = _table(repertoire_csv)
+    inverse = table.iloc[::-1].reset_index(drop=True)
+    cube = hashtags.cube_tweets(inverse, TABLE, repertoire_csv)
+    assert cube is not hashtags.cube_tweets(None, TABLE, repertoire_csv)
+    assert cube.top(10).equals(hashtags.cube_tweets(table, TABLE, repertoire_csv).top(10))
@@ -0,0 +1,78 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from donnees import chargement, regions, spatial
+
+TABLE = "Tweet_sentiment_localisation"
+
+
+def _carre(pays, region, lon_min, lat_min, lon_max, lat_max, trou=None):
+    anneaux = [[[lon_min, lat_min], [lon_max, lat_min], [lon_max, lat_max], [lon_min, lat_max], [lon_min, lat_min]]]
+    if trou is not None:
+        x1, y1, x2, y2 = trou
+        anneaux.append([[x1, y1], [x2, y1], [x2, y2], [x1, y2], [x1, y1]])
+    return {"type": "Feature", "properties": {"admin": pays, "name": region},
+            "geometry": {"type": "Polygon", "coordinates": anneaux}}
+
+
+def _ecrire_frontieres(chemin, entites):
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": entites}, f)
+
+
+def test_dedans_pair_impair():
+    aretes = np.array([
+        [0, 0, 10, 0], [10, 0, 10, 10], [10, 10, 0, 10], [0, 10, 0, 0],  # carré
+        [4, 4, 6, 4], [6, 4, 6, 6], [6, 6, 4, 6], [4, 6, 4, 4],  # trou
+    ], dtype=float)
+    longitude = np.array([1.0, 5.0, 11.0, 9.0])
+    latitude = np.array([1.0, 5.0, 5.0, 9.0])
+    assert regions.dedans(longitude, latitude, aretes).tolist() == [True, False, False, True]
+
+
+def test_geocoder(tmp_path):
+    chemin = str(tmp_path / "frontieres.geojson")
+    _ecrire_frontieres(chemin, [
+        _carre("A", "Nord", 0, 10, 10, 20),
+        _carre("A", "Sud", 0, 0, 10, 10, trou=(4, 4, 6, 6)),
+        _carre("B", "Est", 20, 0, 30, 10),
+    ])
+    latitude = np.array([15.0, 5.0, 5.0, 5.0, np.nan, 50.0])
+    longitude = np.array([5.0, 1.0, 5.0, 25.0, 5.0, 50.0])
+    geolocalises = np.flatnonzero(~np.isnan(latitude))
+    index = spatial.IndexSpatial(latitude[geolocalises], longitude[geolocalises], geolocalises, len(latitude))
+    resultat = regions.geocoder(regions.lire_frontieres(chemin), latitude, longitude, index,
+                                pd.Series(["x", "x", "y", "y", "x", "y"]))
+    libelles = [None if c < 0 else resultat.libelle_region(c) for c in resultat.codes_region]
+    assert libelles == ["Nord (A)", "Sud (A)", None, "Est (B)", None, None]
+    assert resultat.comptes_pays().to_dict() == {"A": 2, "B": 1}
+    assert resultat.positions(pays=["A"]).tolist() == [0, 1]
+    assert resultat.effectifs(["y"], niveau="pays")["nb_tweets"].tolist() == [1]
+
+
+def test_sans_frontieres(repertoire_csv):
+    assert not regions.disponible(repertoire_csv)
+    with pytest.raises(FileNotFoundError, match="frontieres.geojson"):
+        regions.regions(TABLE, repertoire_csv)
+
+
+def test_frontieres_invalident_les_structures(repertoire_csv):
+    chemin = regions.chemin_frontieres(repertoire_csv)
+    assert regions.FICHIER_FRONTIERES in chargement.FICHIERS_ANNEXES
+    version = chargement.version_donnees(repertoire_csv)
+    _ecrire_frontieres(chemin, [_carre("Monde", "Ouest", -180, -90, 0, 90)])
+    ouest = regions.regions(TABLE, repertoire_csv)
+    assert chargement.version_donnees(repertoire_csv) > version
+    assert set(ouest.pays) == {"Monde"}
+
+    # Fichier remplacé : mtime et taille changent, le géocodage est refait
+    _ecrire_frontieres(chemin, [_carre("Monde", "Est", 0, -90, 180, 90), _carre("Monde", "Ouest", -180, -90, 0, 90)])
+    os.utime(chemin, ns=(os.stat(chemin).st_mtime_ns + 10**9,) * 2)
+    tout = regions.regions(TABLE, repertoire_csv)
+    assert tout is not ouest
+    assert len(tout.regions) == 2
+    assert tout.comptes_pays()["Monde"] > ouest.comptes_pays()["Monde"]
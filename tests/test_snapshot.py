@@ -0,0 +1,76 @@
+import os
+
+import pandas as pd
+import pytest
+
+from donnees import chargement, schema, snapshot
+
+from conftest import tweets_synthetiques
+
+TABLE = "Tweet_sentiment_localisation"
+
+pytestmark = pytest.mark.skipif(not snapshot.disponible(), reason="pyarrow absent")
+
+
+def _csv(repertoire_csv):
+    return os.path.join(repertoire_csv, TABLE + ".csv")
+
+
+def _vieillir(chemin, secondes=10):
+    # Recule la date de modification : le fichier suivant écrit est plus récent
+    date = os.stat(chemin).st_mtime_ns - secondes * 10**9
+    os.utime(chemin, ns=(date, date))
+
+
+def test_compilation_et_relecture(repertoire_csv):
+    file_path = _csv(repertoire_csv)
+    df = snapshot.charger_table(file_path)
+    assert snapshot.snapshot_a_jour(file_path)
+    # Rangée par crise puis par date (schema.ORDRE_PHYSIQUE)
+    assert df["topic"].is_monotonic_increasing
+    attendu = schema.ordonner(TABLE, schema.appliquer_schema(TABLE, pd.read_csv(file_path)))
+    pd.testing.assert_frame_equal(df, attendu.reset_index(drop=True), check_dtype=False)
+    assert os.path.exists(snapshot.chemin_liste(file_path, "hashtags"))
+
+
+def test_partitions_dans_l_en_tete(repertoire_csv):
+    file_path = _csv(repertoire_csv)
+    df = snapshot.charger_table(file_path)
+    plages = snapshot.lire_partitions(file_path)
+    assert plages.taille == len(df)
+    for crise in plages.valeurs:
+        lot = snapshot.lire_partition(file_path, crise)
+        pd.testing.assert_frame_equal(lot, df.iloc[plages.tranche(crise)], check_dtype=False)
+
+
+def test_csv_modifie_recompile(repertoire_csv):
+    file_path = _csv(repertoire_csv)
+    snapshot.charger_table(file_path)
+    _vieillir(snapshot.chemin_snapshot(file_path))
+    tweets_synthetiques(nb=40, graine=5).to_csv(file_path, index=False)
+    assert not snapshot.snapshot_a_jour(file_path)
+    assert len(snapshot.charger_table(file_path)) == 40
+    assert snapshot.snapshot_a_jour(file_path)
+
+
+def test_version_du_schema_recompile(repertoire_csv, monkeypatch):
+    file_path = _csv(repertoire_csv)
+    snapshot.charger_table(file_path)
+    monkeypatch.setattr(schema, "VERSION", schema.VERSION + "-autre")
+    assert not snapshot.snapshot_a_jour(file_path)
+    assert snapshot.compiler_repertoire(repertoire_csv) == [TABLE]
+    assert snapshot.compiler_repertoire(repertoire_csv) == []
+
+
+def test_chargement_invalide_les_structures(repertoire_csv):
+    file_path = _csv(repertoire_csv)
+    taille = chargement.structure_derivee("essai/taille", lambda tables: len(tables[TABLE]), repertoire_csv)
+    version = chargement.version_donnees(repertoire_csv)
+    assert taille == 60
+
+    tweets_synthetiques(nb=45, graine=7).to_csv(file_path, index=False)
+    date = os.stat(file_path).st_mtime_ns + 10**9
+    os.utime(file_path, ns=(date, date))
+    assert chargement.structure_derivee("essai/taille", lambda tables: len(tables[TABLE]), repertoire_csv) == 45
+    assert chargement.version_donnees(repertoire_csv) > version
+    assert len(chargement.charger_dataframes(repertoire_csv)[TABLE]) == 45
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from donnees import chargement, spatial
+
+
+def _points(nb=500, graine=3):
+    aleatoire = np.random.default_rng(graine)
+    latitude = aleatoire.uniform(-89, 89, nb)
+    longitude = aleatoire.uniform(-180, 180, nb)
+    positions = np.sort(aleatoire.choice(2 * nb, nb, replace=False))
+    return latitude, longitude, positions, spatial.IndexSpatial(latitude, longitude, positions, 2 * nb, pas=2.0)
+
+
+@pytest.mark.parametrize("rectangle", [
+    spatial.Rectangle(-10, 30, -50, 20),
+    spatial.Rectangle(40, 89, -180, 180),
+    spatial.Rectangle(-60, 60, 150, -150),  # traverse l'antiméridien
+])
+def test_rectangle_equivaut_au_masque(rectangle):
+    latitude, longitude, positions, index = _points()
+    dans_lat = (latitude >= rectangle.lat_min) & (latitude <= rectangle.lat_max)
+    if rectangle.lon_min <= rectangle.lon_max:
+        dans_lon = (longitude >= rectangle.lon_min) & (longitude <= rectangle.lon_max)
+    else:
+        dans_lon = (longitude >= rectangle.lon_min) | (longitude <= rectangle.lon_max)
+    assert index.positions(rectangle).tolist() == positions[dans_lat & dans_lon].tolist()
+
+
+@pytest.mark.parametrize("cercle", [
+    spatial.Cercle(10, 20, 1500),
+    spatial.Cercle(-30, 179, 2500),  # déborde de l'antiméridien
+    spatial.Cercle(85, 0, 1000),  # atteint le pôle
+])
+def test_cercle_equivaut_a_la_distance(cercle):
+    latitude, longitude, positions, index = _points()
+    distances = spatial.distance_km(cercle.latitude, cercle.longitude, latitude, longitude)
+    assert index.positions(cercle).tolist() == positions[distances <= cercle.rayon_km].tolist()
+
+
+def test_index_spatial_ignore_coordonnees_absentes(repertoire_csv):
+    table = chargement.charger_dataframes(repertoire_csv)["Tweet_sentiment_localisation"]
+    index = spatial.index_spatial(csv_path=repertoire_csv)
+    tout = index.positions(spatial.Rectangle(-90, 90, -180, 180))
+    geolocalises = table["latitude"].notna() & table["longitude"].notna() \
+        & (table["latitude"] != 0) & (table["longitude"] != 0)
+    assert tout.tolist() == np.flatnonzero(geolocalises.to_numpy()).tolist()
+    assert index.bitmap(spatial.Rectangle(-90, 90, -180, 180)).compte() == len(tout)
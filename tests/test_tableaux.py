@@ -0,0 +1,14 @@
+import numpy as np
+
+from donnees import tableaux
+
+
+def test_plages():
+    debuts = np.array([5, 2, 7, 0])
+    fins = np.array([8, 2, 9, 1])
+    assert tableaux.plages(debuts, fins).tolist() == [5, 6, 7, 7, 8, 0]
+    elements, intervalles = tableaux.plages(debuts, fins, intervalles=True)
+    assert elements.tolist() == [5, 6, 7, 7, 8, 0]
+    assert intervalles.tolist() == [0, 0, 0, 2, 2, 3]
+    vides = tableaux.plages(np.array([3]), np.array([3]), intervalles=True)
+    assert [len(v) for v in vides] == [0, 0]
@@ -0,0 +1,53 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from donnees import chargement, temps
+
+TABLE = "Tweet_sentiment_localisation"
+
+
+def _attendu(instants, debut, fin):
+    masque = instants.notna()
+    if debut is not None:
+        masque &= instants >= pd.Timestamp(debut)
+    if fin is not None:
+        masque &= instants <= pd.Timestamp(fin)
+    return np.flatnonzero(masque.to_numpy())
+
+
+@pytest.mark.parametrize("debut, fin", [
+    (None, None),
+    ("2020-01-03 06:00:00", None),
+    (None, "2020-01-05 12:30:00"),
+    ("2020-01-02", "2020-01-02 23:59:59"),
+    ("2020-02-01", "2020-03-01"),
+])
+def test_positions_equivalent_au_masque(debut, fin):
+    aleatoire = np.random.default_rng(1)
+    instants = pd.Series(pd.Timestamp("2020-01-01") + pd.to_timedelta(aleatoire.integers(0, 8 * 86400, 200), unit="s"))
+    instants[::13] = pd.NaT
+    index = temps.IndexTemporel(instants)
+    assert index.positions(debut, fin).tolist() == _attendu(instants, debut, fin).tolist()
+
+
+def test_date_seule_couvre_la_journee():
+    instants = pd.Series(pd.to_datetime(["2020-01-01 10:00", "2020-01-02 00:00", "2020-01-02 23:59", "2020-01-03 00:00"]))
+    index = temps.IndexTemporel(instants)
+    assert index.positions(datetime.date(2020, 1, 2), datetime.date(2020, 1, 2)).tolist() == [1, 2]
+    assert index.bornes() == (pd.Timestamp("2020-01-01 10:00"), pd.Timestamp("2020-01-03 00:00"))
+
+
+def test_tranche_par_crise(repertoire_csv):
+    table = chargement.charger_dataframes(repertoire_csv)[TABLE]
+    index = temps.index_temporel(TABLE, csv_path=repertoire_csv)
+    instants = pd.to_datetime(table["created_at"]).reset_index(drop=True)
+    debut, fin = datetime.date(2020, 1, 3), datetime.date(2020, 1, 7)
+    for crise in ["TRECIS-1", "TRECIS-2", "TRECIS-3"]:
+        tranche = index.tranche(crise, debut, fin)
+        masque = (table["topic"] == crise).to_numpy() & (instants >= "2020-01-03").to_numpy() \
+            & (instants < "2020-01-08").to_numpy()
+        assert np.arange(tranche.start, tranche.stop).tolist() == np.flatnonzero(masque).tolist()
+    assert index.tranche("inconnue") == slice(0, 0)